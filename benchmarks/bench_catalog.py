@@ -0,0 +1,257 @@
+"""Catalog shortlist: bitset index vs. the original linear scan.
+
+    python -m benchmarks.bench_catalog --size 100000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from skinsync.catalog_store import Catalog
+from skinsync.heuristics import is_user_adult
+
+SKIN_TYPES = ["oily", "dry", "combination", "normal", "sensitive", "acne", "all"]
+CONCERNS = [
+    "acne", "clogged_pores", "oiliness", "pigmentation", "dark_spots", "redness",
+    "irritation", "dryness", "barrier_damage", "dehydration", "anti_aging",
+    "texture", "dullness", "hydration", "sun_protection", "sensitivity",
+]
+INGREDIENTS = [
+    "ceramides", "niacinamide", "glycerin", "salicylic_acid", "hyaluronic_acid",
+    "zinc", "azelaic_acid", "propolis", "retinol", "uv_filters", "fragrance",
+    "aloe", "vitamin_c", "tea_tree", "snail_mucin", "essential_oils", "aha", "bha",
+]
+CATEGORIES = ["cleanser", "moisturizer", "serum", "sunscreen", "toner", "mask"]
+
+PROFILES = [
+    {"skin_type": "Oily", "main_concern": "Acne / Breakouts", "age_bucket": "<18"},
+    {"skin_type": "Combination", "main_concern": "Dryness / Flakiness", "age_bucket": "18–24"},
+    {"skin_type": "Dry", "main_concern": "Anti-aging / Fine lines", "age_bucket": "30–40"},
+    {"skin_type": "Sensitive", "main_concern": "Redness / Sensitivity", "age_bucket": "25–30"},
+    {"skin_type": "Normal", "main_concern": "Pigmentation / Dark spots", "age_bucket": "<18"},
+]
+MESSAGES = [
+    "I keep getting pimples on my chin",
+    "my skin feels tight and flaky",
+    "help with dark spots please",
+    "",
+]
+ALLERGY_SETS = [[], ["niacinamide"], ["fragrance", "salicylic_acid"], ["vitamin c"]]
+
+
+def make_catalog(n, seed=7):
+    rng = random.Random(seed)
+    products = []
+    for i in range(n):
+        products.append({
+            "name": f"Product {i % (n - n // 50 or 1)}",  # ~2% duplicate names
+            "brand": f"Brand {rng.randrange(500)}",
+            "category": rng.choice(CATEGORIES),
+            "skin_types": rng.sample(SKIN_TYPES, rng.randint(1, 3)),
+            "concerns": rng.sample(CONCERNS, rng.randint(1, 3)),
+            "ingredients": rng.sample(INGREDIENTS, rng.randint(1, 4)),
+            "strength": rng.choice(["very_gentle", "gentle", "medium", "strong"]),
+            "irritation": rng.choice(["very_low", "low", "medium", "high"]),
+            "comodogenic": rng.randint(0, 3),
+            "fa_safe": rng.random() < 0.8,
+            "adult_only": rng.random() < 0.05,
+            "price_range": rng.choice(["budget", "mid", "premium"]),
+            "origin": rng.choice(["us", "indian", "korean", "global"]),
+        })
+    return products
+
+
+def linear_filter_products(products, profile, allergies, main_intent_text, history):
+    # the pre-index implementation, kept verbatim as the reference
+    skin_type = profile.get("skin_type", "Combination").lower()
+    concern = profile.get("main_concern", "").lower()
+    t = (main_intent_text or "").lower()
+    is_adult_flag = is_user_adult(profile, history)
+
+    wants_acne = "acne" in t or "pimple" in t or "breakout" in t or "acne" in concern
+
+    shortlist = []
+    for p in products:
+        if p.get("adult_only", False) and not is_adult_flag:
+            continue
+        stypes = [s.lower() for s in p["skin_types"]]
+        if "all" not in stypes:
+            if skin_type not in [s.replace(" ", "_") for s in stypes]:
+                if not (skin_type == "oily" and "combination" in stypes) and not (skin_type == "combination" and "oily" in stypes):
+                    continue
+        ctags = [c.lower() for c in p["concerns"]]
+        if wants_acne and not any(c in ctags for c in ["acne", "clogged_pores", "oiliness"]):
+            continue
+        ingr = [i.lower() for i in p.get("ingredients", [])]
+        skip = False
+        for allergy in allergies:
+            if allergy in ingr:
+                skip = True
+                break
+            pretty = allergy.replace("_", " ")
+            if pretty in ingr:
+                skip = True
+                break
+        if skip:
+            continue
+        shortlist.append(p)
+
+    if len(shortlist) < 3:
+        shortlist = products
+
+    seen = set()
+    final = []
+    for p in shortlist:
+        if p["name"] not in seen:
+            seen.add(p["name"])
+            final.append(p)
+    return final[:12]
+
+
+# ==========================================
+# BITSET INDEX (the pre-ranking shortlist, kept as a baseline)
+# ==========================================
+# One Python int per skin type / concern / ingredient whose set bits are
+# the products carrying that value; the yes/no filter above becomes a few
+# `&` / `|` operations. filter_products ranks with skinsync.ranking now,
+# bench_ranking still compares its answers against this one.
+
+MAX_SHORTLIST = 12
+MIN_SHORTLIST = 3
+ACNE_CONCERNS = ["acne", "clogged_pores", "oiliness"]
+
+
+def _to_bitset(mask):
+    # bool[n] -> int with bit i set where mask[i]
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def _build_postings(catalog, field, normalize=str.lower):
+    rows, ids = catalog.occurrences(field)
+    order = np.argsort(ids, kind="stable")
+    rows, ids = rows[order], ids[order]
+    distinct, starts = np.unique(ids, return_index=True)
+    postings = {}
+    for string_id, chunk in zip(distinct.tolist(), np.split(rows, starts[1:])):
+        mask = np.zeros(catalog.size, dtype=bool)
+        mask[chunk] = True
+        key = normalize(catalog.strings[string_id])
+        postings[key] = postings.get(key, 0) | _to_bitset(mask)
+    return postings
+
+
+def _has_at_least(mask, n):
+    for _ in range(n):
+        if not mask:
+            return False
+        mask &= mask - 1
+    return True
+
+
+class BitsetIndex:
+    def __init__(self, catalog):
+        if not isinstance(catalog, Catalog):
+            catalog = Catalog.from_records(catalog)
+        self.catalog = catalog
+        self.all_mask = (1 << catalog.size) - 1
+        self.skin_types = _build_postings(catalog, "skin_types", lambda v: v.lower().replace(" ", "_"))
+        self.concerns = _build_postings(catalog, "concerns")
+        self.ingredients = _build_postings(catalog, "ingredients")
+        self.adult_only = _to_bitset(catalog.flags["adult_only"])
+        self.fallback = self._materialize(self.all_mask)
+
+    def shortlist(self, skin_type, allergies, is_adult, wants_acne):
+        mask = self.all_mask
+        allowed = self.skin_types.get("all", 0) | self.skin_types.get(skin_type, 0)
+        # slightly looser allowance: oily vs combination
+        if skin_type == "oily":
+            allowed |= self.skin_types.get("combination", 0)
+        elif skin_type == "combination":
+            allowed |= self.skin_types.get("oily", 0)
+        mask &= allowed
+        if not is_adult:
+            mask &= ~self.adult_only
+        if wants_acne:
+            acne = 0
+            for c in ACNE_CONCERNS:
+                acne |= self.concerns.get(c, 0)
+            mask &= acne
+        for allergy in allergies:
+            mask &= ~self.ingredients.get(allergy, 0)
+            mask &= ~self.ingredients.get(allergy.replace("_", " "), 0)
+
+        # fallback: if filtered too harshly
+        if not _has_at_least(mask, MIN_SHORTLIST):
+            return self.fallback
+        return self._materialize(mask)
+
+    def _materialize(self, mask):
+        # walk set bits lowest-first (= catalog order), keep unique by name
+        seen = set()
+        final = []
+        while mask and len(final) < MAX_SHORTLIST:
+            low = mask & -mask
+            mask ^= low
+            p = self.catalog.product(low.bit_length() - 1)
+            if p["name"] not in seen:
+                seen.add(p["name"])
+                final.append(p)
+        return final
+
+
+def indexed_filter_products(index, profile, allergies, main_intent_text, history):
+    skin_type = profile.get("skin_type", "Combination").lower()
+    concern = profile.get("main_concern", "").lower()
+    t = (main_intent_text or "").lower()
+    wants_acne = "acne" in t or "pimple" in t or "breakout" in t or "acne" in concern
+    return index.shortlist(skin_type, allergies, is_user_adult(profile, history), wants_acne)
+
+
+def queries():
+    for profile in PROFILES:
+        for msg in MESSAGES:
+            for allergies in ALLERGY_SETS:
+                yield profile, allergies, msg
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    products = make_catalog(args.size)
+
+    start = time.perf_counter()
+    index = BitsetIndex(products)
+    build_s = time.perf_counter() - start
+
+    qs = list(queries())
+    for profile, allergies, msg in qs:
+        expected = linear_filter_products(products, profile, allergies, msg, [])
+        got = indexed_filter_products(index, profile, allergies, msg, [])
+        assert [p["name"] for p in got] == [p["name"] for p in expected], (profile, allergies, msg)
+
+    linear_s = best_of(lambda: [linear_filter_products(products, p, a, m, []) for p, a, m in qs], args.repeat)
+    indexed_s = best_of(lambda: [indexed_filter_products(index, p, a, m, []) for p, a, m in qs], args.repeat)
+
+    n = len(qs)
+    print(f"catalog size      : {args.size:,}")
+    print(f"index build       : {build_s * 1000:.1f} ms")
+    print(f"linear scan       : {linear_s / n * 1000:.3f} ms/query")
+    print(f"bitset index      : {indexed_s / n * 1000:.3f} ms/query")
+    print(f"speed-up          : {linear_s / indexed_s:.0f}x  ({n} queries, results identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Catalog storage: load time and memory of list-of-dicts vs. the columnar store.
+
+    python -m benchmarks.bench_catalog_store --size 100000
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_catalog import make_catalog
+from skinsync.catalog import CatalogIndex
+from skinsync.catalog_store import Catalog, load_catalog, save_catalog
+
+
+def read_dicts(path):
+    # the old in-memory shape: one dict (and three lists) per product
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def measure(fn, repeat):
+    # (best seconds, retained bytes of the result, peak bytes while loading)
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = os.path.join(tmp, "products.jsonl")
+        npz = os.path.join(tmp, "products.npz")
+        save_catalog(Catalog.from_records(make_catalog(args.size)), jsonl)
+        save_catalog(load_catalog(jsonl), npz)
+
+        cases = [
+            ("list of dicts (.jsonl)", lambda: read_dicts(jsonl)),
+            ("columnar (.jsonl)", lambda: load_catalog(jsonl)),
+            ("columnar (.npz)", lambda: load_catalog(npz)),
+        ]
+        print(f"catalog size : {args.size:,}")
+        print(f"file size    : .jsonl {os.path.getsize(jsonl) / 1e6:.1f} MB, .npz {os.path.getsize(npz) / 1e6:.1f} MB")
+        print(f"{'':<24}{'load':>10}{'retained':>12}{'peak':>12}")
+        for label, fn in cases:
+            seconds, retained, peak = measure(fn, args.repeat)
+            print(f"{label:<24}{seconds * 1000:>8.0f}ms{retained / 1e6:>10.1f}MB{peak / 1e6:>10.1f}MB")
+
+        catalog = load_catalog(npz)
+        seconds, retained, _ = measure(lambda: CatalogIndex(catalog).ranker, args.repeat)
+        print(f"{'index build (ranker)':<24}{seconds * 1000:>8.0f}ms{retained / 1e6:>10.1f}MB")
+
+        # a full hot reload is load + index build, done off to the side
+        start = time.perf_counter()
+        CatalogIndex(load_catalog(npz))
+        print(f"hot reload (.npz)       : {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Pooled HttpClient vs. one-off requests.post against a local stand-in server.
+
+    python -m benchmarks.bench_http_client --calls 200
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from skinsync.http_client import HttpClient
+
+REPLY = json.dumps({"choices": [{"message": {"content": "{\"summary\": \"ok\"}"}}]}).encode()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    connections = 0
+    _lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        # headers and body go out in separate writes; don't let Nagle hold the body
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with _StandInHandler._lock:
+            _StandInHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(REPLY)))
+        self.end_headers()
+        self.wfile.write(REPLY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in_server():
+    server = ThreadingHTTPServer(("localhost", 0), _StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(label, post, calls):
+    _StandInHandler.connections = 0
+    start = time.perf_counter()
+    for _ in range(calls):
+        resp = post()
+        resp.raise_for_status()
+        resp.json()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18}: {elapsed / calls * 1000:.3f} ms/call, {_StandInHandler.connections} TCP connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_stand_in_server()
+    url = f"http://localhost:{server.server_port}/api/v1/chat/completions"
+    payload = {"model": "stand-in", "messages": [{"role": "user", "content": "hi"}]}
+    headers = {"Authorization": "Bearer test", "Content-Type": "application/json"}
+
+    run("requests.post", lambda: requests.post(url, headers=headers, json=payload, timeout=25), args.calls)
+
+    client = HttpClient(headers)
+    run("pooled HttpClient", lambda: client.post_json(url, payload), args.calls)
+
+    metrics = client.metrics()
+    print(f"reuse rate        : {metrics['reuse_rate']:.1%}")
+    print("first call        : " + ", ".join(
+        f"{k}={v:.2f}" for k, v in client._recent[0].items() if k.endswith("_ms")))
+    print("avg (last window) : " + ", ".join(
+        f"{k[4:]}={v:.2f}" for k, v in metrics.items() if k.startswith("avg_")))
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
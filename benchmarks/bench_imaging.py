@@ -0,0 +1,123 @@
+"""Redness scoring: original float32 pipeline vs. the int16 single and batch paths.
+
+    python -m benchmarks.bench_imaging --photos 8 --width 1200 --height 900
+    python -m benchmarks.bench_imaging --large-mp 48   # bounded-memory path
+
+Also checks that the new scores agree with the original function (exactly
+for the single-image path, within --tolerance for the resized batch path).
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from skinsync.imaging import MEMORY_BUDGET, analyze_skin_image, analyze_skin_images, open_scan_image
+
+
+def original_analyze_skin_image(image):
+    # the pre-vectorisation implementation, kept verbatim as the reference
+    img = image.convert("RGB")
+    arr = np.array(img).astype("float32")
+    r = arr[:, :, 0]
+    g = arr[:, :, 1]
+    b = arr[:, :, 2]
+    redness = r - (g + b) / 2
+    diff = redness.max() - redness.min()
+    if diff < 1e-6:
+        diff = 1e-6
+    normalized = (redness - redness.min()) / diff
+    return float(np.mean(normalized))
+
+
+def make_photo(width, height, seed):
+    # skin-ish gradient + a few red blotches + sensor noise
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    img = np.empty((height, width, 3), dtype=np.float32)
+    img[..., 0] = 180 + 40 * np.sin(xx / width * 3 + seed)
+    img[..., 1] = 140 + 30 * np.cos(yy / height * 2)
+    img[..., 2] = 120 + 20 * np.sin((xx + yy) / (height + width) * 5)
+    for _ in range(20):
+        cy, cx, r = rng.integers(0, height), rng.integers(0, width), rng.integers(5, 40)
+        img[..., 0] += 60 * np.exp(-((yy - cy) ** 2 + (xx - cx) ** 2) / (2.0 * r * r))
+    img += rng.normal(0, 8, img.shape).astype(np.float32)
+    return Image.fromarray(np.clip(img, 0, 255).astype(np.uint8))
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_large(megapixels):
+    # a phone-camera sized JPEG: full decode + original scoring vs. draft
+    # decode + strip-wise scoring under MEMORY_BUDGET
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    big = make_photo(800, 600, 1).resize((width, height), Image.BILINEAR)
+    buf = io.BytesIO()
+    big.save(buf, "JPEG", quality=90)
+    data = buf.getvalue()
+    del big
+
+    def full():
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return original_analyze_skin_image(image)
+
+    def bounded():
+        return analyze_skin_image(open_scan_image(data))[0]
+
+    ref, ref_s, ref_peak = measure(full)
+    got, got_s, got_peak = measure(bounded)
+    print(f"{width}x{height} JPEG ({width * height / 1e6:.0f} MP), budget {MEMORY_BUDGET / 2**20:.0f} MiB")
+    print(f"full decode      : {ref_s * 1000:7.0f} ms, peak {ref_peak / 2**20:7.1f} MiB")
+    print(f"bounded          : {got_s * 1000:7.0f} ms, peak {got_peak / 2**20:7.1f} MiB")
+    print(f"|score diff|     : {abs(ref - got):.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--photos", type=int, default=8)
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--height", type=int, default=900)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--large-mp", type=float, default=0)
+    args = parser.parse_args()
+
+    if args.large_mp:
+        bench_large(args.large_mp)
+        return
+
+    photos = [make_photo(args.width, args.height, seed) for seed in range(args.photos)]
+    n = len(photos)
+
+    ref, ref_s, ref_peak = measure(lambda: [original_analyze_skin_image(p) for p in photos])
+    single, single_s, single_peak = measure(lambda: [analyze_skin_image(p)[0] for p in photos])
+    batch, batch_s, batch_peak = measure(lambda: [s for s, _ in analyze_skin_images(photos)])
+
+    single_err = max(abs(a - b) for a, b in zip(ref, single))
+    batch_err = max(abs(a - b) for a, b in zip(ref, batch))
+    assert single_err < 1e-5, f"single-image score drifted by {single_err}"
+    assert batch_err < args.tolerance, f"batch score drifted by {batch_err} (tolerance {args.tolerance})"
+
+    print(f"{n} photos at {args.width}x{args.height}")
+    for label, s, peak in (
+        ("original float32", ref_s, ref_peak),
+        ("int16 single", single_s, single_peak),
+        ("int16 batch", batch_s, batch_peak),
+    ):
+        print(f"{label:<17}: {s / n * 1000:7.2f} ms/photo, peak {peak / 2**20:7.1f} MiB")
+    print(f"max |score diff|  : single {single_err:.2e}, batch {batch_err:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Cold-start import report: every page imported up front vs. the lazy router.
+
+    python -m benchmarks.bench_importtime --repeat 5
+
+Each scenario runs in a fresh interpreter with -X importtime. Streamlit is
+imported first and left out of the totals: the server process has it loaded
+before app.py runs, so what's left is what the app itself adds to a cold
+start. "wall" also covers import-time side effects such as creating tables.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE_MODULES = ["views.home", "views.chat", "views.scan", "views.appointments", "views.history", "views.diary"]
+
+SCENARIOS = {
+    # what app.py did before the split: every page's imports and setup
+    "eager (all pages)": PAGE_MODULES,
+    "lazy: home": ["views.home"],
+    "lazy: chat": ["views.chat"],
+    "lazy: scan": ["views.scan"],
+    "lazy: history": ["views.history"],
+}
+
+SNIPPET = """
+import time, streamlit, dotenv
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)  # importlib.import_module bypasses -X importtime logging
+print("wall_ms", (time.perf_counter() - start) * 1000)
+"""
+
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package", children are
+    # printed before their parent and indented one extra space per level
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line.split(":", 1)[1].split("|")
+        depth = len(name) - len(name.lstrip(" ")) - 1
+        rows.append((name.strip(), int(self_us), int(cumulative), depth))
+    return rows
+
+
+def app_imports(rows):
+    # everything loaded after the streamlit/dotenv preamble
+    names = [r[0] for r in rows]
+    start = names.index("dotenv") + 1 if "dotenv" in names else 0
+    return rows[start:]
+
+
+def run_scenario(modules, workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT, SKINSYNC_DB_PATH=os.path.join(workdir, "cold.db"),
+               SKINSYNC_LLM_CACHE="0")
+    try:
+        os.remove(env["SKINSYNC_DB_PATH"])  # first run on a fresh box: tables don't exist yet
+    except FileNotFoundError:
+        pass
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET.format(modules=modules)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    wall_ms = float(proc.stdout.split()[-1])
+    top = app_imports(parse_importtime(proc.stderr))
+    return sum(r[2] for r in top if r[3] == 0) / 1000, wall_ms, top
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="skinsync-importtime-") as workdir:
+        print(f"{'scenario':<20} {'imports ms':>10} {'wall ms':>9} {'modules':>8}")
+        report = {}
+        for label, modules in SCENARIOS.items():
+            runs = [run_scenario(modules, workdir) for _ in range(args.repeat)]
+            import_ms = min(r[0] for r in runs)
+            wall_ms = min(r[1] for r in runs)
+            report[label] = (import_ms, wall_ms, runs[0][2])
+            print(f"{label:<20} {import_ms:>10.1f} {wall_ms:>9.1f} {len(runs[0][2]):>8}")
+
+    eager, home = report["eager (all pages)"], report["lazy: home"]
+    print(f"\nhome cold start: {eager[1]:.1f} ms -> {home[1]:.1f} ms wall ({eager[1] / max(home[1], 1e-3):.0f}x)")
+    print("heaviest imports pulled in by the pages (cumulative):")
+    deps = [r for r in eager[2] if 0 < r[3] <= 3 and not r[0].startswith("views")]
+    for name, _, cumulative, _ in sorted(deps, key=lambda r: -r[2])[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Prompt size per chat request: JSON product list vs. the compact table.
+
+    python -m benchmarks.bench_prompt_tokens
+    python -m benchmarks.bench_prompt_tokens --budget 250 --catalog-size 10000
+
+Token counts are skinsync.prompting.estimate_tokens (no tokenizer needed).
+"""
+import argparse
+import statistics
+
+from benchmarks.bench_catalog import MESSAGES, PROFILES, make_catalog
+from benchmarks.suite import ALLERGY_TEXTS
+from skinsync.catalog import filter_products, format_products_for_prompt, rebuild_catalog_index
+from skinsync.heuristics import extract_allergies_from_text
+from skinsync.prompting import SYSTEM_PROMPT, estimate_tokens, product_payload
+
+# what users actually type into the coach, beyond the allergy/intent samples
+CHAT_MESSAGES = [
+    "I keep breaking out on my forehead and chin, what should I use?",
+    "my cheeks are red and sting after every cleanser",
+    "dark spots from old acne won't fade",
+    "I'm 27 and starting to see fine lines around my eyes",
+    "skin gets really oily by noon but flaky around my nose",
+    "need a simple routine, I don't like lots of steps",
+    "is niacinamide ok if I have sensitive skin?",
+    "what sunscreen won't break me out",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=None, help="token budget (default: SKINSYNC_PROMPT_TOKEN_BUDGET)")
+    parser.add_argument("--catalog-size", type=int, default=0, help="synthetic catalog instead of the real one")
+    args = parser.parse_args()
+
+    if args.catalog_size:
+        rebuild_catalog_index(make_catalog(args.catalog_size))
+
+    texts = [m for m in MESSAGES + ALLERGY_TEXTS + CHAT_MESSAGES if m]
+    # the table paragraph is new system-prompt text, charged to every request
+    table_note = SYSTEM_PROMPT[SYSTEM_PROMPT.index("'allowed_products' is a table"):SYSTEM_PROMPT.index("Rules:")]
+    note_tokens = estimate_tokens(table_note)
+
+    old, new, shown, kept = [], [], [], []
+    for profile in PROFILES:
+        for text in texts:
+            allergies = extract_allergies_from_text(text)
+            allowed = filter_products(profile, allergies, text)
+            payload, products = product_payload(allowed, budget=args.budget)
+            old.append(estimate_tokens(f"allowed_products = {format_products_for_prompt(allowed)}"))
+            new.append(estimate_tokens(f"allowed_products =\n{payload}") + note_tokens)
+            shown.append(len(allowed))
+            kept.append(len(products))
+
+    saved = [o - n for o, n in zip(old, new)]
+    system = estimate_tokens(SYSTEM_PROMPT)
+    print(f"requests          : {len(old)} ({len(PROFILES)} profiles x {len(texts)} messages)")
+    print(f"system prompt     : {system} tokens ({note_tokens} of them describe the table)")
+    print(f"products, JSON    : {statistics.mean(old):.0f} tokens/request (median {statistics.median(old):.0f})")
+    print(f"products, table   : {statistics.mean(new):.0f} tokens/request (median {statistics.median(new):.0f}, incl. table note)")
+    print(f"saved per request : {statistics.mean(saved):.0f} tokens mean, {min(saved)}..{max(saved)} range")
+    print(f"whole prompt      : {statistics.mean(o + system - note_tokens for o in old):.0f} -> "
+          f"{statistics.mean(n + system - note_tokens for n in new):.0f} tokens "
+          f"({statistics.mean(saved) / statistics.mean(o + system - note_tokens for o in old):.0%} smaller)")
+    print(f"products kept     : {sum(kept)}/{sum(shown)} (budget trimmed {sum(s - k for s, k in zip(shown, kept))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Product ranking: top-k per category vs. a full sort, and vs. the old yes/no filter.
+
+    python -m benchmarks.bench_ranking --size 100000 --size 300000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_catalog import ALLERGY_SETS, MESSAGES, PROFILES, BitsetIndex, make_catalog
+from benchmarks.bench_prompt_tokens import CHAT_MESSAGES
+from skinsync.catalog import CatalogIndex, get_catalog_index
+from skinsync.heuristics import is_user_adult, scan_text
+from skinsync.ranking import CONCERN_TAGS, EXCLUDED
+
+
+def reference_top(ranker, profile, allergies, is_adult, text, per_category=3, limit=12):
+    # same answer as Ranker.top, by sorting every score
+    scores = ranker.scores(ranker.weights(profile, text, is_adult)).astype(np.int64)
+    if not is_adult:
+        scores[ranker.adult_only] = EXCLUDED
+    for allergy in allergies:
+        for key in (allergy, allergy.replace("_", " ")):
+            if key in ranker.ingredients:
+                scores[ranker.ingredients[key]] = EXCLUDED
+    picked = []
+    for _, a, b in ranker.segments:
+        positions = np.arange(a, b)
+        positions = positions[scores[a:b] > EXCLUDED]
+        picked.extend(positions[np.lexsort((ranker.rows[positions], -scores[positions]))][:per_category])
+    picked = np.array(picked, dtype=np.int64)
+    rows = ranker.rows[picked]
+    return rows[np.lexsort((rows, -scores[picked]))][:limit].tolist()
+
+
+def queries():
+    for profile in PROFILES:
+        adult = is_user_adult(profile, [])
+        for msg in MESSAGES + CHAT_MESSAGES:
+            for allergies in ALLERGY_SETS:
+                yield profile, allergies, adult, msg
+
+
+def best_ms(fn, repeat=5, number=50):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1000
+
+
+def relevant(p, profile, text):
+    # a product "fits" if it suits the skin type and names a concern asked about
+    skin = profile["skin_type"].lower()
+    stypes = {s.lower() for s in p["skin_types"]}
+    groups = scan_text(f"{profile['main_concern']} {text}".lower()).values("concern")
+    wanted = {t for g in groups for t in CONCERN_TAGS.get(g, [])}
+    return (skin in stypes or "all" in stypes) and bool(wanted & set(p["concerns"]))
+
+
+def quality():
+    # share of the first five suggestions that fit, on the real catalog
+    index = get_catalog_index()
+    baseline = BitsetIndex(index.catalog)
+    old = new = total = 0
+    for profile, allergies, adult, msg in queries():
+        wants_acne = scan_text(msg).has("concern", "acne") or "acne" in profile["main_concern"].lower()
+        before = baseline.shortlist(profile["skin_type"].lower(), allergies, adult, wants_acne)[:5]
+        after = index.ranked(profile, allergies, adult, msg)[:5]
+        old += sum(relevant(p, profile, msg) for p in before)
+        new += sum(relevant(p, profile, msg) for p in after)
+        total += 5
+    print(f"real catalog, first 5 that fit skin type + asked-about concern: "
+          f"filter {old / total:.0%} -> ranking {new / total:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, action="append")
+    args = parser.parse_args()
+
+    quality()
+    for size in args.size or [100_000]:
+        index = CatalogIndex(make_catalog(size))
+        start = time.perf_counter()
+        ranker = index.ranker
+        build_ms = (time.perf_counter() - start) * 1000
+
+        qs = list(queries())
+        for q in qs:
+            assert ranker.top(*q) == reference_top(ranker, *q), q
+        warm = sorted(best_ms(lambda: ranker.top(*q), repeat=3, number=10) for q in qs)
+        cold = sorted(best_ms(lambda: (ranker._score_cache.clear(), ranker.top(*q)), repeat=3, number=10) for q in qs)
+        profile, allergies, adult, msg = qs[0]
+        w = ranker.weights(profile, msg, adult)
+        matvec = best_ms(lambda: (ranker._score_cache.clear(), ranker.scores(w)))
+        print(f"{size:>9,} products: build {build_ms:.0f} ms, matrix-vector {matvec:.3f} ms, "
+              f"query p50/max: new weights {cold[len(qs) // 2]:.3f}/{cold[-1]:.3f} ms, "
+              f"cached weights {warm[len(qs) // 2]:.3f}/{warm[-1]:.3f} ms "
+              f"({len(qs)} queries, identical to a full sort)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Bytes of page elements Streamlit sends per run: first load vs. a rerun.
+
+    python -m benchmarks.bench_rerun_payload
+    python -m benchmarks.bench_rerun_payload --app /path/to/other/app.py
+    python -m benchmarks.bench_rerun_payload --chat-turns 300
+
+Sums the serialised size of every element delta in the run (what goes over
+the websocket, minus framing), using Streamlit's AppTest harness, so it
+runs headless. A rerun is what any widget interaction triggers. With
+--chat-turns the chat page starts with that many user/coach exchanges
+already in the session, to see how the transcript scales.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["home", "chat", "scan", "appointments", "history", "diary"]
+
+
+def element_bytes(at):
+    def walk(node):
+        children = getattr(node, "children", None)
+        if children:
+            for child in children.values():
+                yield from walk(child)
+        elif getattr(node, "proto", None) is not None:
+            yield node.proto.ByteSize()
+    return sum(walk(at._tree))
+
+
+def chat_transcript(turns):
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "text": f"my cheeks are red and sting after every cleanser ({i})"})
+        messages.append({"role": "assistant", "text": (
+            "💗 **Summary:**\nA gentle routine for sensitive skin.\n\n🌞 **AM Routine:**\n"
+            "• Cleanser: Cetaphil Gentle Skin Cleanser\n• Moisturizer: CeraVe Moisturising Lotion\n"
+            "• Sunscreen: Minimalist SPF 50 Multi-Vitamin\n\n⚠️ Stop anything that stings."
+        )})
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--chat-turns", type=int, default=0, help="seed the chat page with this many exchanges")
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    app_dir = os.path.dirname(os.path.abspath(args.app))
+    sys.path.insert(0, app_dir)
+    with tempfile.TemporaryDirectory(prefix="skinsync-payload-") as workdir:
+        os.environ["SKINSYNC_DB_PATH"] = os.path.join(workdir, "payload.db")
+        os.environ.setdefault("SKINSYNC_METRICS_SINK", "none")
+        print(f"{'page':<14} {'first run':>10} {'rerun':>10} {'rerun ms':>9}")
+        for page in PAGES:
+            at = AppTest.from_file(args.app, default_timeout=30)
+            at.query_params["page"] = page
+            if page == "chat" and args.chat_turns:
+                at.session_state["consent"] = True
+                at.session_state["messages_beta"] = chat_transcript(args.chat_turns)
+            at.run()
+            if at.exception:
+                raise SystemExit(f"{page}: {at.exception[0].value}")
+            first = element_bytes(at)
+            start = time.perf_counter()
+            at.run()
+            rerun_ms = (time.perf_counter() - start) * 1000
+            rerun = element_bytes(at)
+            print(f"{page:<14} {first:>10,} {rerun:>10,} {rerun_ms:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Form inserts under concurrent users: a transaction per insert vs. the write-behind queue.
+
+    python -m benchmarks.bench_write_queue
+    python -m benchmarks.bench_write_queue --users 32 --writes 200
+
+Each user thread submits diary entries and consults one after another and
+waits for each to commit before the next, as a page waiting on its
+acknowledgement does. Both sides commit with synchronous=FULL, as the
+queue's writer does, so every acknowledged insert is durable. Runs on a
+throwaway SQLite file.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.suite import make_consult_blob
+from skinsync.storage import Storage, immediate_transaction, write_consult, write_diary
+from skinsync.write_queue import WriteQueue
+
+
+def user_writes(seed, n):
+    rng = random.Random(seed)
+    writes = []
+    for i in range(n):
+        if i % 2:
+            writes.append((write_consult, ("bench", make_consult_blob(rng), "2026-01-01 10:00:00")))
+        else:
+            day = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            writes.append((write_diary, (day, "😊 Good", rng.randint(0, 10), rng.randint(0, 10),
+                                         7.0, 6, "", "2026-01-01 10:00:00")))
+    return writes
+
+
+def run_users(per_user, do_write):
+    errors = []
+
+    def user(writes):
+        try:
+            for write, args in writes:
+                do_write(write, args)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=user, args=(w,)) for w in per_user]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise SystemExit(f"write failed: {errors[0]!r}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=100, help="per user")
+    args = parser.parse_args()
+
+    per_user = [user_writes(seed, args.writes) for seed in range(args.users)]
+    total = args.users * args.writes
+    with tempfile.TemporaryDirectory(prefix="skinsync-writes-") as workdir:
+        storage = Storage(os.path.join(workdir, "writes.db"))
+        storage.init_schema()
+
+        local = threading.local()
+
+        def direct(write, write_args):
+            # one synchronous=FULL connection per user thread
+            if not hasattr(local, "conn"):
+                local.conn = storage.dedicated_connection(synchronous="FULL")
+            with immediate_transaction(local.conn) as conn:
+                write(conn, *write_args)
+
+        direct_s = run_users(per_user, direct)
+
+        writes = WriteQueue(storage)
+        queued_s = run_users(per_user, lambda write, write_args: writes.submit(write, *write_args).result())
+        writes.close()
+
+        rows = storage.query("SELECT (SELECT COUNT(*) FROM consults), (SELECT COUNT(*) FROM diary)")[0]
+        assert sum(rows) == 2 * total, rows
+
+    c = writes.counters
+    print(f"{args.users} users x {args.writes} inserts (half consults, half diary entries)")
+    print(f"transaction per insert : {total / direct_s:>8,.0f} inserts/s")
+    print(f"write-behind queue     : {total / queued_s:>8,.0f} inserts/s "
+          f"({direct_s / queued_s:.1f}x, {c['batches']} commits, {c['writes'] / c['batches']:.1f} inserts/commit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""Headless benchmark suite for the app's hot paths, with a saved baseline.
+
+    python -m benchmarks.suite --save-baseline        # record this machine's numbers
+    python -m benchmarks.suite                        # compare, exit 1 on regression
+    python -m benchmarks.suite --scale full --only db_
+
+Runs offline on synthetic data: a generated catalog, multi-megapixel JPEGs
+and a throwaway SQLite file with --db-rows consults. Each case reports the
+best time per operation over --repeat runs (the least noisy
+estimate on a shared box); a case regresses when it is
+more than --threshold slower than the baseline for the same scale, after
+correcting for how fast the machine is running right now. Baselines
+are per machine, so record one before comparing.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.bench_catalog import PROFILES, make_catalog
+from benchmarks.bench_imaging import make_photo
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SCALES = {
+    "quick": {"catalog": 10_000, "megapixels": 4, "db_rows": 100_000, "blobs": 20_000},
+    "full": {"catalog": 100_000, "megapixels": 24, "db_rows": 2_000_000, "blobs": 200_000},
+}
+
+ALLERGY_TEXTS = [
+    "I'm allergic to niacinamide and fragrance",
+    "no allergies, just oily skin and some pimples on my forehead",
+    "vitamin c stings, also salicylic acid makes me red",
+    "my skin feels tight after washing, what moisturizer should I use?",
+]
+SKIN_TYPES = ["Oily", "Dry", "Combination", "Normal", "Sensitive", "Not sure"]
+CONCERNS = [
+    "Acne / Breakouts", "Pigmentation / Dark spots", "Redness / Sensitivity",
+    "Dryness / Flakiness", "Anti-aging / Fine lines",
+]
+PLAN_PRODUCTS = ["CeraVe Foaming Cleanser", "Cetaphil Gentle Skin Cleanser", "Minimalist 2% Salicylic Acid Cleanser"]
+SEARCHES = ["salicylic", "niacinamide fragrance", "tight moisturizer", "cetaphil", "pimples forehead", "vitamin c"]
+MOODS = ["😊 Good", "😐 Okay", "😣 Bad"]
+CITIES = ["Mumbai", "Delhi", "Bengaluru", "Pune", "Chennai", "Other"]
+# diary entries are spread over ten years of days
+DIARY_START = date(2016, 1, 1)
+DIARY_DAYS = 3650
+
+
+# ==========================================
+# SYNTHETIC DATA
+# ==========================================
+def make_consult_blob(rng):
+    return json.dumps({
+        "profile": {
+            "skin_type": rng.choice(SKIN_TYPES),
+            "main_concern": rng.choice(CONCERNS),
+            "age_bucket": rng.choice(["<18", "18–24", "25–30", "30–40", "40+"]),
+        },
+        "conversation": [
+            {"role": "user", "text": rng.choice(ALLERGY_TEXTS)},
+            {"role": "assistant", "text": "Here is a gentle routine for you."},
+        ],
+        "allergies": rng.sample(["niacinamide", "fragrance", "vitamin_c", "retinol"], rng.randint(0, 2)),
+        "last_plan": {
+            "summary": "Gentle routine",
+            "am_routine": [{"step": "Cleanser", "product": rng.choice(PLAN_PRODUCTS)}],
+        } if rng.random() < 0.7 else None,
+    }, ensure_ascii=False)
+
+
+def make_jpeg(megapixels, seed=1):
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    photo = make_photo(800, 600, seed).resize((width, height))
+    buf = io.BytesIO()
+    photo.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def populate_db(storage, rows, seed=3):
+    # bulk load in large transactions; the app's one-row-per-transaction
+    # path is measured separately by db_insert
+    from skinsync.consult_search import backfill_consults_fts
+    from skinsync.diary_stats import rebuild_diary_daily
+    from skinsync.storage import consult_fields
+
+    rng = random.Random(seed)
+    blobs = [make_consult_blob(rng) for _ in range(1000)]
+    chunk = 50_000
+    with storage.transaction() as conn:
+        for start in range(0, rows, chunk):
+            batch = []
+            for _ in range(min(chunk, rows - start)):
+                data = rng.choice(blobs)
+                batch.append(("bench", data, "2026-01-01 10:00:00", *consult_fields(data)))
+            conn.executemany(
+                "INSERT INTO consults (session_id,data,created_at,skin_type,main_concern,allergies_count,has_plan) "
+                "VALUES (?,?,?,?,?,?,?)",
+                batch,
+            )
+        conn.executemany(
+            "INSERT INTO diary (entry_date,mood,redness,oiliness,sleep_hours,water_glasses,note,created_at) "
+            "VALUES (?,?,?,?,?,?,?,?)",
+            [(str(DIARY_START + timedelta(days=i % DIARY_DAYS)), rng.choice(MOODS), rng.randint(0, 10),
+              rng.randint(0, 10), rng.uniform(4, 9), rng.randint(0, 12), "", "")
+             for i in range(rows // 10)],
+        )
+        conn.executemany(
+            "INSERT INTO bookings (name,email,city,date,time,reason,created_at) VALUES (?,?,?,?,?,?,?)",
+            [("Bench", "b@example.com", rng.choice(CITIES), "2026-01-02", "10:00", "acne", "")
+             for _ in range(rows // 10)],
+        )
+    rebuild_diary_daily(storage)
+    backfill_consults_fts(storage)
+
+
+# ==========================================
+# CASES
+# ==========================================
+# Each case takes the scale config and returns (run, ops): run() does `ops`
+# operations of the thing being measured, enough of them that one run takes
+# tens of milliseconds and timer noise stays small.
+def case_filter_products(cfg, ctx):
+    from skinsync.catalog import filter_products, rebuild_catalog_index
+
+    rebuild_catalog_index(make_catalog(cfg["catalog"]))
+    queries = [(p, a, m) for p in PROFILES for a in ([], ["niacinamide"], ["fragrance", "retinol"])
+               for m in ALLERGY_TEXTS] * 50
+
+    def run():
+        for profile, allergies, msg in queries:
+            filter_products(profile, allergies, msg)
+    return run, len(queries)
+
+
+def case_format_prompt(cfg, ctx):
+    from skinsync.catalog import format_products_for_prompt
+
+    shortlist = make_catalog(12)
+    return lambda: [format_products_for_prompt(shortlist) for _ in range(200)], 200
+
+
+def case_prompt_payload(cfg, ctx):
+    from skinsync.prompting import product_payload
+
+    shortlists = [make_catalog(12, seed=i) for i in range(20)]
+    return lambda: [product_payload(s) for s in shortlists * 10], len(shortlists) * 10
+
+
+def case_local_routine(cfg, ctx):
+    from skinsync.heuristics import is_user_adult
+    from skinsync.routine import build_routine
+
+    # the offline routine from a ranked-sized shortlist, per profile and message
+    shortlists = [make_catalog(12, seed=i) for i in range(20)]
+    queries = [(s, p, is_user_adult(p, []), m) for s in shortlists for p in PROFILES for m in ALLERGY_TEXTS]
+    return lambda: [build_routine(*q) for q in queries], len(queries)
+
+
+def case_chat_signals(cfg, ctx):
+    from skinsync.heuristics import ConversationSignals, scan_text
+
+    # a 1000-send conversation, signals updated after every send as the chat
+    # page does; cost per send should not grow with the history
+    texts = [f"{ALLERGY_TEXTS[i % len(ALLERGY_TEXTS)]} ({i})" for i in range(1000)]
+
+    def run():
+        scan_text.cache_clear()
+        signals = ConversationSignals()
+        messages = []
+        for text in texts:
+            messages.append({"role": "user", "text": text})
+            signals.update(messages)
+            messages.append({"role": "assistant", "text": "Here's a gentle routine."})
+    return run, len(texts)
+
+
+def case_extract_allergies(cfg, ctx):
+    from skinsync.heuristics import extract_allergies_from_text, scan_text
+
+    rng = random.Random(5)
+    # distinct texts so the scan_text LRU doesn't turn this into a dict lookup
+    texts = [f"{rng.choice(ALLERGY_TEXTS)} ({i})" for i in range(2000)]
+
+    def run():
+        scan_text.cache_clear()
+        for t in texts:
+            extract_allergies_from_text(t)
+    return run, len(texts)
+
+
+def case_analyze_image(cfg, ctx):
+    from skinsync.imaging import analyze_skin_image, open_scan_image
+
+    data = make_jpeg(cfg["megapixels"])
+    return lambda: analyze_skin_image(open_scan_image(data)), 1
+
+
+def case_history_parse(cfg, ctx):
+    from skinsync.storage import consult_fields
+
+    rng = random.Random(11)
+    blobs = [make_consult_blob(rng) for _ in range(cfg["blobs"])]
+    return lambda: [consult_fields(b) for b in blobs], len(blobs)
+
+
+def case_db_insert(cfg, ctx):
+    storage = ctx["storage"]
+    rng = random.Random(13)
+    blobs = [make_consult_blob(rng) for _ in range(200)]
+
+    def run():
+        for data in blobs:
+            storage.insert_consult("bench", data, "2026-01-01 10:00:00")
+    return run, len(blobs)
+
+
+def case_db_insert_queued(cfg, ctx):
+    from skinsync.storage import write_consult
+    from skinsync.write_queue import WriteQueue
+
+    # the same inserts through the write-behind queue, acknowledged as a batch
+    writes = WriteQueue(ctx["storage"])
+    rng = random.Random(13)
+    blobs = [make_consult_blob(rng) for _ in range(200)]
+
+    def run():
+        acks = [writes.submit(write_consult, "bench", data, "2026-01-01 10:00:00") for data in blobs]
+        for ack in acks:
+            ack.result()
+    return run, len(blobs)
+
+
+def case_db_history_page(cfg, ctx):
+    storage = ctx["storage"]
+    rng = random.Random(17)
+    # deep cursors with a selective filter: the worst case for an OFFSET scan
+    cursors = [rng.randrange(cfg["db_rows"] // 10, cfg["db_rows"]) for _ in range(50)]
+
+    def run():
+        for before_id in cursors:
+            storage.list_consults(skin_type="Oily", before_id=before_id, limit=100)
+    return run, len(cursors)
+
+
+def case_db_diary_page(cfg, ctx):
+    storage = ctx["storage"]
+    return lambda: [storage.list_diary(mood=m) for m in MOODS * 10], 30
+
+
+def case_db_consult_detail(cfg, ctx):
+    storage = ctx["storage"]
+    rng = random.Random(19)
+    ids = [rng.randrange(1, cfg["db_rows"]) for _ in range(500)]
+    return lambda: [json.loads(storage.get_consult(i)[0]) for i in ids], len(ids)
+
+
+def case_db_consult_search(cfg, ctx):
+    storage = ctx["storage"]
+    # the history page's search box: ranked matches with snippets
+    queries = [(q, skin) for q in SEARCHES for skin in (None, "Oily")]
+    return lambda: [storage.search_consults(q, skin_type=skin, limit=50) for q, skin in queries], len(queries)
+
+
+def case_db_diary_trends(cfg, ctx):
+    from skinsync import diary_stats
+
+    storage = ctx["storage"]
+    end = DIARY_START + timedelta(days=DIARY_DAYS - 1)
+
+    def run():
+        # the "All time" trends view: every day's aggregates, rolled and correlated
+        daily = storage.diary_daily()
+        diary_stats.rolling_trends(daily, DIARY_START, end)
+        diary_stats.correlations(daily)
+    return run, 1
+
+
+CASES = {
+    "filter_products": case_filter_products,
+    "format_prompt": case_format_prompt,
+    "prompt_payload": case_prompt_payload,
+    "local_routine": case_local_routine,
+    "extract_allergies": case_extract_allergies,
+    "chat_signals": case_chat_signals,
+    "analyze_image": case_analyze_image,
+    "history_parse": case_history_parse,
+    "db_insert": case_db_insert,
+    "db_insert_queued": case_db_insert_queued,
+    "db_history_page": case_db_history_page,
+    "db_diary_page": case_db_diary_page,
+    "db_consult_detail": case_db_consult_detail,
+    "db_diary_trends": case_db_diary_trends,
+    "db_consult_search": case_db_consult_search,
+}
+
+
+# ==========================================
+# RUNNER
+# ==========================================
+def measure(run, ops, repeat):
+    run()  # warm-up: first-call imports, caches, page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) / ops)
+    return min(samples)
+
+
+def _calibration_work():
+    # fixed mix of interpreter, json and numpy work, unrelated to app code
+    import numpy as np
+
+    doc = {"items": [{"id": i, "name": f"item {i}", "tags": ["a", "b"]} for i in range(200)]}
+    for _ in range(20):
+        json.loads(json.dumps(doc))
+    sum(i * i for i in range(100_000))
+    np.sort(np.arange(200_000)[::-1])
+
+
+def calibrate(repeat):
+    # how fast this box is right now; results are compared after dividing out
+    # the ratio to the baseline's calibration, so a machine-wide slow spell
+    # (noisy neighbour, frequency scaling) doesn't read as a regression
+    return measure(_calibration_work, 1, repeat) * 1000
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, baseline):
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="quick")
+    parser.add_argument("--db-rows", type=int, help="override the scale's consult row count")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="", help="run cases whose name starts with this")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown, 0.3 = 30%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    cfg = dict(SCALES[args.scale])
+    if args.db_rows:
+        cfg["db_rows"] = args.db_rows
+    names = [n for n in CASES if n.startswith(args.only)]
+
+    tmp = tempfile.TemporaryDirectory(prefix="skinsync-bench-")
+    ctx = {}
+    if any(n.startswith("db_") for n in names):
+        from skinsync.storage import Storage
+
+        ctx["storage"] = Storage(os.path.join(tmp.name, "bench.db"))
+        ctx["storage"].init_schema()
+        start = time.perf_counter()
+        populate_db(ctx["storage"], cfg["db_rows"])
+        print(f"populated {cfg['db_rows']:,} consults in {time.perf_counter() - start:.1f} s")
+
+    baseline = load_baseline(args.baseline)
+    results = baseline.setdefault(args.scale, {})
+    regressions = []
+    calibration = calibrate(args.repeat * 2)
+    speed = 1.0
+    if results.get("_calibration") and not args.save_baseline:
+        # only ever forgive a slow spell; a "faster" reading is as likely to
+        # be a noisy calibration as a faster box, and must not fail the run
+        speed = max(1.0, calibration / results["_calibration"])
+        print(f"machine speed vs baseline: {results['_calibration'] / calibration:.2f}x")
+    print(f"{'case':<20} {'ms/op':>10} {'baseline':>10} {'change':>8}")
+    for name in names:
+        run, ops = CASES[name](cfg, ctx)
+        ms = measure(run, ops, args.repeat) * 1000
+        base = results.get(name)
+        change = ""
+        if base and not args.save_baseline:
+            if ms / speed > base * (1 + args.threshold):
+                # one slow window on a busy box shouldn't fail the run:
+                # confirm with a longer second measurement first
+                ms = min(ms, measure(run, ops, args.repeat * 3) * 1000)
+            ratio = ms / speed / base - 1
+            change = f"{ratio:+.0%}"
+            if ratio > args.threshold:
+                regressions.append(name)
+                change += "  REGRESSION"
+        base_col = f"{base:.4f}" if base is not None else "-"
+        print(f"{name:<20} {ms:>10.4f} {base_col:>10} {change}")
+        if args.save_baseline:
+            results[name] = round(ms, 6)
+    tmp.cleanup()
+    if args.save_baseline:
+        results["_calibration"] = round(calibration, 6)
+
+    if args.save_baseline:
+        baseline["_machine"] = {"python": platform.python_version(), "platform": platform.platform()}
+        save_baseline(args.baseline, baseline)
+        print(f"baseline saved to {args.baseline}")
+    elif not results:
+        print(f"no baseline for scale '{args.scale}' yet; run with --save-baseline")
+    if regressions:
+        print(f"regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# SkinSync core helpers that don't depend on Streamlit, so they can be
+# imported from app.py as well as from benchmarks and scripts.
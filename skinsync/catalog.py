@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+
+from skinsync.catalog_store import Catalog, file_signature, load_catalog
+from skinsync.heuristics import is_adult_age
+from skinsync.metrics import timed
+from skinsync.ranking import Ranker
+
+# ==========================================
+# CATALOG INDEX
+# ==========================================
+# One loaded catalog (columnar, skinsync.catalog_store) plus the ranker
+# built over it. Only the products a query returns are turned back into
+# dicts, and a reloaded catalog gets a whole new index.
+
+# materialised product dicts kept per index; queries keep hitting the
+# same well-scored rows, so this stays small in practice
+MAX_CACHED_PRODUCTS = 4096
+
+
+class CatalogIndex:
+    def __init__(self, catalog):
+        if not isinstance(catalog, Catalog):
+            catalog = Catalog.from_records(catalog)
+        self.catalog = catalog
+        self.size = catalog.size
+        self._rows = {}
+        self._ranker = None
+
+    @property
+    def ranker(self):
+        # feature matrix for filter_products, built on first use; a reloaded
+        # catalog gets a new index and so a new ranker
+        if self._ranker is None:
+            self._ranker = Ranker(self.catalog)
+        return self._ranker
+
+    def ranked(self, profile, allergies, is_adult, text, concerns=()):
+        # ranker's best rows as product dicts, unique by name
+        seen = set()
+        final = []
+        for i in self.ranker.top(profile, allergies, is_adult, text, concerns=concerns):
+            p = self.product(i)
+            if p["name"] not in seen:
+                seen.add(p["name"])
+                final.append(p)
+        return final
+
+    def product(self, i):
+        p = self._rows.get(i)
+        if p is None:
+            if len(self._rows) >= MAX_CACHED_PRODUCTS:
+                self._rows.clear()
+            p = self._rows[i] = self.catalog.product(i)
+        return p
+
+
+# ==========================================
+# CATALOG LOADING (lazy, hot-reloaded)
+# ==========================================
+# The catalog file is read on the first shortlist, not at import. After
+# that, at most every CATALOG_CHECK_SECONDS one caller stats the file; if it
+# changed, that caller loads it and builds a new index while everyone else
+# keeps using the old one, then the module-level reference is swapped in a
+# single assignment. A file that fails to load (e.g. copied over in place
+# and caught half written) leaves the previous index serving.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_PATH = os.getenv("SKINSYNC_CATALOG_PATH", os.path.join(ROOT, "catalog", "products.jsonl"))
+CATALOG_CHECK_SECONDS = float(os.getenv("SKINSYNC_CATALOG_CHECK_SECONDS", "2"))
+
+_index = None
+_signature = None
+_checked_at = 0.0
+_pinned = False  # set by rebuild_catalog_index(products): no file reloads
+_reload_lock = threading.Lock()
+
+
+def _maybe_reload():
+    global _index, _signature, _checked_at
+    # first load waits for the lock; later checks skip if someone else is on it
+    if not _reload_lock.acquire(blocking=_index is None):
+        return _index
+    try:
+        if _index is not None and (_pinned or time.monotonic() - _checked_at < CATALOG_CHECK_SECONDS):
+            return _index
+        _checked_at = time.monotonic()
+        try:
+            signature = file_signature(CATALOG_PATH)
+            if _index is not None and signature == _signature:
+                return _index
+            index = CatalogIndex(load_catalog(CATALOG_PATH))
+        except Exception:
+            if _index is None:
+                raise
+            return _index
+        _index, _signature = index, signature
+        return index
+    finally:
+        _reload_lock.release()
+
+
+def get_catalog_index():
+    index = _index
+    if index is not None and (_pinned or time.monotonic() - _checked_at < CATALOG_CHECK_SECONDS):
+        return index
+    return _maybe_reload()
+
+
+def rebuild_catalog_index(products=None):
+    # products=None: reload CATALOG_PATH now; otherwise serve exactly these
+    # (a list of dicts or a Catalog) until the next call without arguments
+    global _index, _signature, _pinned
+    with _reload_lock:
+        if products is None:
+            _pinned = False
+            _signature = file_signature(CATALOG_PATH)
+            _index = CatalogIndex(load_catalog(CATALOG_PATH))
+        else:
+            _pinned = True
+            _index = CatalogIndex(products)
+        return _index
+
+
+# ==========================================
+# PRODUCT FILTERING
+# ==========================================
+@timed()
+def filter_products(profile, allergies, main_intent_text, signals=None):
+    # best-scoring products for this profile and message (skinsync.ranking),
+    # a few per category, at most ~12 so the prompt doesn't explode.
+    # signals: the session's ConversationSignals, for adult evidence and
+    # concerns from earlier messages (None: the profile and this message only)
+    if signals is None:
+        return get_catalog_index().ranked(profile, allergies, is_adult_age(profile), main_intent_text)
+    return get_catalog_index().ranked(
+        profile, allergies, signals.is_adult(profile), main_intent_text, concerns=signals.concerns
+    )
+
+
+def format_products_for_prompt(products):
+    # compact JSON-ish string, but as plain text
+    lines = []
+    for p in products:
+        line = {
+            "name": p["name"],
+            "category": p["category"],
+            "skin_types": p["skin_types"],
+            "concerns": p["concerns"],
+            "irritation": p["irritation"],
+            "adult_only": p["adult_only"],
+            "price_range": p["price_range"],
+            "origin": p["origin"],
+        }
+        lines.append(line)
+    return json.dumps(lines, ensure_ascii=False)
@@ -0,0 +1,233 @@
+"""On-disk product catalog (columnar, interned strings).
+
+    python -m skinsync.catalog_store convert catalog/products.jsonl catalog/products.npz
+    python -m skinsync.catalog_store convert catalog/products.npz products.jsonl
+    python -m skinsync.catalog_store info catalog/products.npz
+
+catalog/products.jsonl (one product per line) is the editable source. For
+large catalogs, compile it to .npz and point SKINSYNC_CATALOG_PATH at that:
+loading it is a handful of array reads instead of parsing every product.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# ==========================================
+# COLUMNAR CATALOG
+# ==========================================
+# Products are stored column by column instead of one dict each. Every tag
+# string (brand, category, skin types, concerns, ingredients, ...) is stored
+# once in `strings` and referenced by int32 id; list fields are CSR pairs
+# (offsets, ids). Names are nearly unique, so they stay one UTF-8 blob and
+# are only decoded for the products a shortlist actually returns.
+
+FORMAT_VERSION = 1
+
+SCALARS = ["brand", "category", "strength", "irritation", "price_range", "origin"]
+LISTS = ["skin_types", "concerns", "ingredients"]
+FLAGS = ["fa_safe", "adult_only"]
+# key order of the product dicts handed to the rest of the app
+FIELDS = [
+    "name", "brand", "category", "skin_types", "concerns", "ingredients", "strength",
+    "irritation", "comodogenic", "fa_safe", "adult_only", "price_range", "origin",
+]
+
+
+def _pack_strings(values):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [sys.intern(data[a:b].decode("utf-8")) for a, b in zip(bounds, bounds[1:])]
+
+
+class Catalog:
+    def __init__(self, strings, names_blob, name_offsets, scalars, comodogenic, flags, lists):
+        self.strings = strings              # id -> interned str
+        self.names_blob = names_blob        # bytes
+        self.name_offsets = name_offsets    # int64[n + 1]
+        self.scalars = scalars              # field -> int32[n] string ids
+        self.comodogenic = comodogenic      # int16[n]
+        self.flags = flags                  # field -> bool[n]
+        self.lists = lists                  # field -> (int64[n + 1] offsets, int32[] string ids)
+        self.size = len(comodogenic)
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def from_records(cls, products):
+        vocab = {}
+
+        def intern(value):
+            i = vocab.get(value)
+            if i is None:
+                i = vocab[value] = len(vocab)
+            return i
+
+        names = []
+        scalars = {f: [] for f in SCALARS}
+        flags = {f: [] for f in FLAGS}
+        lists = {f: ([0], []) for f in LISTS}
+        comodogenic = []
+        for p in products:
+            names.append(p["name"])
+            for f in SCALARS:
+                scalars[f].append(intern(p.get(f, "")))
+            for f in FLAGS:
+                flags[f].append(bool(p.get(f, False)))
+            for f in LISTS:
+                offsets, ids = lists[f]
+                ids.extend(intern(v) for v in p.get(f, []))
+                offsets.append(len(ids))
+            comodogenic.append(int(p.get("comodogenic", 0)))
+
+        names_blob, name_offsets = _pack_strings(names)
+        return cls(
+            strings=[sys.intern(s) for s in vocab],
+            names_blob=names_blob.tobytes(),
+            name_offsets=name_offsets,
+            scalars={f: np.asarray(v, dtype=np.int32) for f, v in scalars.items()},
+            comodogenic=np.asarray(comodogenic, dtype=np.int16),
+            flags={f: np.asarray(v, dtype=bool) for f, v in flags.items()},
+            lists={f: (np.asarray(o, dtype=np.int64), np.asarray(i, dtype=np.int32))
+                   for f, (o, i) in lists.items()},
+        )
+
+    # ---- row access (only for the handful of products a query returns) ----
+
+    def name(self, i):
+        return self.names_blob[self.name_offsets[i]:self.name_offsets[i + 1]].decode("utf-8")
+
+    def product(self, i):
+        s = self.strings
+        p = {"name": self.name(i)}
+        for f in SCALARS:
+            p[f] = s[self.scalars[f][i]]
+        for f in LISTS:
+            offsets, ids = self.lists[f]
+            p[f] = [s[j] for j in ids[offsets[i]:offsets[i + 1]].tolist()]
+        p["comodogenic"] = int(self.comodogenic[i])
+        for f in FLAGS:
+            p[f] = bool(self.flags[f][i])
+        return {f: p[f] for f in FIELDS}
+
+    def records(self):
+        return [self.product(i) for i in range(self.size)]
+
+    # ---- column access (for building indexes) -----------------------------
+
+    def occurrences(self, field):
+        # (row, string id) pairs for every value of a list or scalar field
+        if field in self.lists:
+            offsets, ids = self.lists[field]
+            rows = np.repeat(np.arange(self.size, dtype=np.int32), np.diff(offsets))
+            return rows, ids
+        return np.arange(self.size, dtype=np.int32), self.scalars[field]
+
+    def nbytes(self):
+        arrays = [self.name_offsets, self.comodogenic, *self.scalars.values(), *self.flags.values()]
+        for offsets, ids in self.lists.values():
+            arrays += [offsets, ids]
+        return (
+            len(self.names_blob) + sum(a.nbytes for a in arrays)
+            + sum(sys.getsizeof(s) for s in self.strings)
+        )
+
+
+# ==========================================
+# FILES
+# ==========================================
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return Catalog.from_records(json.loads(line) for line in f if line.strip())
+
+
+def write_jsonl(catalog, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for i in range(catalog.size):
+            f.write(json.dumps(catalog.product(i), ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+
+def read_npz(path):
+    with np.load(path, allow_pickle=False) as z:
+        if int(z["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"{path}: catalog format {int(z['format_version'])}, expected {FORMAT_VERSION}")
+        return Catalog(
+            strings=_unpack_strings(z["strings_blob"], z["strings_offsets"]),
+            names_blob=z["names_blob"].tobytes(),
+            name_offsets=z["name_offsets"],
+            scalars={f: z[f] for f in SCALARS},
+            comodogenic=z["comodogenic"],
+            flags={f: z[f] for f in FLAGS},
+            lists={f: (z[f"{f}_offsets"], z[f"{f}_ids"]) for f in LISTS},
+        )
+
+
+def write_npz(catalog, path):
+    strings_blob, strings_offsets = _pack_strings(catalog.strings)
+    arrays = {
+        "format_version": np.asarray(FORMAT_VERSION),
+        "strings_blob": strings_blob,
+        "strings_offsets": strings_offsets,
+        "names_blob": np.frombuffer(catalog.names_blob, dtype=np.uint8),
+        "name_offsets": catalog.name_offsets,
+        "comodogenic": catalog.comodogenic,
+        **catalog.scalars,
+        **catalog.flags,
+    }
+    for f, (offsets, ids) in catalog.lists.items():
+        arrays[f"{f}_offsets"] = offsets
+        arrays[f"{f}_ids"] = ids
+    # write-then-rename: a running server reloading the catalog never sees
+    # half a file (np.savez appends .npz to names without it)
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def load_catalog(path):
+    return read_npz(path) if path.endswith(".npz") else read_jsonl(path)
+
+
+def save_catalog(catalog, path):
+    (write_npz if path.endswith(".npz") else write_jsonl)(catalog, path)
+
+
+def file_signature(path):
+    # changes whenever the file is rewritten or replaced
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="format follows the extension (.jsonl / .npz)")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    sub.add_parser("info").add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        catalog = load_catalog(args.path)
+        print(f"products : {catalog.size:,}")
+        print(f"strings  : {len(catalog.strings):,} distinct tags")
+        print(f"in memory: {catalog.nbytes() / 1e6:.2f} MB")
+        return
+    save_catalog(load_catalog(args.source), args.target)
+    print(f"wrote {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import re
+
+# ==========================================
+# CONSULT SEARCH (SQLite FTS5)
+# ==========================================
+# consults_fts holds the searchable text of each consult (rowid = consults.id):
+# what the user wrote, what the coach replied, the plan summary and the
+# products the plan names. insert_consult writes it in the same transaction
+# as the consult, and a trigger drops it when a consult is deleted. The JSON
+# blob stays the source of truth; after editing blobs by hand, delete the
+# consults_fts rows and run backfill_consults_fts again.
+
+FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS consults_fts USING fts5(
+    user_text, assistant_text, plan_summary, products,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+DELETE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS consults_fts_delete AFTER DELETE ON consults BEGIN
+    DELETE FROM consults_fts WHERE rowid = old.id;
+END
+"""
+
+FTS_INSERT = (
+    "INSERT INTO consults_fts (rowid, user_text, assistant_text, plan_summary, products) "
+    "VALUES (?,?,?,?,?)"
+)
+
+# bm25 column weights, in FTS_DDL column order: a product or plan match says
+# more about a consult than a word somewhere in the coach's replies
+WEIGHTS = (1.0, 0.5, 1.5, 2.0)
+
+SNIPPET_TOKENS = 12
+# matches scored per search, newest first; bm25 costs a few µs per matching
+# row, so this bounds a search over a very common word to ~10 ms
+SEARCH_CANDIDATES = 2000
+MAX_TERMS = 16
+BACKFILL_BATCH = 2000
+
+_TERM = re.compile(r"\w+")
+
+
+def search_fields(data):
+    # data: the JSON text stored in consults.data -> one value per FTS column
+    try:
+        payload = json.loads(data)
+    except Exception:
+        return "", "", "", ""
+    convo = payload.get("conversation") or []
+    user = [m.get("text", "") for m in convo if isinstance(m, dict) and m.get("role") == "user"]
+    assistant = [m.get("text", "") for m in convo if isinstance(m, dict) and m.get("role") == "assistant"]
+
+    plan = payload.get("last_plan")
+    summary, products = [], []
+    if isinstance(plan, dict):
+        summary = [plan.get("summary") or plan.get("raw_text") or ""]
+        for key in ("am_routine", "pm_routine"):
+            for step in plan.get(key) or []:
+                if isinstance(step, dict) and step.get("product"):
+                    products.append(step["product"])
+    return "\n".join(user), "\n".join(assistant), "\n".join(summary), "\n".join(dict.fromkeys(products))
+
+
+def fts_row(consult_id, data):
+    return (consult_id, *search_fields(data))
+
+
+def backfill_consults_fts(storage):
+    # consults that have no FTS row yet, oldest first in short batches; picks
+    # up where it stopped if interrupted
+    while True:
+        with storage.transaction() as conn:
+            last = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM consults_fts").fetchone()[0]
+            rows = conn.execute(
+                "SELECT id, data FROM consults WHERE id > ? ORDER BY id LIMIT ?",
+                (last, BACKFILL_BATCH),
+            ).fetchall()
+            conn.executemany(FTS_INSERT, [fts_row(row_id, data) for row_id, data in rows])
+        if len(rows) < BACKFILL_BATCH:
+            return
+
+
+def match_query(text):
+    # free text from the search box -> an FTS5 MATCH expression. Every word
+    # is quoted (so AND/OR/NEAR and punctuation are plain text), all words
+    # must match, and the last one matches as a prefix while the user types.
+    terms = _TERM.findall((text or "").lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{t}"' for t in terms) + "*"
@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+# ==========================================
+# DIARY AGGREGATES (per-day sufficient statistics)
+# ==========================================
+# diary_daily keeps one row per entry_date with the count, sums, sums of
+# squares and cross products of the tracked values. Every diary insert adds
+# its entry to that day's row in the same transaction, so nothing ever
+# rescans the diary. Any window's means, rolling averages and Pearson
+# correlations come out of sums of these rows, one row per day however many
+# entries there are, computed column-wise with pandas/NumPy.
+
+SKIN = ["redness", "oiliness"]
+HABITS = ["sleep_hours", "water_glasses"]
+VALUES = SKIN + HABITS
+
+SUM_COLUMNS = (
+    ["n"]
+    + [f"s_{v}" for v in VALUES]
+    + [f"ss_{v}" for v in VALUES]
+    + [f"sp_{a}_{b}" for a in SKIN for b in HABITS]
+)
+
+DAILY_DDL = (
+    "CREATE TABLE IF NOT EXISTS diary_daily (entry_date TEXT PRIMARY KEY, "
+    + ", ".join(f"{c} {'INTEGER' if c == 'n' else 'REAL'} NOT NULL DEFAULT 0" for c in SUM_COLUMNS)
+    + ")"
+)
+
+DAILY_UPSERT = (
+    f"INSERT INTO diary_daily (entry_date, {', '.join(SUM_COLUMNS)}) "
+    f"VALUES ({', '.join(['?'] * (len(SUM_COLUMNS) + 1))}) "
+    "ON CONFLICT(entry_date) DO UPDATE SET "
+    + ", ".join(f"{c} = {c} + excluded.{c}" for c in SUM_COLUMNS)
+)
+
+WINDOWS = (7, 30)
+
+
+def daily_row(entry_date, redness, oiliness, sleep_hours, water_glasses):
+    # one entry's contribution to its day, in SUM_COLUMNS order
+    x = {"redness": redness, "oiliness": oiliness, "sleep_hours": sleep_hours, "water_glasses": water_glasses}
+    return (
+        entry_date, 1,
+        *(x[v] for v in VALUES),
+        *(x[v] * x[v] for v in VALUES),
+        *(x[a] * x[b] for a in SKIN for b in HABITS),
+    )
+
+
+def daily_sums(df):
+    # raw diary rows (entry_date + VALUES) -> per-day sums, vectorised
+    x = df[VALUES].astype("float64")
+    parts = {"n": 1.0}
+    for v in VALUES:
+        parts[f"s_{v}"] = x[v]
+        parts[f"ss_{v}"] = x[v] * x[v]
+    for a in SKIN:
+        for b in HABITS:
+            parts[f"sp_{a}_{b}"] = x[a] * x[b]
+    frame = x.assign(**parts)[SUM_COLUMNS]
+    frame["entry_date"] = df["entry_date"].values
+    return frame.groupby("entry_date", sort=True).sum()
+
+
+def rebuild_diary_daily(storage, chunksize=50_000):
+    # full recomputation (first migration, or after hand edits to diary);
+    # runs in one write transaction so no insert slips between read and write
+    import pandas as pd
+
+    with storage.transaction() as conn:
+        total = None
+        for chunk in pd.read_sql_query(
+            f"SELECT entry_date, {', '.join(VALUES)} FROM diary", conn, chunksize=chunksize,
+        ):
+            sums = daily_sums(chunk.fillna(0))
+            total = sums if total is None else total.add(sums, fill_value=0)
+        conn.execute("DELETE FROM diary_daily")
+        if total is not None and len(total):
+            total["n"] = total["n"].astype("int64")
+            conn.executemany(
+                f"INSERT INTO diary_daily (entry_date, {', '.join(SUM_COLUMNS)}) "
+                f"VALUES ({', '.join(['?'] * (len(SUM_COLUMNS) + 1))})",
+                total.reset_index()[["entry_date", *SUM_COLUMNS]].itertuples(index=False, name=None),
+            )
+
+
+def _pearson(n, sx, sy, sxx, syy, sxy):
+    import numpy as np
+
+    cov = n * sxy - sx * sy
+    var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(var > 0, cov / np.sqrt(np.where(var > 0, var, 1)), np.nan)
+
+
+def continuous_days(daily, start, end):
+    # daily aggregates indexed by every calendar day in [start, end], zeros
+    # where nothing was logged, so rolling windows count days, not entries
+    import pandas as pd
+
+    daily = daily.set_index(pd.to_datetime(daily["entry_date"]))[SUM_COLUMNS]
+    days = pd.date_range(start, end, freq="D")
+    return daily.reindex(days, fill_value=0)
+
+
+def rolling_trends(daily, start, end, windows=WINDOWS):
+    # rolling w-day mean of each skin value, per calendar day in [start, end];
+    # `daily` must reach back max(windows) - 1 days before start
+    import numpy as np
+    import pandas as pd
+
+    lookback = pd.Timestamp(start) - pd.Timedelta(days=max(windows) - 1)
+    days = continuous_days(daily, lookback, end)
+    out = {}
+    for w in windows:
+        rolled = days.rolling(w, min_periods=1).sum()
+        n = rolled["n"].to_numpy()
+        for v in SKIN:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[f"{v} ({w}d avg)"] = np.where(n > 0, rolled[f"s_{v}"].to_numpy() / np.where(n > 0, n, 1), np.nan)
+    return pd.DataFrame(out, index=days.index).loc[pd.Timestamp(start):]
+
+
+def correlations(daily):
+    # Pearson r of each skin value against each habit over all rows given
+    totals = daily[SUM_COLUMNS].sum()
+    n = totals["n"]
+    rows = []
+    for a in SKIN:
+        for b in HABITS:
+            r = _pearson(n, totals[f"s_{a}"], totals[f"s_{b}"], totals[f"ss_{a}"], totals[f"ss_{b}"],
+                         totals[f"sp_{a}_{b}"])
+            rows.append({"skin": a, "habit": b, "r": float(r), "entries": int(n)})
+    return rows
+
+
+def trend_range(days, today=None):
+    # (first day shown, first day that must be loaded, last day)
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    return start, start - timedelta(days=max(WINDOWS) - 1), today
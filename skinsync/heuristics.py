@@ -0,0 +1,140 @@
+from functools import lru_cache
+
+from skinsync.keywords import KeywordAutomaton
+from skinsync.products import KNOWN_ALLERGENS
+
+# ==========================================
+# KEYWORD VOCABULARIES
+# ==========================================
+SEVERE_KEYWORDS = ["bleeding", "pus", "severe pain", "fever", "spreading", "infection", "open sore"]
+GREET_WORDS = ["hi", "hello", "hey", "yo", "sup", "good morning", "good night"]
+SMALL_TALK_WORDS = ["thank", "thanks", "ok", "okay", "great", "awesome", "cool"]
+
+# phrases in a user's own message that suggest they are an adult
+ADULT_PHRASES = [
+    "wrinkles", "fine lines", "anti-aging", "anti ageing",
+    "i am 2", "i'm 2",  # very rough heuristic
+]
+
+ADULT_AGE_BUCKETS = ("25–30", "30–40", "40+")
+
+# what the user is asking about, by concern
+CONCERN_KEYWORDS = {
+    "acne": ["acne", "pimple", "breakout"],
+    "pigment": ["pigment", "dark spot", "mark"],
+    "dry": ["dry", "flaky", "tight"],
+    "oily": ["oily", "oil", "shine"],
+    "anti_age": ["anti aging", "anti-age", "fine lines", "wrinkle"],
+}
+
+
+def _vocabulary():
+    for w in SEVERE_KEYWORDS:
+        yield w, ("severe", w)
+    for w in GREET_WORDS:
+        yield w, ("greeting", w)
+    for w in SMALL_TALK_WORDS:
+        yield w, ("small_talk", w)
+    for w in ADULT_PHRASES:
+        yield w, ("adult", w)
+    for concern, words in CONCERN_KEYWORDS.items():
+        for w in words:
+            yield w, ("concern", concern)
+    for a in KNOWN_ALLERGENS:
+        yield a, ("allergen", a)
+        yield a.replace("_", " "), ("allergen", a)
+
+
+_automaton = None
+
+
+def get_keyword_automaton():
+    global _automaton
+    if _automaton is None:
+        _automaton = KeywordAutomaton(_vocabulary())
+    return _automaton
+
+
+@lru_cache(maxsize=512)
+def scan_text(text: str):
+    # one pass per distinct message; every helper below shares the result
+    return get_keyword_automaton().scan(text.lower())
+
+# ==========================================
+# TEXT HEURISTICS (chat messages)
+# ==========================================
+def detect_severe_keywords(text: str) -> bool:
+    return scan_text(text or "").has("severe")
+
+def detect_intent(text: str) -> str:
+    t = text.lower()
+    matches = scan_text(text)
+
+    if matches.has("greeting") and len(t) < 40:
+        return "greeting"
+    if matches.has("small_talk") and len(t) < 80:
+        return "small_talk"
+    return "routine_request"
+
+def extract_allergies_from_text(text: str):
+    return sorted(scan_text(text).values("allergen"))
+
+def is_adult_age(profile) -> bool:
+    return profile.get("age_bucket", "18–24") in ADULT_AGE_BUCKETS
+
+def is_user_adult(profile, message_history) -> bool:
+    # Simple heuristic
+    if is_adult_age(profile):
+        return True
+    # Look into chat messages
+    for m in message_history:
+        if m["role"] != "user":
+            continue
+        if scan_text(m["text"]).has("adult"):
+            return True
+    return False
+
+
+# ==========================================
+# CONVERSATION SIGNALS (per session)
+# ==========================================
+# What the user's own messages have said so far, folded in one message at a
+# time: the chat calls update() on every send and it only scans messages it
+# hasn't seen, so a send costs the same however long the conversation is.
+# filter_products reads the result instead of rescanning the history.
+class ConversationSignals:
+    __slots__ = ("seen", "adult", "concerns", "allergens", "severe", "latest_severe")
+
+    def __init__(self):
+        self.seen = 0  # messages folded in so far
+        self.adult = False  # adult evidence in a user message
+        self.concerns = set()  # CONCERN_KEYWORDS groups mentioned
+        self.allergens = set()
+        self.severe = False  # any user message with a SEVERE_KEYWORDS hit
+        self.latest_severe = False  # ... and the newest one
+
+    def update(self, messages):
+        # -> allergens the conversation names for the first time, so the
+        # chat adds those to the allergy list once (and doesn't re-add one
+        # the user removed in the sidebar on every send)
+        if len(messages) < self.seen:  # history was cleared
+            self.__init__()
+        known = set(self.allergens)
+        for m in messages[self.seen:]:
+            if m["role"] == "user":
+                found = scan_text(m["text"])
+                self.adult = self.adult or found.has("adult")
+                self.concerns |= found.values("concern")
+                self.allergens |= found.values("allergen")
+                self.latest_severe = found.has("severe")
+                self.severe = self.severe or self.latest_severe
+        self.seen = len(messages)
+        return self.allergens - known
+
+    def is_adult(self, profile) -> bool:
+        # same answer as is_user_adult(profile, <the messages seen>)
+        return is_adult_age(profile) or self.adult
+
+    def __repr__(self):
+        return (f"ConversationSignals(seen={self.seen}, adult={self.adult}, concerns={sorted(self.concerns)}, "
+                f"allergens={sorted(self.allergens)}, severe={self.severe}, latest_severe={self.latest_severe})")
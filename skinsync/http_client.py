@@ -0,0 +1,183 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# ==========================================
+# POOLED HTTP CLIENT (keep-alive)
+# ==========================================
+# One requests.Session per process, so chat turns reuse an open TLS
+# connection instead of paying DNS + TCP + TLS on every call. The urllib3
+# connection classes are wrapped just enough to time the phases of a new
+# connection; a reused connection simply records none of them.
+
+POOL_CONNECTIONS = int(os.getenv("SKINSYNC_HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("SKINSYNC_HTTP_POOL_MAXSIZE", "16"))
+CONNECT_TIMEOUT = float(os.getenv("SKINSYNC_HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SKINSYNC_HTTP_READ_TIMEOUT", "25"))
+METRICS_WINDOW = 500
+
+_local = threading.local()
+
+
+def _timing():
+    return getattr(_local, "timing", None)
+
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        timing = _timing()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addr = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            addr = None  # let urllib3 raise its usual resolution error below
+        resolved = time.perf_counter()
+
+        try:
+            if addr is not None:
+                self._dns_host = addr
+            try:
+                sock = super()._new_conn()
+            except Exception:
+                if addr is None:
+                    raise
+                # first address refused: retry with urllib3's full address walk
+                self._dns_host = host
+                sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+
+        if timing is not None:
+            timing["reused"] = False
+            timing["dns_ms"] = (resolved - start) * 1000
+            timing["connect_ms"] = (time.perf_counter() - resolved) * 1000
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        timing = _timing()
+        if timing is not None:
+            # for https this is DNS + TCP + TLS; the remainder is the handshake
+            setup_ms = (time.perf_counter() - start) * 1000
+            timing["tls_ms"] = max(0.0, setup_ms - timing.get("dns_ms", 0.0) - timing.get("connect_ms", 0.0))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    def __init__(self, headers=None, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                 connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = _TimedAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=METRICS_WINDOW)
+        self.counters = {"requests": 0, "new_connections": 0, "errors": 0}
+
+    def post_json(self, url, payload):
+        timing = {"reused": True, "dns_ms": 0.0, "connect_ms": 0.0, "tls_ms": 0.0}
+        _local.timing = timing
+        start = time.perf_counter()
+        try:
+            # stream=True returns once the status line + headers are in (TTFB)
+            resp = self.session.post(url, json=payload, timeout=self.timeout, stream=True)
+            timing["ttfb_ms"] = (time.perf_counter() - start) * 1000
+            resp.content  # read the body; the connection goes back to the pool
+            timing["total_ms"] = (time.perf_counter() - start) * 1000
+            timing["status"] = resp.status_code
+            self._record(timing, error=False)
+            return resp
+        except Exception:
+            timing["total_ms"] = (time.perf_counter() - start) * 1000
+            self._record(timing, error=True)
+            raise
+        finally:
+            _local.timing = None
+
+    def _record(self, timing, error):
+        with self._lock:
+            self.counters["requests"] += 1
+            if not timing["reused"]:
+                self.counters["new_connections"] += 1
+            if error:
+                self.counters["errors"] += 1
+            self._recent.append(timing)
+
+    def last_timing(self):
+        with self._lock:
+            return dict(self._recent[-1]) if self._recent else None
+
+    def metrics(self):
+        with self._lock:
+            recent = list(self._recent)
+            summary = dict(self.counters)
+        summary["reuse_rate"] = (
+            1 - summary["new_connections"] / summary["requests"] if summary["requests"] else 0.0
+        )
+        for field in ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "total_ms"):
+            values = [t[field] for t in recent if field in t]
+            summary[f"avg_{field}"] = sum(values) / len(values) if values else 0.0
+        return summary
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_headers = None
+_client_lock = threading.Lock()
+
+
+def get_http_client(headers):
+    # process-wide client; only rebuilt if the default headers (API key) change
+    global _client, _client_headers
+    with _client_lock:
+        if _client is None or _client_headers != headers:
+            if _client is not None:
+                _client.close()
+            _client = HttpClient(headers)
+            _client_headers = dict(headers)
+        return _client
+
+
+def http_client_metrics():
+    # the process-wide client's metrics(); None until the first chat request
+    with _client_lock:
+        client = _client
+    return client.metrics() if client is not None else None
@@ -0,0 +1,178 @@
+import os
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from skinsync.metrics import timed
+
+# ==========================================
+# IMAGE ANALYSIS (REDNESS)
+# ==========================================
+# The score is the mean of the min-max normalised redness index
+# R - (G+B)/2. Normalisation is linear, so the mean of the normalised values
+# is just (mean - min) / (max - min): no normalised copy of the image is ever
+# needed. Working on 2R - G - B keeps everything in int16 (range ±510), and
+# the factor 2 cancels out in the normalisation.
+
+# common working resolution for batch scoring (width, height)
+BATCH_SIZE = (512, 512)
+
+# Peak memory for one scan, whatever the upload size. Half of it bounds the
+# decoded image (JPEGs are decoded at 1/2, 1/4 or 1/8 scale via draft()), the
+# other half bounds the strip being scored.
+MEMORY_BUDGET = int(os.getenv("SKINSYNC_SCAN_MEMORY_BUDGET_MB", "64")) * 2**20
+# int16 index + uint8 RGB strip + the array copy PIL hands to numpy
+_WORK_BYTES_PER_PIXEL = 2 + 3 + 3
+
+# decoded RGB must fit in half the budget
+_MAX_DECODED_PIXELS = MEMORY_BUDGET // 2 // 3
+
+# PNG and other formats can't be decoded at reduced scale, so one that is
+# over the budget is decoded in full once and shrunk with Image.reduce().
+# That decode briefly needs up to this many times the decoded-image half of
+# the budget (2x the whole budget by default); only bigger ones are refused.
+FULL_DECODE_FACTOR = int(os.getenv("SKINSYNC_SCAN_FULL_DECODE_FACTOR", "4"))
+
+# We bound decoding ourselves (draft scale, reduce or refusal below), so
+# PIL's decompression-bomb limit only has to stop what even 1/8 scale can't fit.
+if Image.MAX_IMAGE_PIXELS is not None:
+    Image.MAX_IMAGE_PIXELS = max(Image.MAX_IMAGE_PIXELS, 64 * _MAX_DECODED_PIXELS)
+
+TOO_LARGE_MESSAGE = "This photo is too large to analyse — please upload a smaller image or a JPEG."
+
+
+class ScanImageTooLarge(ValueError):
+    pass
+
+
+def open_scan_image(img_bytes, memory_budget=MEMORY_BUDGET, target_size=None):
+    # Image.open only reads the header, so the decode scale is chosen here,
+    # before any pixel data is touched
+    image = Image.open(BytesIO(img_bytes))
+    max_pixels = memory_budget // 2 // 3
+    width, height = image.size
+
+    if target_size is None and width * height > max_pixels:
+        needed = (width * height / max_pixels) ** 0.5
+        scale = next((d for d in (2, 4, 8) if d >= needed), 8)
+        target_size = (max(1, width // scale), max(1, height // scale))
+
+    if target_size is not None and image.format == "JPEG":
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale directly from the DCT
+        image.draft("RGB", target_size)
+
+    width, height = image.size
+    if width * height <= max_pixels:
+        image.load()
+        return image
+
+    if width * height > FULL_DECODE_FACTOR * max_pixels:
+        # too big to decode in full (for a JPEG, even at 1/8): refuse rather than OOM
+        raise ScanImageTooLarge(TOO_LARGE_MESSAGE)
+
+    # not a JPEG (or one still over budget at 1/8): decode at this size once,
+    # then box-average down by the smallest integer factor that fits
+    image.load()
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGB")  # reduce() doesn't take palette images
+    factor = next(f for f in range(2, width + height) if (width // f) * (height // f) <= max_pixels)
+    return image.reduce(factor)
+
+
+def redness_severity(mean_red):
+    if mean_red < 0.25:
+        return "Very mild redness 🙂"
+    elif mean_red < 0.45:
+        return "Mild redness — light irritation 🌸"
+    elif mean_red < 0.65:
+        return "Moderate redness 🔎"
+    return "High redness — be gentle, consider dermatologist advice ⚠️"
+
+
+def _redness_index(rgb):
+    # uint8 (..., 3) -> int16 2R - G - B, built in place in a single buffer
+    idx = rgb[..., 0].astype(np.int16)
+    idx <<= 1
+    idx -= rgb[..., 1]
+    idx -= rgb[..., 2]
+    return idx
+
+
+def _scores(idx):
+    # idx: int16 (n, pixels) -> mean normalised redness per row
+    lo = idx.min(axis=1).astype(np.float64)
+    hi = idx.max(axis=1).astype(np.float64)
+    mean = idx.sum(axis=1, dtype=np.int64) / idx.shape[1]
+    diff = hi - lo
+    # flat image: the old code divided by 1e-6 and got all zeros
+    return np.where(diff > 0, (mean - lo) / np.where(diff > 0, diff, 1), 0.0)
+
+
+def _normalized_mean(lo, hi, total, count):
+    if hi <= lo:
+        return 0.0
+    return (total / count - lo) / (hi - lo)
+
+
+def _redness_stats(image, memory_budget):
+    # streaming reduction over horizontal strips: min, max and sum of the
+    # index are all the score needs, so a strip can be dropped once counted
+    width, height = image.size
+    rows = max(1, (memory_budget // 2) // (width * _WORK_BYTES_PER_PIXEL))
+
+    if rows >= height:
+        arr = np.asarray(image.convert("RGB"))
+        if len(arr.shape) != 3 or arr.shape[2] != 3:
+            return None
+        idx = _redness_index(arr)
+        return int(idx.min()), int(idx.max()), int(idx.sum(dtype=np.int64)), idx.size
+
+    lo, hi, total = None, None, 0
+    for top in range(0, height, rows):
+        strip = image.crop((0, top, width, min(height, top + rows))).convert("RGB")
+        idx = _redness_index(np.asarray(strip))
+        s_lo, s_hi = int(idx.min()), int(idx.max())
+        lo = s_lo if lo is None else min(lo, s_lo)
+        hi = s_hi if hi is None else max(hi, s_hi)
+        total += int(idx.sum(dtype=np.int64))
+    return lo, hi, total, width * height
+
+
+@timed()
+def analyze_skin_image(image: Image.Image, memory_budget=MEMORY_BUDGET):
+    try:
+        stats = _redness_stats(image, memory_budget)
+        if stats is None:
+            return 0.0, "Invalid image — must be a clear color photo."
+
+        mean_red = _normalized_mean(*stats)
+        return mean_red, redness_severity(mean_red)
+
+    except Exception:
+        return 0.0, "Could not process this image."
+
+
+@timed()
+def analyze_skin_images(images, size=BATCH_SIZE):
+    # several photos at once: resize to one working resolution, stack into a
+    # single uint8 (n, h, w, 3) array and score the whole batch in one go
+    results = [None] * len(images)
+    batch = np.empty((len(images), size[1], size[0], 3), dtype=np.uint8)
+    rows = []
+    for i, image in enumerate(images):
+        try:
+            # nearest-neighbour keeps real pixel values, so the per-image
+            # min/max (and the score) stay close to the full-size result
+            img = image if image.size == size else image.resize(size, Image.NEAREST)
+            batch[len(rows)] = np.asarray(img.convert("RGB"))
+            rows.append(i)
+        except Exception:
+            results[i] = (0.0, "Could not process this image.")
+
+    if rows:
+        idx = _redness_index(batch[: len(rows)]).reshape(len(rows), -1)
+        for i, score in zip(rows, _scores(idx)):
+            mean_red = float(score)
+            results[i] = (mean_red, redness_severity(mean_red))
+    return results
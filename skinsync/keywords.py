@@ -0,0 +1,90 @@
+# ==========================================
+# MULTI-PATTERN KEYWORD MATCHER (Aho–Corasick)
+# ==========================================
+# The chat heuristics are all "does any of these words occur in the text"
+# checks. Instead of one `in` scan per keyword, every keyword goes into a
+# single automaton that reports all of them in one pass over the text, so the
+# cost no longer grows with the size of the vocabularies.
+
+
+# labels found in one text, grouped by kind (e.g. "severe", "allergen")
+class KeywordMatches:
+    __slots__ = ("_by_kind",)
+
+    def __init__(self, labels=()):
+        by_kind = {}
+        for kind, value in labels:
+            by_kind.setdefault(kind, set()).add(value)
+        self._by_kind = {k: frozenset(v) for k, v in by_kind.items()}
+
+    def has(self, kind, value=None):
+        found = self._by_kind.get(kind)
+        if not found:
+            return False
+        return value is None or value in found
+
+    def values(self, kind):
+        return self._by_kind.get(kind, frozenset())
+
+    def kinds(self):
+        return set(self._by_kind)
+
+    def __repr__(self):
+        inner = ", ".join(f"{k}={sorted(v)}" for k, v in sorted(self._by_kind.items()))
+        return f"KeywordMatches({inner})"
+
+
+class KeywordAutomaton:
+    def __init__(self, vocabulary):
+        # vocabulary: iterable of (keyword, (kind, value)); keywords are
+        # matched as plain substrings, exactly like `keyword in text`
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+
+        pending = {}
+        for keyword, label in vocabulary:
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                state = nxt
+            pending.setdefault(state, set()).add(label)
+
+        for state, labels in pending.items():
+            self._out[state] = frozenset(labels)
+
+        # breadth-first pass to wire failure links and merge outputs
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def scan(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return KeywordMatches(found)
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+import requests
+
+from skinsync.http_client import get_http_client
+from skinsync.llm_cache import get_response_cache, make_cache_key
+from skinsync.metrics import timed
+
+# ==========================================
+# API CALLER — OpenRouter
+# ==========================================
+OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+MODEL = "openai/gpt-4o-mini"
+TEMPERATURE = 0.65
+
+LLM_WORKERS = int(os.getenv("SKINSYNC_LLM_WORKERS", "8"))
+LLM_MAX_PENDING = int(os.getenv("SKINSYNC_LLM_MAX_PENDING", "64"))
+
+
+def _is_cacheable(content):
+    # only keep replies the chat page can turn into a routine
+    try:
+        json.loads(content)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=4)
+def _headers(api_key):
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://skinsync.streamlit.app",
+        "X-Title": "SkinSync Smart Skin Coach",
+    }
+
+
+@timed()
+def call_openrouter_chat(messages, retries=1, use_cache=True):
+    key = make_cache_key(MODEL, TEMPERATURE, messages)
+    if use_cache:
+        cached = get_response_cache().get(key)
+        if cached is not None:
+            return cached, None
+    return _request(messages, key, retries, use_cache)
+
+
+@timed()
+def _request(messages, key, retries=1, use_cache=True):
+    # the upstream round trip; the caller has already missed the cache
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        return None, "Missing API key."
+
+    client = get_http_client(_headers(api_key))
+
+    payload = {
+        "model": MODEL,
+        "messages": messages,
+        "temperature": TEMPERATURE,
+    }
+
+    for attempt in range(retries + 1):
+        try:
+            resp = client.post_json(OPENROUTER_URL, payload)
+            resp.raise_for_status()
+            data = resp.json()
+            content = data["choices"][0]["message"]["content"]
+            if use_cache and _is_cacheable(content):
+                get_response_cache().put(key, content)
+            return content, None
+
+        except requests.Timeout:
+            if attempt < retries:
+                continue
+            return None, "The AI service is taking too long to respond."
+
+        except requests.RequestException:
+            if attempt < retries:
+                continue
+            return None, "Network issue — please try again."
+
+        except Exception:
+            return None, "Unexpected error occurred."
+
+
+# ==========================================
+# NON-BLOCKING CALLS (shared executor)
+# ==========================================
+# Chat pages submit their request and poll the returned future instead of
+# holding the script thread for the whole round trip. Cached replies come
+# back as an already-completed future, so the page applies them in the same
+# run; identical requests that are already in flight (same cache key) share
+# one upstream call.
+
+_executor = None
+_inflight = {}
+_inflight_lock = threading.RLock()
+executor_counters = {"submitted": 0, "coalesced": 0, "rejected": 0}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="skinsync-llm")
+    return _executor
+
+
+def _forget(key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def submit_openrouter_chat(messages):
+    key = make_cache_key(MODEL, TEMPERATURE, messages)
+    cached = get_response_cache().get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result((cached, None))
+        return future
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            executor_counters["coalesced"] += 1
+            return future
+
+        if len(_inflight) >= LLM_MAX_PENDING:
+            executor_counters["rejected"] += 1
+            future = Future()
+            future.set_result((None, "The AI service is busy — please try again."))
+            return future
+
+        future = _get_executor().submit(_request, messages, key)
+        _inflight[key] = future
+        executor_counters["submitted"] += 1
+    future.add_done_callback(lambda f: _forget(key, f))
+    return future
+
+
+def executor_stats():
+    # for the perf page: counters since start plus what is in flight now
+    with _inflight_lock:
+        return {**executor_counters, "in_flight": len(_inflight),
+                "workers": LLM_WORKERS, "max_pending": LLM_MAX_PENDING}
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from skinsync.metrics import span
+
+# ==========================================
+# LLM RESPONSE CACHE (memory LRU + SQLite)
+# ==========================================
+# Routine requests with the same profile-derived product list and the same
+# message get the same answer, so there is no point paying a 25 s round trip
+# for them twice. Entries live in a small in-process LRU and in a SQLite file
+# that survives restarts; both tiers honour the same TTL.
+
+CACHE_PATH = os.getenv("SKINSYNC_LLM_CACHE_PATH", "skinsync_llm_cache.db")
+CACHE_TTL_SECONDS = int(os.getenv("SKINSYNC_LLM_CACHE_TTL", str(24 * 3600)))
+MEMORY_MAX_ENTRIES = int(os.getenv("SKINSYNC_LLM_CACHE_MEMORY_MAX", "256"))
+DISK_MAX_ENTRIES = int(os.getenv("SKINSYNC_LLM_CACHE_DISK_MAX", "5000"))
+CACHE_ENABLED = os.getenv("SKINSYNC_LLM_CACHE", "1").lower() not in ("0", "false", "off", "no")
+
+_WS = re.compile(r"\s+")
+
+
+def _normalize(text, fold_case=False):
+    text = _WS.sub(" ", (text or "").strip())
+    return text.lower() if fold_case else text
+
+
+def make_cache_key(model, temperature, messages):
+    # system prompt + allowed_products are whitespace-normalised; user text is
+    # also case-folded so "Oily skin, help" and "oily skin,  help" share a key
+    parts = [
+        [m["role"], _normalize(m["content"], fold_case=m["role"] == "user")]
+        for m in messages
+    ]
+    blob = json.dumps([model, round(float(temperature), 4), parts], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS,
+                 memory_max=MEMORY_MAX_ENTRIES, disk_max=DISK_MAX_ENTRIES, enabled=CACHE_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.memory_max = memory_max
+        self.disk_max = disk_max
+        self.enabled = enabled
+
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL,
+                accessed_at REAL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        if not self.enabled:
+            self.counters["bypassed"] += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            try:
+                db = self._db()
+                with span("sql SELECT llm_cache"):
+                    row = db.execute(
+                        "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                        (key, now),
+                    ).fetchone()
+                if row is not None:
+                    with span("sql UPDATE llm_cache"):
+                        db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        db.commit()
+            except sqlite3.Error:
+                row = None
+
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+
+            self._remember(key, row[1], row[0])
+            self.counters["disk_hits"] += 1
+            return row[0]
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self.counters["stores"] += 1
+            try:
+                db = self._db()
+                with span("sql INSERT llm_cache"):
+                    db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?,?,?,?)",
+                        (key, value, expires_at, now),
+                    )
+                    db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                    # size bound: drop least recently used rows beyond disk_max
+                    db.execute(
+                        "DELETE FROM llm_cache WHERE key IN ("
+                        "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                        (self.disk_max,),
+                    )
+                    db.commit()
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            try:
+                db = self._db()
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            **self.counters,
+            "memory_entries": len(self._memory),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = None
+
+
+def get_response_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,257 @@
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import lru_cache, wraps
+
+# ==========================================
+# TIMING SPANS (latency histograms)
+# ==========================================
+# `with span("name"):` and `@timed()` append (name, ms) to one shared deque.
+# deque.append is atomic, so recording takes no lock. The buffer is drained
+# into per-span histograms by a background flusher every FLUSH_SECONDS (and
+# by snapshot()), and each drain is then written to the configured sink:
+# SQLite tables in the app DB, or a Prometheus text-exposition file.
+
+METRICS_ENABLED = os.getenv("SKINSYNC_METRICS", "1").lower() not in ("0", "false", "off", "no")
+METRICS_SINK = os.getenv("SKINSYNC_METRICS_SINK", "sqlite")  # sqlite | prometheus | none
+PROMETHEUS_PATH = os.getenv("SKINSYNC_METRICS_PROM_PATH", "skinsync_metrics.prom")
+FLUSH_SECONDS = float(os.getenv("SKINSYNC_METRICS_FLUSH_SECONDS", "10"))
+# unflushed samples kept at most; the oldest are dropped past this
+MAX_PENDING = 100_000
+
+# bucket upper bounds in ms: 0.01 ms .. ~170 s, four per doubling (±9%)
+BUCKETS_MS = [round(0.01 * 2 ** (i / 4), 6) for i in range(97)]
+
+_pending = deque(maxlen=MAX_PENDING)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th sample, capped by the max
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+_histograms = {}  # since process start, shown by the perf page
+_unflushed = {}   # drained but not yet written to the sink (a failed write is kept)
+_lock = threading.Lock()
+_flusher = None
+
+
+def record(name, ms):
+    if METRICS_ENABLED:
+        _pending.append((name, ms))
+
+
+class span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # recorded on exceptions too (st.rerun() raises out of render_chat)
+        if METRICS_ENABLED:
+            _pending.append((self.name, (time.perf_counter() - self.start) * 1000))
+        return False
+
+
+def timed(name=None):
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _pending.append((label, (time.perf_counter() - start) * 1000))
+        return wrapper
+    return decorate
+
+
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|ON)\s+(\w+)", re.I)
+
+
+@lru_cache(maxsize=256)
+def sql_span_name(sql):
+    # "sql SELECT consults": statement kind + first table, so spans stay
+    # low-cardinality whatever the parameters or column list
+    verb = sql.lstrip().split(None, 1)[0].upper()
+    m = _SQL_TABLE.search(sql)
+    return f"sql {verb} {m.group(1)}" if m else f"sql {verb}"
+
+
+# ---- aggregation ----------------------------------------------------------
+
+def drain():
+    # move pending samples into the histograms
+    delta = {}
+    while True:
+        try:
+            name, ms = _pending.popleft()
+        except IndexError:
+            break
+        h = delta.get(name)
+        if h is None:
+            h = delta[name] = Histogram()
+        h.add(ms)
+    if delta:
+        with _lock:
+            for name, h in delta.items():
+                _histograms.setdefault(name, Histogram()).merge(h)
+                _unflushed.setdefault(name, Histogram()).merge(h)
+
+
+def snapshot():
+    # per-span stats for this process, latest samples included
+    drain()
+    with _lock:
+        items = [(name, h.count, h.sum_ms, h.max_ms, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                 for name, h in _histograms.items()]
+    return [
+        {"span": name, "count": count, "total_ms": total, "p50_ms": p50, "p95_ms": p95,
+         "p99_ms": p99, "max_ms": mx}
+        for name, count, total, mx, p50, p95, p99 in items
+    ]
+
+
+def reset():
+    drain()
+    with _lock:
+        _histograms.clear()
+        _unflushed.clear()
+
+
+# ---- sinks ----------------------------------------------------------------
+
+def _write_prometheus(path):
+    with _lock:
+        hists = {name: (list(h.counts), h.count, h.sum_ms) for name, h in _histograms.items()}
+    lines = [
+        "# HELP skinsync_span_duration_seconds Time spent in instrumented spans.",
+        "# TYPE skinsync_span_duration_seconds histogram",
+    ]
+    for name in sorted(hists):
+        counts, count, sum_ms = hists[name]
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for le_ms, c in zip(BUCKETS_MS, counts):
+            cumulative += c
+            lines.append(f'skinsync_span_duration_seconds_bucket{{span="{label}",le="{le_ms / 1000:g}"}} {cumulative}')
+        lines.append(f'skinsync_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+        lines.append(f'skinsync_span_duration_seconds_sum{{span="{label}"}} {sum_ms / 1000:.6f}')
+        lines.append(f'skinsync_span_duration_seconds_count{{span="{label}"}} {count}')
+    # write-then-rename so a scraper never reads half a file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+def flush(sink=None):
+    global _unflushed
+    sink = sink or METRICS_SINK
+    drain()
+    with _lock:
+        delta, _unflushed = _unflushed, {}
+    if sink == "prometheus":
+        _write_prometheus(PROMETHEUS_PATH)
+    elif sink == "sqlite" and delta:
+        from skinsync.storage import get_storage
+
+        try:
+            get_storage().add_span_histograms(
+                [(name, h.count, h.sum_ms, h.max_ms) for name, h in delta.items()],
+                [(name, BUCKETS_MS[i] if i < len(BUCKETS_MS) else float("inf"), c)
+                 for name, h in delta.items() for i, c in enumerate(h.counts) if c],
+            )
+        except Exception:
+            # nothing was written (one transaction): keep the delta for the
+            # next flush instead of losing it
+            with _lock:
+                for name, h in delta.items():
+                    _unflushed.setdefault(name, Histogram()).merge(h)
+            raise
+
+
+def persisted(storage=None):
+    # per-span stats summed over every process that flushed to the sqlite
+    # sink, in the same shape as snapshot()
+    if storage is None:
+        from skinsync.storage import get_storage
+
+        storage = get_storage()
+    spans, buckets = storage.span_histograms()
+    hists = {}
+    for name, count, sum_ms, max_ms in spans:
+        h = hists[name] = Histogram()
+        h.count, h.sum_ms, h.max_ms = count, sum_ms, max_ms
+    for name, le_ms, count in buckets:
+        h = hists.get(name)
+        if h is not None:
+            h.counts[bisect_left(BUCKETS_MS, le_ms)] += count
+    return [
+        {"span": name, "count": h.count, "total_ms": h.sum_ms, "p50_ms": h.quantile(0.5),
+         "p95_ms": h.quantile(0.95), "p99_ms": h.quantile(0.99), "max_ms": h.max_ms}
+        for name, h in hists.items()
+    ]
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        try:
+            flush()
+        except Exception:
+            pass  # metrics must never take the app down
+
+
+def start_flusher():
+    # called once from app.py; headless users aggregate with snapshot()
+    global _flusher
+    if not METRICS_ENABLED or METRICS_SINK == "none":
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="skinsync-metrics", daemon=True)
+            _flusher.start()
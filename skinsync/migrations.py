@@ -0,0 +1,260 @@
+"""Versioned schema migrations for the app DB.
+
+    python -m skinsync.migrations            # apply pending migrations
+    python -m skinsync.migrations --status   # show applied / pending
+
+The app runs them on the first get_storage() of a process; on big databases
+run them from the command line before deploying.
+"""
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+
+from skinsync.consult_search import DELETE_TRIGGER, FTS_DDL, backfill_consults_fts
+from skinsync.diary_stats import DAILY_DDL, rebuild_diary_daily
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, nothing to race
+    fcntl = None
+
+# ==========================================
+# MIGRATIONS (ordered, applied once)
+# ==========================================
+# Each migration is (version, description, steps). A step is SQL, an
+# add_column() step, or a callable(storage). The SQL and add_column steps of
+# a migration share one transaction; a callable manages its own transactions
+# (e.g. a batched backfill) and must be safe to run again if the process dies
+# half way. The schema_version row is written last, so an interrupted
+# migration is simply retried. Never edit an applied migration, append a new one.
+#
+# Safe on large tables: ADD COLUMN only rewrites the schema entry, not the
+# rows, and data backfills go in short batches. CREATE INDEX does scan the
+# table under the write lock, so add indexes to big tables with the CLI
+# before a deploy rather than on a live server.
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT,
+    applied_at TEXT
+)
+"""
+
+BACKFILL_BATCH = 1000
+
+
+def add_column(table, name, sql_type):
+    # ALTER TABLE ADD COLUMN has no IF NOT EXISTS; databases created before
+    # schema_version existed may already have the column
+    def step(conn):
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+    step.in_transaction = True
+    return step
+
+
+def backfill_consult_columns(storage):
+    # rows saved before the derived columns existed, oldest first in short
+    # batches that keep the write lock free for live sessions in between.
+    # Keyset on id, so each batch starts where the last one stopped instead
+    # of rescanning the rows already filled in.
+    from skinsync.storage import consult_fields
+
+    with storage.connection() as conn:
+        # resuming after an interrupted run: batches fill ids in order, so
+        # everything below the first unfilled row is done
+        first = conn.execute("SELECT MIN(id) FROM consults WHERE skin_type IS NULL").fetchone()[0]
+    if first is None:
+        return
+    last = first - 1
+    while True:
+        with storage.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, data FROM consults WHERE id > ? ORDER BY id LIMIT ?",
+                (last, BACKFILL_BATCH),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE consults SET skin_type=?, main_concern=?, allergies_count=?, has_plan=? WHERE id=?",
+                [(*consult_fields(data), row_id) for row_id, data in rows],
+            )
+        if len(rows) < BACKFILL_BATCH:
+            return
+        last = rows[-1][0]
+
+
+MIGRATIONS = [
+    (1, "bookings, consults and diary tables", [
+        """
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            email TEXT,
+            city TEXT,
+            date TEXT,
+            time TEXT,
+            reason TEXT,
+            created_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS consults (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            data TEXT,
+            created_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS diary (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_date TEXT,
+            mood TEXT,
+            redness INTEGER,
+            oiliness INTEGER,
+            sleep_hours REAL,
+            water_glasses INTEGER,
+            note TEXT,
+            created_at TEXT
+        )
+        """,
+    ]),
+    # consults.data stays the source of truth; these columns are copied out of
+    # it on write so the history page can filter without parsing every blob
+    (2, "derived consult columns", [
+        add_column("consults", "skin_type", "TEXT"),
+        add_column("consults", "main_concern", "TEXT"),
+        add_column("consults", "allergies_count", "INTEGER"),
+        add_column("consults", "has_plan", "INTEGER"),
+        backfill_consult_columns,
+    ]),
+    # every list page is "newest first, optionally filtered by equality", so
+    # each filter column gets an index ending in id for the keyset scan
+    (3, "list page indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_consults_skin_type ON consults(skin_type, id)",
+        "CREATE INDEX IF NOT EXISTS idx_consults_main_concern ON consults(main_concern, id)",
+        "CREATE INDEX IF NOT EXISTS idx_consults_skin_concern ON consults(skin_type, main_concern, id)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_city ON bookings(city, id)",
+        "CREATE INDEX IF NOT EXISTS idx_diary_mood ON diary(mood, id)",
+    ]),
+    # latency histograms flushed by skinsync.metrics, summed across processes
+    (4, "perf histogram tables", [
+        """
+        CREATE TABLE IF NOT EXISTS perf_spans (
+            name TEXT PRIMARY KEY,
+            count INTEGER,
+            sum_ms REAL,
+            max_ms REAL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS perf_buckets (
+            name TEXT,
+            le_ms REAL,
+            count INTEGER,
+            PRIMARY KEY (name, le_ms)
+        )
+        """,
+    ]),
+    (5, "diary daily aggregates", [
+        DAILY_DDL,
+        rebuild_diary_daily,
+    ]),
+    # full-text search on the history page (skinsync.consult_search)
+    (6, "consult full-text search", [
+        FTS_DDL,
+        DELETE_TRIGGER,
+        backfill_consults_fts,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+@contextmanager
+def migration_lock(db_path):
+    # one migrating process per database file, across server workers
+    if fcntl is None or db_path == ":memory:":
+        yield
+        return
+    with open(f"{db_path}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def current_version(storage):
+    with storage.connection() as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'"
+        ).fetchone()
+        if not exists:
+            return 0
+        return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def _record(conn, version, description):
+    conn.execute(
+        "INSERT INTO schema_version (version, description, applied_at) VALUES (?,?,?)",
+        (version, description, datetime.utcnow().isoformat()),
+    )
+
+
+def _apply(storage, version, description, steps):
+    inline = [s for s in steps if isinstance(s, str) or getattr(s, "in_transaction", False)]
+    batched = [s for s in steps if s not in inline]
+    with storage.transaction() as conn:
+        for step in inline:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        if not batched:
+            _record(conn, version, description)
+            return
+    for step in batched:
+        step(storage)
+    with storage.transaction() as conn:
+        _record(conn, version, description)
+
+
+def migrate(storage):
+    # cheap check first: an up-to-date DB costs one SELECT and no DDL
+    if current_version(storage) >= LATEST_VERSION:
+        return []
+    applied = []
+    with migration_lock(storage.path):
+        # another worker may have finished while we waited for the lock
+        with storage.transaction() as conn:
+            conn.execute(SCHEMA_VERSION_DDL)
+        done = current_version(storage)
+        for version, description, steps in MIGRATIONS:
+            if version > done:
+                _apply(storage, version, description, steps)
+                applied.append(version)
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=None, help="database path (default: SKINSYNC_DB_PATH)")
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+
+    from skinsync.storage import DB_PATH, Storage
+
+    storage = Storage(args.db or DB_PATH)
+    if args.status:
+        done = current_version(storage)
+        for version, description, _ in MIGRATIONS:
+            print(f"{version:>3}  {'applied' if version <= done else 'pending':<8} {description}")
+        return
+    applied = migrate(storage)
+    print(f"applied {applied}" if applied else f"up to date (version {LATEST_VERSION})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# ==========================================
+# ALLERGEN VOCABULARY
+# ==========================================
+# The product catalog itself lives in catalog/products.jsonl (see
+# skinsync.catalog_store); this list is what the chat's allergy parser
+# recognises.
+KNOWN_ALLERGENS = [
+    "fragrance",
+    "essential_oils",
+    "tea_tree",
+    "snail",
+    "snail_mucin",
+    "aloe",
+    "vitamin_c",
+    "niacinamide",
+    "retinol",
+    "bha",
+    "aha",
+    "salicylic_acid",
+    "azelaic_acid",
+]
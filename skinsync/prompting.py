@@ -0,0 +1,130 @@
+import os
+import re
+
+from skinsync.metrics import timed
+
+# ==========================================
+# CHAT PROMPT (system prompt + product table)
+# ==========================================
+# The shortlist used to go out as a JSON list, every key repeated per
+# product. It now goes out as a table: a `tags` line that numbers the skin
+# types / concerns where a number is cheaper than repeating the tag, a
+# header row, then one `|`-separated row per product. The shortlist arrives
+# best first (skinsync.ranking), and products are dropped from the tail until
+# the table fits PROMPT_TOKEN_BUDGET. SYSTEM_PROMPT is one constant, byte-identical
+# on every call, so providers that cache prompt prefixes can reuse it.
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("SKINSYNC_PROMPT_TOKEN_BUDGET", "400"))
+MIN_PROMPT_PRODUCTS = 3  # kept even over budget: fewer can't fill a routine
+
+COLUMNS = ["name", "category", "skin_types", "concerns", "irritation", "adult_only", "price_range", "origin"]
+CODED = ("skin_types", "concerns")
+
+SYSTEM_PROMPT = """
+You are Smart Skin Coach, an AI skincare assistant.
+You must use ONLY the products listed in 'allowed_products' below.
+Pick the best matching products and build a gentle routine.
+
+You respond ONLY in valid JSON. No markdown, no explanations, no extra keys.
+
+JSON FORMAT (you may omit keys that are not relevant):
+{
+  "summary": "",
+  "am_routine": [
+    {"step": "Cleanser", "product": "name from allowed_products"},
+    {"step": "Serum", "product": "name ..."},
+    {"step": "Moisturizer", "product": "name ..."},
+    {"step": "Sunscreen", "product": "name ..."}
+  ],
+  "pm_routine": [
+    {"step": "Cleanser", "product": "..."},
+    {"step": "Treatment", "product": "..."},
+    {"step": "Moisturizer", "product": "..."}
+  ],
+  "diy": [
+    "Short DIY/home care tip 1",
+    "Short DIY/home care tip 2"
+  ],
+  "caution": "Short safety note if needed"
+}
+
+'allowed_products' is a table, most relevant product first: an optional
+"tags:" line (number=tag), a header row, then one row per product with "|"
+between columns and "," between list items. A number in skin_types or
+concerns stands for the tag with that number.
+
+Rules:
+- Be gentle and teen-safe by default.
+- Use lower-strength actives for younger or sensitive users.
+- Avoid strong retinoids and harsh exfoliation unless user clearly wants anti-aging or is adult.
+- Never mention brand marketing, hype or trends, just safe choices.
+"""
+
+# ---- token estimate ---------------------------------------------------------
+
+_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    # rough BPE-style count without a tokenizer: a word is one token per ~5
+    # letters, a number one per 3 digits, punctuation one each. Good enough
+    # to compare payloads and keep one under a budget.
+    n = 0
+    for piece in _PIECES.findall(text or ""):
+        if piece[0].isalpha():
+            n += (len(piece) + 4) // 5
+        elif piece[0].isdigit():
+            n += (len(piece) + 2) // 3
+        else:
+            n += 1
+    return n
+
+
+# ---- compact encoding -------------------------------------------------------
+
+def _cell(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def encode_products(products):
+    counts = {}
+    for p in products:
+        for col in CODED:
+            for tag in p[col]:
+                counts[tag] = counts.get(tag, 0) + 1
+    # a tag gets a number only if n uses of the number plus its "k=tag"
+    # entry cost fewer tokens than writing the tag out n times
+    codes = {}
+    for tag, n in counts.items():
+        cost = estimate_tokens(_cell(tag))
+        if n * cost > n + 2 + cost:
+            codes[tag] = str(len(codes))
+
+    lines = []
+    if codes:
+        lines.append("tags: " + " ".join(f"{code}={tag}" for tag, code in codes.items()))
+    lines.append("|".join(COLUMNS))
+    for p in products:
+        cells = []
+        for col in COLUMNS:
+            if col in CODED:
+                cells.append(",".join(codes.get(t, _cell(t)) for t in p[col]))
+            else:
+                cells.append(_cell(p[col]))
+        lines.append("|".join(cells))
+    return "\n".join(lines)
+
+
+@timed()
+def product_payload(products, budget=None):
+    # products: best first, as filter_products returns them
+    # -> (allowed_products text, products kept)
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    keep = len(products)
+    payload = encode_products(products)
+    while keep > MIN_PROMPT_PRODUCTS and estimate_tokens(payload) > budget:
+        keep -= 1
+        payload = encode_products(products[:keep])
+    return payload, products[:keep]
@@ -0,0 +1,265 @@
+import re
+
+import numpy as np
+
+from skinsync.heuristics import scan_text
+
+# ==========================================
+# PRODUCT RANKING (feature matrix x weight vector)
+# ==========================================
+# Each product is a column of small-int features: one 0/1 feature per skin
+# type and per concern tag, plus ordinal irritation, strength, comedogenic
+# rating and price tier. A profile + message becomes a weight per feature,
+# and the whole catalog is scored with one matrix-vector product. The
+# matrix is int8 and feature-major and weights are quantised to quarters,
+# so the product is a few int16 multiply-adds over contiguous rows of only
+# the features with a non-zero weight: a quarter of the memory traffic of
+# a float32 product, which is what bounds it. Products are stored grouped
+# by category, so each category's top-k comes from a contiguous slice of
+# the score vector.
+#
+# Only two things exclude a product outright: adult-only products for
+# non-adults, and products containing a stated allergen. Everything else
+# (a skin-type mismatch, the wrong concern) just scores lower, so there is
+# always a best-effort answer instead of a fallback to the whole catalog.
+#
+# Exclusions don't change the scores, so each cached score vector also
+# keeps its best CATEGORY_CANDIDATES positions per category. A query drops
+# its excluded products from those short lists and only ranks a whole
+# category again when exclusions leave fewer than per_category in it.
+
+PER_CATEGORY = 3
+MAX_RESULTS = 12
+WEIGHT_SCALE = 4  # weights are applied in quarter steps
+EXCLUDED = np.iinfo(np.int16).min
+SCORE_CACHE_BYTES = 16 * 1024 * 1024
+PARTITION_MAX = 4096
+CATEGORY_CANDIDATES = 8
+
+IRRITATION_LEVEL = {"very_low": 0, "low": 1, "medium": 2, "high": 3}
+STRENGTH_LEVEL = {"very_gentle": 0, "barrier": 0, "hydrating": 0, "gentle": 1, "medium": 2, "strong": 3}
+PRICE_TIER = {"budget": 0, "mid": 1, "premium": 2}
+ORDINALS = ["irritation", "strength", "comodogenic", "price"]
+
+# CONCERN_KEYWORDS groups (skinsync.heuristics) -> catalog concern tags
+CONCERN_TAGS = {
+    "acne": ["acne", "clogged_pores"],
+    "pigment": ["pigmentation", "dark_spots", "dullness"],
+    "dry": ["dryness", "dehydration", "barrier_damage", "hydration"],
+    "oily": ["oiliness", "clogged_pores"],
+    "anti_age": ["anti_aging", "texture"],
+}
+# skin types close enough to be worth suggesting (the old oily/combination allowance)
+NEIGHBOUR_SKIN = {"oily": ["combination"], "combination": ["oily", "normal"], "normal": ["combination"]}
+BUDGET_WORDS = re.compile(r"\b(cheap|budget|affordable|inexpensive)\b")
+
+# feature weights
+W_SKIN_EXACT = 4.0
+W_SKIN_ALL = 3.0
+W_SKIN_NEIGHBOUR = 2.0
+W_CONCERN = 3.0
+W_MESSAGE_CONCERN = 1.0  # on top of W_CONCERN when the message itself says it
+
+
+def _ordinal(catalog, field, levels, default):
+    ids = catalog.scalars[field]
+    lookup = np.array([levels.get(s, default) for s in catalog.strings], dtype=np.int8)
+    return lookup[ids] if len(ids) else np.zeros(0, dtype=np.int8)
+
+
+def _top_k(segment, k):
+    # positions of the k best scores, best first, earlier position first
+    # among equals. Small segments find the k-th best score with
+    # np.partition; big ones lower a threshold from the max instead (scores
+    # are small ints, so it is usually a few steps away, each one
+    # comparison), which beats partition past a few thousand rows.
+    n = len(segment)
+    if n <= PARTITION_MAX:
+        value = int(np.partition(segment, n - k)[n - k])
+    else:
+        value = int(segment.max())
+        steps = 0
+        while np.count_nonzero(segment >= value) < k and value > EXCLUDED:
+            steps += 1
+            if steps < 16:
+                value -= 1
+            else:  # a big gap: jump straight to the next score present
+                value = int(segment[segment < value].max())
+    candidates = np.flatnonzero(segment >= value)
+    scores = segment[candidates]
+    above = candidates[scores > value]
+    above = above[np.lexsort((above, -segment[above].astype(np.int32)))]
+    ties = candidates[scores == value][:k - len(above)]
+    return np.concatenate([above, ties])
+
+
+def _excluded(positions, excluded):
+    # positions in any of the sorted position arrays `excluded`
+    mask = np.zeros(len(positions), dtype=bool)
+    for hit in excluded:
+        i = np.minimum(np.searchsorted(hit, positions), len(hit) - 1)
+        mask |= hit[i] == positions
+    return mask
+
+
+class Ranker:
+    def __init__(self, catalog):
+        n = catalog.size
+        strings = catalog.strings
+
+        # row order grouped by category; `rows[p]` is the catalog row at position p
+        category = catalog.scalars["category"]
+        self.rows = np.argsort(category, kind="stable")
+        position = np.empty(n, dtype=np.int64)
+        position[self.rows] = np.arange(n)
+        cats, starts = np.unique(category[self.rows], return_index=True)
+        ends = list(starts[1:]) + [n]
+        self.segments = [(strings[c], int(a), int(b)) for c, a, b in zip(cats.tolist(), starts.tolist(), ends)]
+
+        # feature columns: skin:<tag>, concern:<tag>, then the ordinals
+        features = {}
+        tag_columns = []
+        for field, prefix, normalize in (
+            ("skin_types", "skin", lambda s: s.lower().replace(" ", "_")),
+            ("concerns", "concern", str.lower),
+        ):
+            rows, ids = catalog.occurrences(field)
+            column_of_id = {}
+            for string_id in np.unique(ids).tolist():
+                name = f"{prefix}:{normalize(strings[string_id])}"
+                column_of_id[string_id] = features.setdefault(name, len(features))
+            if len(ids):
+                cols = np.array([column_of_id[i] for i in ids.tolist()], dtype=np.int64)
+                tag_columns.append((position[rows], cols))
+        for name in ORDINALS:
+            features[name] = len(features)
+        self.features = features
+
+        columns = np.zeros((len(features), n), dtype=np.int8)
+        for pos, cols in tag_columns:
+            columns[cols, pos] = 1
+        columns[features["irritation"], position] = _ordinal(catalog, "irritation", IRRITATION_LEVEL, 1)
+        columns[features["strength"], position] = _ordinal(catalog, "strength", STRENGTH_LEVEL, 1)
+        columns[features["comodogenic"], position] = np.clip(catalog.comodogenic, 0, 5).astype(np.int8)
+        columns[features["price"], position] = _ordinal(catalog, "price_range", PRICE_TIER, 1)
+        self.columns = columns  # feature-major: columns[f] is feature f for every position
+        self._score_cache = {}
+
+        # exclusions as sorted position arrays
+        self.adult_only = np.sort(position[np.flatnonzero(catalog.flags["adult_only"])])
+        # ingredient -> positions, for allergy exclusion
+        rows, ids = catalog.occurrences("ingredients")
+        self.ingredients = {}
+        if len(ids):
+            order = np.argsort(ids, kind="stable")
+            distinct, first = np.unique(ids[order], return_index=True)
+            for string_id, chunk in zip(distinct.tolist(), np.split(position[rows[order]], first[1:])):
+                key = strings[string_id].lower()
+                prev = self.ingredients.get(key)
+                self.ingredients[key] = np.sort(chunk) if prev is None else np.union1d(prev, chunk)
+
+    def weights(self, profile, text, is_adult, concerns=()):
+        # concerns: CONCERN_KEYWORDS groups from earlier in the conversation
+        skin_type = (profile.get("skin_type") or "Combination").lower().replace(" ", "_")
+        concern = (profile.get("main_concern") or "").lower()
+        sensitivity = (profile.get("sensitivity") or "").lower()
+        message = (text or "").lower()
+        sensitive = skin_type == "sensitive" or "sensitive" in sensitivity
+
+        w = {}
+
+        def add(feature, value):
+            if feature in self.features:
+                w[feature] = w.get(feature, 0.0) + value
+
+        add(f"skin:{skin_type}", W_SKIN_EXACT)
+        add("skin:all", W_SKIN_ALL)
+        for s in NEIGHBOUR_SKIN.get(skin_type, []):
+            add(f"skin:{s}", W_SKIN_NEIGHBOUR)
+
+        profile_groups = scan_text(concern).values("concern")
+        message_groups = scan_text(message).values("concern")
+        wanted = {}
+        for group in profile_groups | message_groups | set(concerns):
+            for tag in CONCERN_TAGS.get(group, []):
+                wanted[tag] = W_CONCERN + (W_MESSAGE_CONCERN if group in message_groups else 0.0)
+        # profile choices like "Redness / Sensitivity" name catalog tags directly
+        for word in re.findall(r"[a-z]+", concern):
+            wanted.setdefault(word, W_CONCERN)
+        for tag, value in wanted.items():
+            add(f"concern:{tag}", value)
+
+        # gentler is better for sensitive skin and for teens
+        add("irritation", -1.0 if sensitive else -0.25)
+        add("strength", -0.75 if sensitive or not is_adult else 0.0)
+        acne = "acne" in profile_groups | message_groups or "acne" in concerns
+        add("comodogenic", -0.5 if skin_type in ("oily", "acne") or acne else -0.1)
+        add("price", -0.5 if BUDGET_WORDS.search(message) else 0.0)
+        return w
+
+    def _cached(self, weights):
+        # -> the score cache entry for these weights: [scores, candidates]
+        key = tuple(sorted(
+            (self.features[f], q) for f, q in
+            ((f, int(round(v * WEIGHT_SCALE))) for f, v in weights.items()) if q
+        ))
+        entry = self._score_cache.get(key)
+        if entry is not None:
+            return entry
+        n = self.columns.shape[1]
+        total = np.zeros(n, dtype=np.int16)
+        term = np.empty(n, dtype=np.int16)
+        for column, q in key:
+            np.multiply(self.columns[column], q, out=term, casting="unsafe")
+            total += term
+        total.flags.writeable = False
+        if (len(self._score_cache) + 1) * total.nbytes > SCORE_CACHE_BYTES:
+            self._score_cache.clear()
+        entry = self._score_cache[key] = [total, None]
+        return entry
+
+    def scores(self, weights):
+        # int16 score per position, in quarter units. Few distinct weight
+        # vectors come up (skin type x concerns x sensitivity x age), so the
+        # score vectors are cached, up to SCORE_CACHE_BYTES, and handed out
+        # read-only
+        return self._cached(weights)[0]
+
+    def top(self, profile, allergies, is_adult, text, per_category=PER_CATEGORY, limit=MAX_RESULTS, concerns=()):
+        # -> catalog rows, best first, at most `per_category` from each category
+        entry = self._cached(self.weights(profile, text, is_adult, concerns))
+        scores = entry[0]
+        if entry[1] is None:
+            # best positions per category, best first, before any exclusion
+            lists = [a + _top_k(scores[a:b], min(CATEGORY_CANDIDATES, b - a)) for _, a, b in self.segments]
+            entry[1] = (np.concatenate(lists) if lists else np.zeros(0, dtype=np.int64),
+                        np.cumsum([0] + [len(c) for c in lists]).tolist())
+        candidates, offsets = entry[1]
+
+        excluded = [] if is_adult else [self.adult_only]
+        for allergy in allergies or []:
+            for key in {allergy.lower(), allergy.lower().replace("_", " ")}:
+                hit = self.ingredients.get(key)
+                if hit is not None:
+                    excluded.append(hit)
+        excluded = [hit for hit in excluded if len(hit)]
+        dropped = _excluded(candidates, excluded) if excluded else None
+
+        picked = []
+        for i, (_, a, b) in enumerate(self.segments):
+            short = candidates[offsets[i]:offsets[i + 1]]
+            keep = short if dropped is None else short[~dropped[offsets[i]:offsets[i + 1]]]
+            if len(keep) < per_category and len(short) < b - a:
+                # exclusions used up the short list: rank the whole category
+                segment = scores[a:b].copy()
+                for hit in excluded:
+                    lo, hi = np.searchsorted(hit, [a, b])
+                    segment[hit[lo:hi] - a] = EXCLUDED
+                keep = _top_k(segment, min(per_category, b - a))
+                keep = a + keep[segment[keep] > EXCLUDED]
+            picked.append(keep[:per_category])
+        picked = np.concatenate(picked) if picked else np.zeros(0, dtype=np.int64)
+        # best score first, catalog order among equals
+        rows = self.rows[picked]
+        order = np.lexsort((rows, -scores[picked].astype(np.int32)))
+        return rows[order][:limit].tolist()
@@ -0,0 +1,125 @@
+import os
+
+from skinsync.heuristics import detect_severe_keywords, scan_text
+from skinsync.ranking import IRRITATION_LEVEL, STRENGTH_LEVEL
+
+# ==========================================
+# LOCAL ROUTINE BUILDER (no network)
+# ==========================================
+# Builds the same JSON the coach model is asked for (summary, am_routine,
+# pm_routine, diy, caution) straight from the ranked shortlist, applying
+# the SYSTEM_PROMPT rules in code: teen-safe by default, no retinoids or
+# adult-only products for non-adults, and nothing harsh (high irritation or
+# strong actives) for sensitive skin or teens. Each slot takes the best
+# ranked product that passes; sensitive skin takes the gentlest instead. A
+# slot with nothing allowed is left out, as the model may do.
+#
+# The chat uses it when the API call fails, and for every routine request
+# when SKINSYNC_LOCAL_ROUTINES is on (no API round trip at all).
+
+LOCAL_ROUTINES = os.getenv("SKINSYNC_LOCAL_ROUTINES", "0").lower() not in ("0", "false", "off", "no")
+
+RETINOIDS = {"retinol", "retinal", "retinoid", "tretinoin", "adapalene"}
+EXFOLIANTS = {"salicylic_acid", "bha", "aha", "glycolic_acid", "lactic_acid"}
+
+AM_SLOTS = [("Cleanser", "cleanser"), ("Serum", "serum"), ("Moisturizer", "moisturizer"), ("Sunscreen", "sunscreen")]
+PM_SLOTS = [("Cleanser", "cleanser"), ("Treatment", "serum"), ("Moisturizer", "moisturizer")]
+
+# by CONCERN_KEYWORDS group (skinsync.heuristics), most relevant first
+DIY_TIPS = {
+    "acne": ["Avoid picking or squeezing spots", "Change pillowcases twice a week"],
+    "oily": ["Blot shine with a tissue instead of washing again"],
+    "dry": ["Apply moisturizer on slightly damp skin", "Keep showers short and lukewarm"],
+    "pigment": ["Reapply sunscreen every 2–3 hours when outdoors"],
+    "anti_age": ["Sleep on your back when you can", "Never skip sunscreen, even indoors"],
+}
+DEFAULT_TIPS = ["Patch test new products on your jaw for 2–3 days", "Introduce one new product at a time"]
+MAX_TIPS = 3
+
+
+def _ingredients(p):
+    return {i.lower() for i in p.get("ingredients", [])}
+
+
+def _allowed(p, is_adult, gentle, night, active_ok):
+    ingredients = _ingredients(p)
+    if not is_adult and (p.get("adult_only") or ingredients & RETINOIDS):
+        return False
+    if ingredients & RETINOIDS and not night:
+        return False  # retinoids break down in daylight
+    if ingredients & (RETINOIDS | EXFOLIANTS) and not active_ok:
+        return False
+    if gentle and p.get("category") != "sunscreen":
+        # a sunscreen's "strong" is its SPF, not an active
+        if p.get("irritation") == "high" or p.get("strength") == "strong":
+            return False
+    return True
+
+
+def _pick(products, category, sensitive, avoid, **rules):
+    candidates = [p for p in products if p.get("category") == category and _allowed(p, **rules)]
+    if sensitive:
+        # stable: rank order among equally gentle products
+        candidates.sort(key=lambda p: (
+            IRRITATION_LEVEL.get(p.get("irritation"), 1),
+            STRENGTH_LEVEL.get(p.get("strength"), 1),
+            bool(_ingredients(p) & EXFOLIANTS),
+        ))
+    for p in candidates:
+        if p["name"] not in avoid:
+            return p
+    return candidates[0] if candidates else None
+
+
+def _routine(products, slots, is_adult, gentle, sensitive, night, avoid=()):
+    # at most one exfoliant or retinoid per routine, and for sensitive skin
+    # and teens only at night. The serum slot picks first so the active goes
+    # in the treatment rather than the cleanser.
+    picked = {}
+    active_ok = night or not gentle
+    for step, category in sorted(slots, key=lambda slot: slot[1] != "serum"):
+        p = _pick(products, category, sensitive, avoid if category == "serum" else (),
+                  is_adult=is_adult, gentle=gentle, night=night, active_ok=active_ok)
+        if p:
+            picked[step] = p["name"]
+            active_ok = active_ok and not _ingredients(p) & (RETINOIDS | EXFOLIANTS)
+    return [{"step": step, "product": picked[step]} for step, _ in slots if step in picked]
+
+
+def build_routine(products, profile, is_adult, text="", signals=None):
+    # products: the shortlist, best first, as filter_products returns it.
+    # signals: the session's ConversationSignals, for concerns and severity
+    # from earlier messages (None: this message only)
+    skin_type = (profile.get("skin_type") or "Combination").lower()
+    concern = profile.get("main_concern") or ""
+    sensitive = skin_type == "sensitive" or "sensitive" in (profile.get("sensitivity") or "").lower()
+    gentle = sensitive or not is_adult
+    groups = scan_text(concern.lower()).values("concern") | scan_text((text or "").lower()).values("concern")
+    severe = detect_severe_keywords(text or "")
+    if signals is not None:
+        groups = groups | signals.concerns
+        severe = severe or signals.severe
+
+    am = _routine(products, AM_SLOTS, is_adult, gentle, sensitive, night=False)
+    # a different serum at night when there is one
+    pm = _routine(products, PM_SLOTS, is_adult, gentle, sensitive, night=True, avoid={s["product"] for s in am})
+
+    tips = [t for g in DIY_TIPS if g in groups for t in DIY_TIPS[g]]
+    tips = list(dict.fromkeys(tips + DEFAULT_TIPS))[:MAX_TIPS]
+
+    if severe:
+        caution = "Bleeding, pus, fever or spreading redness need an in-person dermatologist soon."
+    elif sensitive:
+        caution = "Start each product every other day and stop anything that stings or burns."
+    elif not is_adult:
+        caution = "Keep actives gentle; check with a dermatologist before stronger treatments."
+    else:
+        caution = "If symptoms worsen or are painful, see a dermatologist."
+
+    focus = concern.split("/")[0].strip().lower() or "healthy skin"
+    tone = "gentle" if gentle else "simple"
+    summary = f"A {tone} routine for {skin_type} skin focused on {focus}."
+    if not am and not pm:
+        summary = "No products in our catalog fit your profile and allergies right now."
+
+    return {"summary": summary, "am_routine": am, "pm_routine": pm, "diy": tips, "caution": caution}
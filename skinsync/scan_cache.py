@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from skinsync.imaging import BATCH_SIZE, analyze_skin_image, analyze_skin_images, open_scan_image
+
+# ==========================================
+# SCAN CACHE (content-hash keyed, shared)
+# ==========================================
+# Streamlit reruns the scan page on every widget interaction, and people
+# re-upload the same photo. Keyed on a BLAKE2 digest of the upload bytes, one
+# entry keeps the display thumbnail plus the analysis results once the user
+# has asked for them, so a rerun or re-upload costs a hash and a dict
+# lookup. Shared by all sessions of the process and bounded by entry count
+# and thumbnail bytes.
+
+CACHE_MAX_ENTRIES = int(os.getenv("SKINSYNC_SCAN_CACHE_ENTRIES", "128"))
+CACHE_MAX_BYTES = int(os.getenv("SKINSYNC_SCAN_CACHE_MB", "64")) * 2**20
+THUMBNAIL_SIZE = (640, 640)
+
+
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ScanEntry:
+    __slots__ = ("thumbnail", "result", "batch_result", "nbytes")
+
+    def __init__(self, thumbnail, result=None, batch_result=None):
+        self.thumbnail = thumbnail
+        self.result = result              # (mean_red, severity), full-size path
+        self.batch_result = batch_result  # (mean_red, severity), batch path
+        w, h = thumbnail.size
+        self.nbytes = w * h * len(thumbnail.getbands())
+
+
+def make_thumbnail(image):
+    thumb = image.copy()
+    thumb.thumbnail(THUMBNAIL_SIZE)
+    return thumb
+
+
+class ScanCache:
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.counters["hits"] += 1
+            return entry
+
+    def put(self, digest, entry):
+        with self._lock:
+            old = self._entries.pop(digest, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[digest] = entry
+            self._bytes += entry.nbytes
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_scan_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScanCache()
+        return _cache
+
+
+def load_scan(img_bytes):
+    # the display thumbnail, decoded once per distinct photo (JPEGs at
+    # reduced scale); nothing is analysed until the user asks
+    cache = get_scan_cache()
+    digest = content_digest(img_bytes)
+    entry = cache.get(digest)
+    if entry is None:
+        entry = ScanEntry(make_thumbnail(open_scan_image(img_bytes, target_size=THUMBNAIL_SIZE)))
+        cache.put(digest, entry)
+    return entry
+
+
+def analyze_scan(img_bytes):
+    # -> (mean_red, severity) at full size, computed once per distinct photo
+    cache = get_scan_cache()
+    digest = content_digest(img_bytes)
+    entry = cache.get(digest)
+    if entry is None or entry.result is None:
+        image = open_scan_image(img_bytes)
+        entry = ScanEntry(
+            entry.thumbnail if entry is not None else make_thumbnail(image),
+            result=analyze_skin_image(image),
+            batch_result=entry.batch_result if entry is not None else None,
+        )
+        cache.put(digest, entry)
+    return entry.result
+
+
+def analyze_scans(all_bytes):
+    # -> (mean_red, severity) per photo on the batch path; the photos not
+    # analysed yet are scored together in one analyze_skin_images() call
+    cache = get_scan_cache()
+    digests = [content_digest(b) for b in all_bytes]
+    entries = [cache.get(d) for d in digests]
+
+    missing = [i for i, e in enumerate(entries) if e is None or e.batch_result is None]
+    if missing:
+        images = [open_scan_image(all_bytes[i], target_size=BATCH_SIZE) for i in missing]
+        for i, image, result in zip(missing, images, analyze_skin_images(images)):
+            old = entries[i]
+            entries[i] = ScanEntry(
+                old.thumbnail if old is not None else make_thumbnail(image),
+                result=old.result if old is not None else None,
+                batch_result=result,
+            )
+            cache.put(digests[i], entries[i])
+    return [e.batch_result for e in entries]
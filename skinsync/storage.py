@@ -0,0 +1,337 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from skinsync.consult_search import (
+    FTS_INSERT,
+    SEARCH_CANDIDATES,
+    SNIPPET_TOKENS,
+    WEIGHTS,
+    fts_row,
+    match_query,
+)
+from skinsync.diary_stats import DAILY_UPSERT, SUM_COLUMNS, daily_row
+from skinsync.metrics import span, sql_span_name
+
+# ==========================================
+# STORAGE (SQLite, WAL, pooled connections)
+# ==========================================
+# Every session and thread used to share one connection and one cursor. Now
+# each operation checks a connection out of a small pool, writes run in an
+# explicit BEGIN IMMEDIATE transaction, and WAL lets readers carry on while
+# a writer commits. busy_timeout makes a writer wait for the lock instead of
+# failing with "database is locked".
+
+DB_PATH = os.getenv("SKINSYNC_DB_PATH", "skinsync.db")
+POOL_SIZE = int(os.getenv("SKINSYNC_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = int(os.getenv("SKINSYNC_DB_BUSY_TIMEOUT_MS", "5000"))
+
+
+def consult_fields(data):
+    # data: the JSON text stored in consults.data
+    try:
+        payload = json.loads(data)
+        prof = payload.get("profile", {})
+        return (
+            prof.get("skin_type") or "Unknown",
+            prof.get("main_concern") or "Unknown",
+            len(payload.get("allergies") or []),
+            1 if payload.get("last_plan") else 0,
+        )
+    except Exception:
+        return ("Unknown", "Unknown", 0, 0)
+
+
+def _connect(path, synchronous="NORMAL"):
+    # isolation_level=None: no implicit transactions, we issue BEGIN ourselves.
+    # synchronous=NORMAL under WAL: a commit survives a crash of the process
+    # but not necessarily a power cut; FULL also fsyncs the WAL on commit.
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+@contextmanager
+def immediate_transaction(conn):
+    # take the write lock up front so concurrent writers queue on
+    # busy_timeout instead of deadlocking on a lock upgrade
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+# ---- app writes, inside the caller's transaction ---------------------------
+
+def write_booking(conn, name, email, city, date, time, reason, created_at):
+    return conn.execute(
+        "INSERT INTO bookings (name,email,city,date,time,reason,created_at) "
+        "VALUES (?,?,?,?,?,?,?)",
+        (name, email, city, date, time, reason, created_at),
+    ).lastrowid
+
+
+def write_consult(conn, session_id, data, created_at):
+    # the consult and its search row commit together
+    row_id = conn.execute(
+        "INSERT INTO consults (session_id,data,created_at,skin_type,main_concern,allergies_count,has_plan) "
+        "VALUES (?,?,?,?,?,?,?)",
+        (session_id, data, created_at, *consult_fields(data)),
+    ).lastrowid
+    conn.execute(FTS_INSERT, fts_row(row_id, data))
+    return row_id
+
+
+def write_diary(conn, entry_date, mood, redness, oiliness, sleep_hours, water_glasses, note, created_at):
+    # the entry and its day's aggregate row commit together
+    row_id = conn.execute(
+        "INSERT INTO diary (entry_date,mood,redness,oiliness,sleep_hours,water_glasses,note,created_at)"
+        "VALUES (?,?,?,?,?,?,?,?)",
+        (entry_date, mood, redness, oiliness, sleep_hours, water_glasses, note, created_at),
+    ).lastrowid
+    conn.execute(DAILY_UPSERT, daily_row(entry_date, redness, oiliness, sleep_hours, water_glasses))
+    return row_id
+
+
+class Storage:
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = _connect(self.path)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn, immediate_transaction(conn):
+            yield conn
+
+    def dedicated_connection(self, synchronous="NORMAL"):
+        # an unpooled connection, owned and closed by the caller
+        return _connect(self.path, synchronous)
+
+    def init_schema(self):
+        # versioned migrations (skinsync.migrations), once per process; after
+        # that no DDL runs at all
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            from skinsync.migrations import migrate
+
+            migrate(self)
+            self._schema_ready = True
+
+    def execute(self, sql, params=()):
+        with span(sql_span_name(sql)), self.transaction() as conn:
+            return conn.execute(sql, params).lastrowid
+
+    def query(self, sql, params=()):
+        with span(sql_span_name(sql)), self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def read_df(self, sql, params=()):
+        import pandas as pd
+
+        with span(sql_span_name(sql)), self.connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    # ---- list pages (keyset pagination) ------------------------------------
+
+    def keyset_page(self, table, columns, filters=None, before_id=None, limit=50):
+        # newest-first page of `table`: WHERE <filters> AND id < before_id.
+        # Cost depends on the page size, not on how deep the page is.
+        # Returns (df, has_more); table/columns are code constants, never input.
+        where, params = [], []
+        for column, value in (filters or {}).items():
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        df = self.read_df(sql, (*params, limit + 1))
+        return df.iloc[:limit], len(df) > limit
+
+    def distinct_values(self, table, column):
+        # non-NULL values, sorted. A skip-scan: each step is one seek on the
+        # (column, id) index for the next value up, so the cost grows with
+        # the number of distinct values, not rows (DISTINCT reads the whole
+        # index). table/column are code constants, never input.
+        return [r[0] for r in self.query(
+            f"WITH RECURSIVE v(x) AS ("
+            f"SELECT MIN({column}) FROM {table} "
+            f"UNION ALL SELECT (SELECT MIN({column}) FROM {table} WHERE {column} > v.x) FROM v WHERE v.x IS NOT NULL"
+            f") SELECT x FROM v WHERE x IS NOT NULL"
+        )]
+
+    def consult_filter_values(self):
+        return self.distinct_values("consults", "skin_type"), self.distinct_values("consults", "main_concern")
+
+    def list_consults(self, skin_type=None, main_concern=None, before_id=None, limit=100):
+        return self.keyset_page(
+            "consults",
+            ["id", "skin_type", "main_concern", "allergies_count", "has_plan", "created_at"],
+            {"skin_type": skin_type, "main_concern": main_concern},
+            before_id,
+            limit,
+        )
+
+    def list_bookings(self, city=None, before_id=None, limit=50):
+        return self.keyset_page(
+            "bookings",
+            ["id", "name", "city", "date", "time", "reason", "created_at"],
+            {"city": city},
+            before_id,
+            limit,
+        )
+
+    def list_diary(self, mood=None, before_id=None, limit=30):
+        return self.keyset_page(
+            "diary",
+            ["id", "entry_date", "mood", "redness", "oiliness", "sleep_hours", "water_glasses", "note"],
+            {"mood": mood},
+            before_id,
+            limit,
+        )
+
+    def search_consults(self, text, skin_type=None, main_concern=None, cursor=None, limit=50):
+        # best bm25 matches first, with a highlighted snippet from the best
+        # column -> (df, next_cursor); None when the text has nothing to
+        # search for. Matches (after the filters) are ranked in windows of
+        # the newest SEARCH_CANDIDATES, so a word that is in half the
+        # consults costs the same as a rare one. A page is `limit` rows of
+        # one window; next_cursor = (before_rowid, offset) walks the rest of
+        # the window, then the next older one, so every match is reachable.
+        match = match_query(text)
+        if match is None:
+            return None
+        before, offset = cursor or (None, 0)
+        where, params = [], []
+        if before is not None:
+            where.append(" AND consults_fts.rowid < ?")
+            params.append(before)
+        for column, value in (("c.skin_type", skin_type), ("c.main_concern", main_concern)):
+            if value is not None:
+                where.append(f" AND {column} = ?")
+                params.append(value)
+        source = "FROM consults_fts JOIN consults c ON c.id = consults_fts.rowid WHERE consults_fts MATCH ?"
+
+        # the window's oldest rowid, and whether anything older matches
+        edge = [r[0] for r in self.query(
+            f"SELECT consults_fts.rowid {source}{''.join(where)} ORDER BY consults_fts.rowid DESC LIMIT 2 OFFSET ?",
+            (match, *params, SEARCH_CANDIDATES - 1),
+        )]
+        low = edge[0] if edge else 0
+
+        df = self.read_df(
+            "SELECT c.id, c.skin_type, c.main_concern, c.created_at, "
+            f"snippet(consults_fts, -1, '«', '»', '…', {SNIPPET_TOKENS}) AS snippet "
+            f"{source} AND consults_fts.rowid >= ?{''.join(where)} "
+            f"ORDER BY bm25(consults_fts, {', '.join(map(str, WEIGHTS))}) LIMIT ? OFFSET ?",
+            (match, low, *params, limit + 1, offset),
+        )
+        if len(df) > limit:
+            next_cursor = (before, offset + limit)
+        elif len(edge) == 2:
+            next_cursor = (low, 0)
+        else:
+            next_cursor = None
+        return df.iloc[:limit], next_cursor
+
+    def get_consult(self, consult_id):
+        rows = self.query("SELECT data, created_at FROM consults WHERE id = ?", (consult_id,))
+        return rows[0] if rows else None
+
+    # ---- app writes -------------------------------------------------------
+    # one transaction per call; the pages queue theirs through
+    # skinsync.write_queue instead, which commits them in batches
+
+    def insert_booking(self, name, email, city, date, time, reason, created_at):
+        with span("sql INSERT bookings"), self.transaction() as conn:
+            return write_booking(conn, name, email, city, date, time, reason, created_at)
+
+    def insert_consult(self, session_id, data, created_at):
+        with span("sql INSERT consults"), self.transaction() as conn:
+            return write_consult(conn, session_id, data, created_at)
+
+    def insert_diary(self, entry_date, mood, redness, oiliness, sleep_hours, water_glasses, note, created_at):
+        with span("sql INSERT diary"), self.transaction() as conn:
+            return write_diary(conn, entry_date, mood, redness, oiliness, sleep_hours, water_glasses, note, created_at)
+
+    # ---- diary aggregates ---------------------------------------------------
+
+    def diary_daily(self, since=None):
+        # one row per logged day (see skinsync.diary_stats), oldest first
+        sql = f"SELECT entry_date, {', '.join(SUM_COLUMNS)} FROM diary_daily"
+        params = ()
+        if since is not None:
+            sql += " WHERE entry_date >= ?"
+            params = (str(since),)
+        return self.read_df(sql + " ORDER BY entry_date", params)
+
+    def diary_first_day(self):
+        return self.query("SELECT MIN(entry_date) FROM diary_daily")[0][0]
+
+    # ---- metrics sink -----------------------------------------------------
+
+    def add_span_histograms(self, spans, buckets):
+        # spans: (name, count, sum_ms, max_ms); buckets: (name, le_ms, count)
+        with span("sql UPSERT perf_spans"), self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO perf_spans (name,count,sum_ms,max_ms) VALUES (?,?,?,?) "
+                "ON CONFLICT(name) DO UPDATE SET count = count + excluded.count, "
+                "sum_ms = sum_ms + excluded.sum_ms, max_ms = MAX(max_ms, excluded.max_ms)",
+                spans,
+            )
+            conn.executemany(
+                "INSERT INTO perf_buckets (name,le_ms,count) VALUES (?,?,?) "
+                "ON CONFLICT(name, le_ms) DO UPDATE SET count = count + excluded.count",
+                buckets,
+            )
+
+    def span_histograms(self):
+        # everything add_span_histograms() has summed so far
+        return (
+            self.query("SELECT name, count, sum_ms, max_ms FROM perf_spans"),
+            self.query("SELECT name, le_ms, count FROM perf_buckets"),
+        )
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = Storage()
+            _storage.init_schema()
+        return _storage
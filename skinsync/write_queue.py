@@ -0,0 +1,184 @@
+import atexit
+import os
+import queue
+import threading
+from concurrent.futures import Future, wait
+
+from skinsync.metrics import span
+from skinsync.storage import get_storage, immediate_transaction
+
+# ==========================================
+# WRITE-BEHIND QUEUE (group commit)
+# ==========================================
+# The booking, diary and consult forms used to run their INSERT and commit on
+# the script thread, one transaction per action, so a page stalled whenever
+# SQLite was busy. They now submit() the write and get a Future back. One
+# writer thread takes everything queued since its last commit and runs it in
+# a single BEGIN IMMEDIATE transaction, each write inside its own SAVEPOINT
+# so a bad row fails alone.
+#
+# Acknowledgements are durable: the writer has its own connection with
+# synchronous=FULL, so each batch commit fsyncs the WAL, and a write's
+# Future resolves with its row id only after that commit returns (or with
+# the exception if it didn't). Group commit is what makes this affordable:
+# one fsync per batch instead of one per form save. A write that hasn't been
+# acknowledged lives only in memory; close() drains the queue and is
+# registered with atexit, so a normal shutdown loses nothing, but a killed
+# process loses the unacknowledged writes it still had queued.
+
+WRITE_BATCH_MAX = int(os.getenv("SKINSYNC_WRITE_BATCH_MAX", "256"))
+WRITE_QUEUE_MAX = int(os.getenv("SKINSYNC_WRITE_QUEUE_MAX", "10000"))
+# how long submit() waits for room in a full queue before failing the write
+WRITE_SUBMIT_SECONDS = float(os.getenv("SKINSYNC_WRITE_SUBMIT_SECONDS", "5"))
+SHUTDOWN_FLUSH_SECONDS = float(os.getenv("SKINSYNC_WRITE_SHUTDOWN_SECONDS", "10"))
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, storage, batch_max=WRITE_BATCH_MAX, queue_max=WRITE_QUEUE_MAX,
+                 submit_timeout=WRITE_SUBMIT_SECONDS):
+        self.storage = storage
+        self.batch_max = batch_max
+        self.submit_timeout = submit_timeout
+        self._queue = queue.Queue(maxsize=queue_max)
+        self._lock = threading.Lock()
+        # close() waits on this until no submit()/flush() is mid-put, so
+        # nothing lands in the queue behind the stop marker
+        self._idle = threading.Condition(self._lock)
+        self._putting = 0
+        self._thread = None
+        self._conn = None  # the writer thread's, see _run
+        self._closed = False
+        self.counters = {"writes": 0, "batches": 0, "failed": 0, "rejected": 0}
+
+    def _put(self, item):
+        # the put itself runs outside the lock: a full queue blocks only this
+        # caller, never close() or the other pages' submits
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("write queue is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="skinsync-writer", daemon=True)
+                self._thread.start()
+            self._putting += 1
+        try:
+            self._queue.put(item, timeout=self.submit_timeout)
+            return True
+        except queue.Full:
+            return False
+        finally:
+            with self._lock:
+                self._putting -= 1
+                if not self._putting:
+                    self._idle.notify_all()
+
+    def submit(self, write, *args):
+        # write(conn, *args) -> row id, run later on the writer thread (see
+        # skinsync.storage.write_*). Waits up to submit_timeout while
+        # WRITE_QUEUE_MAX writes are already queued, then fails the Future.
+        future = Future()
+        if not self._put((write, args, future)):
+            self.counters["rejected"] += 1
+            future.set_exception(RuntimeError("write queue is full"))
+        return future
+
+    def flush(self, timeout=None):
+        # wait until everything submitted so far has committed; False on timeout
+        with self._lock:
+            if self._thread is None or self._closed:
+                return True
+        marker = Future()
+        try:
+            if not self._put((None, (), marker)):
+                return False
+        except RuntimeError:  # closed meanwhile, close() drained the queue
+            return True
+        done, _ = wait([marker], timeout)
+        return bool(done)
+
+    def close(self, timeout=None):
+        # commit what is queued and stop the writer; submit() raises after this
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            while self._putting:
+                self._idle.wait()
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _run(self):
+        # the writer's own connection: FULL, unlike the pool's NORMAL
+        self._conn = self.storage.dedicated_connection(synchronous="FULL")
+        try:
+            self._loop()
+        finally:
+            self._conn.close()
+
+    def _loop(self):
+        while True:
+            # whatever queued up while the last batch committed is the next batch
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            self._commit([item for item in batch if item is not _STOP])
+            if stop:
+                return
+
+    def _commit(self, batch):
+        # a Future cancelled while queued is dropped here, before its write
+        # runs; the rest can no longer be cancelled
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        results = []
+        try:
+            with span("sql group commit"), immediate_transaction(self._conn) as conn:
+                for write, args, future in batch:
+                    if write is None:  # a flush() marker
+                        results.append((write, future, None, None))
+                        continue
+                    conn.execute("SAVEPOINT queued_write")
+                    try:
+                        results.append((write, future, write(conn, *args), None))
+                    except Exception as exc:
+                        conn.execute("ROLLBACK TO queued_write")
+                        results.append((write, future, None, exc))
+                    conn.execute("RELEASE queued_write")
+        except Exception as exc:
+            # the transaction itself failed (e.g. still locked after
+            # busy_timeout): nothing in this batch was written
+            self.counters["failed"] += sum(write is not None for write, _, _ in batch)
+            for _, _, future in batch:
+                future.set_exception(exc)
+            return
+
+        self.counters["batches"] += 1
+        for write, future, row_id, exc in results:
+            if exc is None:
+                self.counters["writes"] += write is not None
+                future.set_result(row_id)
+            else:
+                self.counters["failed"] += 1
+                future.set_exception(exc)
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue(get_storage())
+            # flush on shutdown: runs before daemon threads are stopped
+            atexit.register(_write_queue.close, SHUTDOWN_FLUSH_SECONDS)
+        return _write_queue
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SKINSYNC_METRICS", "0")
+
+from skinsync.storage import Storage  # noqa: E402
+
+
+@pytest.fixture
+def storage(tmp_path):
+    s = Storage(str(tmp_path / "test.db"))
+    s.init_schema()
+    return s
@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_catalog import PROFILES, make_catalog
+from skinsync import catalog
+from skinsync.catalog import filter_products
+from skinsync.catalog_store import Catalog, load_catalog, save_catalog
+
+
+def products(prefix, n=60, seed=7):
+    rows = make_catalog(n, seed=seed)
+    for i, p in enumerate(rows):
+        p["name"] = f"{prefix} {i}"
+    return rows
+
+
+def test_jsonl_npz_jsonl_round_trip(tmp_path):
+    rows = products("Product", 20)
+    rows[0].update(name="Crème Hydratante — 保湿", skin_types=[], concerns=[], ingredients=[])
+    rows[1].update(name="Сыворотка ✨", brand="Ölmühle", ingredients=["centella asiática"])
+
+    jsonl = str(tmp_path / "products.jsonl")
+    npz = str(tmp_path / "products.npz")
+    back = str(tmp_path / "back.jsonl")
+    save_catalog(Catalog.from_records(rows), jsonl)
+    save_catalog(load_catalog(jsonl), npz)
+    save_catalog(load_catalog(npz), back)
+
+    assert load_catalog(npz).records() == rows
+    assert load_catalog(back).records() == rows
+
+
+def test_wrong_format_version_raises(tmp_path):
+    path = str(tmp_path / "products.npz")
+    save_catalog(Catalog.from_records(products("Product", 5)), path)
+    with np.load(path) as z:
+        arrays = dict(z)
+    arrays["format_version"] = np.asarray(99)
+    np.savez(path, **arrays)
+
+    with pytest.raises(ValueError, match="format 99"):
+        load_catalog(path)
+
+
+def test_replaced_file_is_picked_up(tmp_path, monkeypatch):
+    path = str(tmp_path / "products.jsonl")
+    save_catalog(Catalog.from_records(products("Old")), path)
+    monkeypatch.setattr(catalog, "CATALOG_PATH", path)
+    monkeypatch.setattr(catalog, "CATALOG_CHECK_SECONDS", 0)
+    monkeypatch.setattr(catalog, "_index", None)
+    monkeypatch.setattr(catalog, "_signature", None)
+    monkeypatch.setattr(catalog, "_pinned", False)
+
+    profile = PROFILES[1]
+    assert all(p["name"].startswith("Old ") for p in filter_products(profile, [], "dry skin"))
+
+    # same way a deploy swaps it in: write next to it, then rename over
+    tmp = str(tmp_path / "next.jsonl")
+    save_catalog(Catalog.from_records(products("New", seed=8)), tmp)
+    os.replace(tmp, path)
+
+    shortlist = filter_products(profile, [], "dry skin")
+    assert shortlist and all(p["name"].startswith("New ") for p in shortlist)
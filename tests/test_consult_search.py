@@ -0,0 +1,57 @@
+import json
+
+from skinsync.consult_search import SEARCH_CANDIDATES, match_query
+from skinsync.storage import write_consult
+
+
+def consult(text, skin_type="Oily"):
+    return json.dumps({
+        "profile": {"skin_type": skin_type, "main_concern": "Acne / Breakouts"},
+        "conversation": [{"role": "user", "text": text}, {"role": "assistant", "text": "Try a gentle cleanser."}],
+        "last_plan": {"summary": "gentle", "am_routine": [{"step": "Cleanser", "product": "CeraVe Foaming Cleanser"}]},
+        "allergies": [],
+    })
+
+
+def search_all(storage, text, **filters):
+    ids, cursor = [], None
+    while True:
+        df, cursor = storage.search_consults(text, cursor=cursor, limit=500, **filters)
+        ids.extend(df["id"].tolist())
+        if cursor is None:
+            return ids
+
+
+def test_match_query_quotes_words_and_prefixes_last():
+    assert match_query('acne OR "x"') == '"acne" "or" "x"*'
+    assert match_query("  ,, ") is None
+
+
+def test_search_finds_products_and_snippets(storage):
+    storage.insert_consult("s", consult("my forehead keeps breaking out"), "2026-01-01")
+    storage.insert_consult("s", consult("cheeks feel tight"), "2026-01-01")
+    df, cursor = storage.search_consults("forehead")
+    assert df["id"].tolist() == [1] and cursor is None
+    assert "«forehead»" in df["snippet"][0]
+    assert len(storage.search_consults("cerave")[0]) == 2
+    assert storage.search_consults("   ") is None
+
+
+def test_filters_apply_before_the_candidate_window(storage):
+    # the oldest 1000 matches are Dry, newer ones Oily: the Dry ones must
+    # still be found through the filter
+    rows = SEARCH_CANDIDATES + 1000
+    with storage.transaction() as conn:
+        for i in range(rows):
+            write_consult(conn, "s", consult(f"acne {i}", "Dry" if i < 1000 else "Oily"), "2026-01-01")
+    df, _ = storage.search_consults("acne", skin_type="Dry")
+    assert len(df) == 50 and set(df["skin_type"]) == {"Dry"}
+    assert sorted(search_all(storage, "acne", skin_type="Dry")) == list(range(1, 1001))
+
+
+def test_paging_reaches_every_match_once(storage):
+    with storage.transaction() as conn:
+        for i in range(SEARCH_CANDIDATES + 300):
+            write_consult(conn, "s", consult(f"acne {i}"), "2026-01-01")
+    ids = search_all(storage, "acne")
+    assert sorted(ids) == list(range(1, SEARCH_CANDIDATES + 301))
@@ -0,0 +1,93 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from skinsync import diary_stats
+from skinsync.diary_stats import HABITS, SKIN, WINDOWS
+
+TODAY = date(2026, 3, 31)
+
+
+@pytest.fixture
+def diary(storage):
+    # 90 days, 0-3 entries a day; a few gaps and single-entry days on purpose
+    rng = random.Random(3)
+    for back in range(90):
+        day = TODAY - timedelta(days=back)
+        count = 1 if back in (0, 5, 40) else 0 if back in (2, 3, 33) else rng.randint(0, 3)
+        for _ in range(count):
+            storage.insert_diary(
+                str(day), "ok", rng.randint(0, 10), rng.randint(0, 10),
+                rng.choice([5, 6.5, 7, 8, 9.5]), rng.randint(0, 12), "", f"{day}T08:00:00",
+            )
+    return storage
+
+
+def page_view(storage, days):
+    # what render_diary_trends computes, from diary_daily only
+    start, load_from, end = diary_stats.trend_range(days, today=TODAY)
+    daily = storage.diary_daily(since=load_from)
+    trends = diary_stats.rolling_trends(daily, start, end)
+    corr = diary_stats.correlations(daily[daily["entry_date"] >= str(start)])
+    return start, end, trends, corr
+
+
+def raw(storage):
+    df = storage.read_df("SELECT entry_date, redness, oiliness, sleep_hours, water_glasses FROM diary")
+    df["entry_date"] = pd.to_datetime(df["entry_date"])
+    return df
+
+
+@pytest.mark.parametrize("days", [1, 7, 30, 60])
+def test_rolling_means_match_the_raw_diary(diary, days):
+    start, end, trends, _ = page_view(diary, days)
+    df = raw(diary)
+
+    assert list(trends.index) == list(pd.date_range(start, end, freq="D"))
+    for day in trends.index:
+        for w in WINDOWS:
+            window = df[(df["entry_date"] > day - pd.Timedelta(days=w)) & (df["entry_date"] <= day)]
+            for v in SKIN:
+                got = trends.loc[day, f"{v} ({w}d avg)"]
+                if window.empty:
+                    assert np.isnan(got)
+                else:
+                    assert got == pytest.approx(window[v].mean())
+
+
+@pytest.mark.parametrize("days", [7, 30, 60])
+def test_correlations_match_the_raw_diary(diary, days):
+    start, _, _, corr = page_view(diary, days)
+    df = raw(diary)
+    shown = df[df["entry_date"] >= pd.Timestamp(start)]
+
+    assert [(r["skin"], r["habit"]) for r in corr] == [(a, b) for a in SKIN for b in HABITS]
+    for row in corr:
+        assert row["entries"] == len(shown)
+        assert row["r"] == pytest.approx(shown[row["skin"]].corr(shown[row["habit"]]))
+
+
+def test_single_entry_window_has_no_correlation(diary):
+    # today has exactly one entry: zero variance, so there is no r to show
+    _, _, trends, corr = page_view(diary, 1)
+    today = raw(diary)
+    today = today[today["entry_date"] == pd.Timestamp(TODAY)]
+
+    assert len(today) == 1
+    for row in corr:
+        assert row["entries"] == 1
+        assert np.isnan(row["r"])
+    assert list(trends.index) == [pd.Timestamp(TODAY)]
+
+
+def test_since_window_reads_only_recent_days(diary):
+    _, load_from, _ = diary_stats.trend_range(7, today=TODAY)
+    daily = diary.diary_daily(since=load_from)
+    df = raw(diary)
+
+    assert (df["entry_date"] < pd.Timestamp(load_from)).any()
+    assert daily["entry_date"].min() >= str(load_from)
+    assert int(daily["n"].sum()) == int((df["entry_date"] >= pd.Timestamp(load_from)).sum())
@@ -0,0 +1,86 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from skinsync import http_client, llm
+from skinsync.http_client import http_client_metrics
+from skinsync.llm import call_openrouter_chat
+
+MESSAGES = [{"role": "user", "content": "my skin feels tight and flaky"}]
+
+
+class FakeOpenRouter(BaseHTTPRequestHandler):
+    # BaseHTTPRequestHandler speaks HTTP/1.0 (close after each response) by default
+    protocol_version = "HTTP/1.1"
+    keep_alive = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.peers.append(self.client_address)
+        body = json.dumps({"choices": [{"message": {"content": '{"summary": "ok"}'}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if not self.keep_alive:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # a local stand-in for the API; the chat code gets a fresh process-wide client
+    def start(keep_alive=True):
+        handler = type("Handler", (FakeOpenRouter,), {"keep_alive": keep_alive})
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        httpd.peers = []
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        started.append(httpd)
+        monkeypatch.setattr(llm, "OPENROUTER_URL", f"http://127.0.0.1:{httpd.server_port}/api/v1/chat/completions")
+        return httpd
+
+    started = []
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setattr(http_client, "_client", None)
+    monkeypatch.setattr(http_client, "_client_headers", None)
+    yield start
+    for httpd in started:
+        httpd.shutdown()
+        httpd.server_close()
+    if http_client._client is not None:
+        http_client._client.close()
+
+
+def test_two_calls_share_one_connection(server):
+    httpd = server()
+    assert http_client_metrics() is None
+
+    for _ in range(2):
+        assert call_openrouter_chat(MESSAGES, use_cache=False) == ('{"summary": "ok"}', None)
+
+    stats = http_client_metrics()
+    assert stats["requests"] == 2
+    assert stats["new_connections"] == 1
+    assert stats["errors"] == 0
+    assert stats["reuse_rate"] == 0.5
+    # and the server saw both requests on the same socket
+    assert len(httpd.peers) == 2 and httpd.peers[0] == httpd.peers[1]
+
+
+def test_closed_connections_are_counted(server):
+    httpd = server(keep_alive=False)
+
+    for _ in range(2):
+        assert call_openrouter_chat(MESSAGES, use_cache=False) == ('{"summary": "ok"}', None)
+
+    stats = http_client_metrics()
+    assert stats["requests"] == 2
+    assert stats["new_connections"] == 2
+    assert stats["reuse_rate"] == 0.0
+    assert httpd.peers[0] != httpd.peers[1]
@@ -0,0 +1,93 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmarks.bench_imaging import make_photo, original_analyze_skin_image
+from skinsync.imaging import (
+    FULL_DECODE_FACTOR,
+    ScanImageTooLarge,
+    analyze_skin_image,
+    analyze_skin_images,
+    open_scan_image,
+    redness_severity,
+)
+
+BATCH_TOLERANCE = 0.05
+
+
+@pytest.fixture(scope="module")
+def photos():
+    return [make_photo(320, 240, seed) for seed in range(4)] + [make_photo(640, 360, 9)]
+
+
+def test_single_matches_float32_reference(photos):
+    for photo in photos:
+        score, label = analyze_skin_image(photo)
+        assert score == pytest.approx(original_analyze_skin_image(photo), abs=1e-5)
+        assert label == redness_severity(score)
+
+
+def test_strip_wise_scoring_matches_whole_image(photos):
+    # a budget small enough to force a few rows per strip
+    photo = photos[-1]
+    whole, _ = analyze_skin_image(photo)
+    strips, _ = analyze_skin_image(photo, memory_budget=2 * 640 * 8 * 16)
+    assert strips == pytest.approx(whole, abs=1e-9)
+
+
+def test_batch_matches_float32_reference_within_tolerance(photos):
+    results = analyze_skin_images(photos)
+    assert len(results) == len(photos)
+    for photo, (score, label) in zip(photos, results):
+        assert score == pytest.approx(original_analyze_skin_image(photo), abs=BATCH_TOLERANCE)
+        assert label == redness_severity(score)
+
+
+def test_flat_and_grayscale_images():
+    flat = Image.new("RGB", (64, 64), (200, 150, 120))
+    assert analyze_skin_image(flat)[0] == 0.0
+    assert analyze_skin_images([flat])[0][0] == 0.0
+    gray = Image.fromarray(np.tile(np.arange(64, dtype=np.uint8), (64, 1)), "L")
+    assert analyze_skin_image(gray)[0] == pytest.approx(original_analyze_skin_image(gray), abs=1e-5)
+
+
+def test_batch_reports_bad_images_in_place(photos):
+    class Broken:
+        size = (10, 10)
+
+        def resize(self, *args):
+            raise OSError("truncated")
+
+    results = analyze_skin_images([photos[0], Broken(), photos[1]])
+    assert results[1] == (0.0, "Could not process this image.")
+    assert results[0][0] == pytest.approx(analyze_skin_images([photos[0]])[0][0])
+
+
+def encoded(image, fmt):
+    buf = io.BytesIO()
+    image.save(buf, fmt)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["PNG", "JPEG"])
+def test_large_uploads_are_shrunk_to_the_budget(fmt):
+    budget = 6 * 300 * 200  # decoded image may hold 300x200 pixels
+    data = encoded(make_photo(160, 120, 4).resize((480, 320)), fmt)
+    image = open_scan_image(data, memory_budget=budget)
+    assert image.size == (240, 160)  # the smallest factor that fits
+    full = analyze_skin_image(Image.open(io.BytesIO(data)))[0]
+    assert analyze_skin_image(image, memory_budget=budget)[0] == pytest.approx(full, abs=0.05)
+
+
+def test_palette_png_is_reduced():
+    data = encoded(make_photo(600, 400, 5).convert("P"), "PNG")
+    image = open_scan_image(data, memory_budget=6 * 300 * 200)
+    assert image.mode == "RGB" and image.size == (300, 200)
+
+
+def test_refuses_what_cannot_be_decoded_in_budget():
+    data = encoded(make_photo(900, 600, 6), "PNG")
+    with pytest.raises(ScanImageTooLarge):
+        open_scan_image(data, memory_budget=6 * (900 * 600 // (FULL_DECODE_FACTOR + 1)))
@@ -0,0 +1,63 @@
+import random
+
+from skinsync.heuristics import (
+    _vocabulary,
+    detect_intent,
+    detect_severe_keywords,
+    extract_allergies_from_text,
+    scan_text,
+)
+from skinsync.keywords import KeywordAutomaton, KeywordMatches
+
+
+def naive(vocabulary, text):
+    return KeywordMatches(label for keyword, label in vocabulary if keyword and keyword in text)
+
+
+def by_kind(matches):
+    return {kind: matches.values(kind) for kind in matches.kinds()}
+
+
+def test_overlapping_and_nested_keywords():
+    vocabulary = [("he", ("w", "he")), ("she", ("w", "she")), ("his", ("w", "his")), ("hers", ("w", "hers"))]
+    automaton = KeywordAutomaton(vocabulary)
+    assert automaton.scan("ushers").values("w") == {"he", "she", "hers"}
+    assert automaton.scan("this").values("w") == {"his"}
+    assert not automaton.scan("").kinds()
+
+
+def test_matches_substring_scan_on_random_text():
+    rng = random.Random(7)
+    vocabulary = [("".join(rng.choice("abc") for _ in range(rng.randint(1, 4))), ("k", i)) for i in range(40)]
+    vocabulary.append(("", ("k", "empty")))  # ignored, as `"" in text` would match everything
+    automaton = KeywordAutomaton(vocabulary)
+    for _ in range(500):
+        text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 30)))
+        assert by_kind(automaton.scan(text)) == by_kind(naive(vocabulary, text))
+
+
+def test_default_vocabulary_matches_substring_scan():
+    vocabulary = list(_vocabulary())
+    for text in [
+        "i have pus and a fever, also a tea tree allergy",
+        "hello! my skin feels tight and oily around the nose",
+        "i'm 27 with fine lines and dark spots from snail_mucin",
+    ]:
+        assert by_kind(scan_text(text)) == by_kind(naive(vocabulary, text))
+
+
+def test_heuristics_read_the_scan():
+    assert detect_severe_keywords("It started bleeding last night")
+    assert not detect_severe_keywords("")
+    assert extract_allergies_from_text("No tea tree or Fragrance please") == ["fragrance", "tea_tree"]
+    assert detect_intent("hey") == "greeting"
+    assert detect_intent("thanks!") == "small_talk"
+    assert detect_intent("I need a routine for acne") == "routine_request"
+
+
+def test_matches_accessors():
+    matches = KeywordMatches([("concern", "dry"), ("concern", "oily"), ("severe", "pus")])
+    assert matches.has("concern") and matches.has("concern", "dry")
+    assert not matches.has("concern", "acne") and not matches.has("adult")
+    assert matches.values("adult") == frozenset()
+    assert matches.kinds() == {"concern", "severe"}
@@ -0,0 +1,42 @@
+import pytest
+
+from skinsync import llm, llm_cache
+from skinsync.llm import MODEL, TEMPERATURE, executor_counters, submit_openrouter_chat
+from skinsync.llm_cache import ResponseCache, make_cache_key
+
+MESSAGES = [
+    {"role": "system", "content": "You are a skin coach."},
+    {"role": "user", "content": "my skin feels tight and flaky"},
+]
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "llm_cache.db"), enabled=True)
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+def test_cached_reply_skips_the_executor(cache):
+    cache.put(make_cache_key(MODEL, TEMPERATURE, MESSAGES), '{"summary": "cached"}')
+    before = dict(executor_counters)
+
+    future = submit_openrouter_chat(MESSAGES)
+
+    # already resolved, so render_chat applies it in the same run
+    assert future.done()
+    assert future.result() == ('{"summary": "cached"}', None)
+    assert executor_counters == before
+    assert not llm._inflight
+
+
+def test_cache_miss_goes_to_the_executor(cache, monkeypatch):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    submitted = executor_counters["submitted"]
+
+    future = submit_openrouter_chat(MESSAGES)
+
+    assert future.result(timeout=5) == (None, "Missing API key.")
+    assert executor_counters["submitted"] == submitted + 1
+    # one lookup in submit, none again on the worker
+    assert cache.counters["misses"] == 1
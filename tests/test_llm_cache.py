@@ -0,0 +1,125 @@
+import pytest
+import requests
+
+from skinsync import llm, llm_cache
+from skinsync.llm import call_openrouter_chat
+from skinsync.llm_cache import ResponseCache
+
+MESSAGES = [
+    {"role": "system", "content": "You are a skin coach."},
+    {"role": "user", "content": "my skin feels tight and flaky"},
+]
+REPLY = '{"summary": "gentle routine"}'
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}}]}
+
+
+class FakeClient:
+    # stands in for the pooled HTTP client: canned replies, counts calls
+    def __init__(self, reply=REPLY, error=None):
+        self.reply = reply
+        self.error = error
+        self.calls = 0
+
+    def post_json(self, url, payload):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return FakeResponse(self.reply)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path, clock):
+    cache = ResponseCache(path=str(tmp_path / "llm_cache.db"), ttl=60, memory_max=2, enabled=True)
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "get_http_client", lambda headers: client)
+    return client
+
+
+def test_memory_tier_is_bounded(cache):
+    for key in ("a", "b", "c"):
+        cache.put(key, key.upper())
+
+    assert list(cache._memory) == ["b", "c"]
+    # evicted from memory, still served from SQLite (and promoted back)
+    assert cache.get("a") == "A"
+    assert cache.counters["disk_hits"] == 1
+    assert list(cache._memory) == ["c", "a"]
+
+
+def test_sqlite_entries_expire(cache, clock):
+    cache.put("k", REPLY)
+    clock.now += 59
+    # a fresh process: empty memory tier, same file
+    restarted = ResponseCache(path=cache.path, ttl=60, enabled=True)
+    assert restarted.get("k") == REPLY
+    assert restarted.counters["disk_hits"] == 1
+
+    clock.now += 2
+    again = ResponseCache(path=cache.path, ttl=60, enabled=True)
+    assert again.get("k") is None
+    assert again.counters["misses"] == 1
+    # the memory copy carries the same expiry
+    assert restarted.get("k") is None
+
+
+def test_use_cache_false_bypasses_lookup_and_store(cache, client):
+    assert call_openrouter_chat(MESSAGES) == (REPLY, None)
+    assert client.calls == 1
+    assert call_openrouter_chat(MESSAGES) == (REPLY, None)
+    assert client.calls == 1
+
+    client.reply = '{"summary": "fresh"}'
+    assert call_openrouter_chat(MESSAGES, use_cache=False) == ('{"summary": "fresh"}', None)
+    assert client.calls == 2
+    assert cache.counters["stores"] == 1
+    assert call_openrouter_chat(MESSAGES) == (REPLY, None)
+
+
+@pytest.mark.parametrize("error", [requests.Timeout(), requests.ConnectionError(), KeyError("choices")])
+def test_errors_are_not_cached(cache, client, error):
+    client.error = error
+    reply, err = call_openrouter_chat(MESSAGES)
+    assert reply is None and err
+
+    client.error = None
+    assert call_openrouter_chat(MESSAGES) == (REPLY, None)
+    assert cache.counters["stores"] == 1
+
+
+def test_unparseable_replies_are_not_cached(cache, client):
+    client.reply = "Sorry, I can't help with that."
+    assert call_openrouter_chat(MESSAGES) == ("Sorry, I can't help with that.", None)
+    assert cache.counters["stores"] == 0
+    assert cache.get(llm_cache.make_cache_key(llm.MODEL, llm.TEMPERATURE, MESSAGES)) is None
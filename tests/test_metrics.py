@@ -0,0 +1,56 @@
+import pytest
+
+from skinsync import metrics, storage as storage_module
+
+
+@pytest.fixture
+def recording(monkeypatch, storage):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    monkeypatch.setattr(storage_module, "get_storage", lambda: storage)
+    metrics.reset()
+    yield storage
+    metrics.reset()
+
+
+def by_span(rows):
+    return {r["span"]: r for r in rows}
+
+
+def test_flush_persists_and_sums_across_flushes(recording):
+    for ms in (1.0, 2.0, 3.0, 40.0):
+        metrics.record("page chat", ms)
+    metrics.flush("sqlite")
+    metrics.record("page chat", 5.0)
+    metrics.flush("sqlite")
+    metrics.flush("sqlite")  # nothing new: no double counting
+    stored = by_span(metrics.persisted(recording))["page chat"]
+    local = by_span(metrics.snapshot())["page chat"]
+    assert stored == pytest.approx(local)
+    assert stored["count"] == 5 and stored["max_ms"] == 40.0
+
+
+def test_failed_flush_keeps_the_samples(recording, monkeypatch):
+    metrics.record("sql SELECT consults", 2.0)
+    write = recording.add_span_histograms
+
+    def locked(*args):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(recording, "add_span_histograms", locked)
+    with pytest.raises(RuntimeError):
+        metrics.flush("sqlite")
+    metrics.record("sql SELECT consults", 4.0)
+    monkeypatch.setattr(recording, "add_span_histograms", write)
+    metrics.flush("sqlite")
+    stored = by_span(metrics.persisted(recording))["sql SELECT consults"]
+    assert stored["count"] == 2 and stored["total_ms"] == 6.0
+
+
+def test_quantiles_come_from_bucket_bounds():
+    h = metrics.Histogram()
+    for ms in range(1, 101):
+        h.add(float(ms))
+    # an upper bucket bound: at most one bucket (19%) above the true value
+    assert 50 <= h.quantile(0.5) <= 50 * 1.19
+    assert 99 <= h.quantile(0.99) <= 100
+    assert h.quantile(1.0) == 100.0
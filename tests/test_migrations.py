@@ -0,0 +1,100 @@
+import json
+import sqlite3
+
+import pytest
+
+from skinsync import migrations
+from skinsync.migrations import LATEST_VERSION, MIGRATIONS, current_version, migrate
+from skinsync.storage import Storage
+
+# the tables as the app created them before schema_version existed
+LEGACY_DDL = MIGRATIONS[0][2]
+
+
+def consult_json(skin_type, text="my cheeks are red"):
+    return json.dumps({"profile": {"skin_type": skin_type, "main_concern": "Redness"},
+                       "conversation": [{"role": "user", "text": text}], "allergies": ["aloe"]})
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    for ddl in LEGACY_DDL:
+        conn.execute(ddl)
+    conn.executemany(
+        "INSERT INTO consults (session_id, data, created_at) VALUES (?,?,?)",
+        [("s", consult_json("Oily" if i % 2 else "Dry"), "2026-01-01") for i in range(25)],
+    )
+    conn.execute(
+        "INSERT INTO diary (entry_date,mood,redness,oiliness,sleep_hours,water_glasses,note,created_at) "
+        "VALUES ('2026-02-01','😊 Good',3,4,8.0,6,'','')"
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_fresh_database_reaches_latest_once(tmp_path):
+    storage = Storage(str(tmp_path / "fresh.db"))
+    assert migrate(storage) == [v for v, _, _ in MIGRATIONS]
+    assert current_version(storage) == LATEST_VERSION
+    assert migrate(storage) == []
+
+
+def test_legacy_database_is_upgraded_and_backfilled(legacy_db, monkeypatch):
+    monkeypatch.setattr(migrations, "BACKFILL_BATCH", 7)
+    storage = Storage(legacy_db)
+    migrate(storage)
+    assert current_version(storage) == LATEST_VERSION
+    assert storage.query("SELECT COUNT(*) FROM consults WHERE skin_type IS NULL")[0][0] == 0
+    assert storage.query("SELECT skin_type, COUNT(*) FROM consults GROUP BY 1 ORDER BY 1") == [("Dry", 13), ("Oily", 12)]
+    assert storage.query("SELECT DISTINCT allergies_count FROM consults") == [(1,)]
+    assert storage.diary_daily()["n"].tolist() == [1]
+    df, _ = storage.search_consults("cheeks")
+    assert len(df) == 25
+
+
+def test_add_column_skips_existing_columns(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    conn.execute("ALTER TABLE consults ADD COLUMN skin_type TEXT")
+    conn.commit()
+    conn.close()
+    storage = Storage(legacy_db)
+    migrate(storage)
+    columns = [row[1] for row in storage.query("PRAGMA table_info(consults)")]
+    assert columns.count("skin_type") == 1
+
+
+def test_interrupted_migration_is_retried(tmp_path, monkeypatch):
+    storage = Storage(str(tmp_path / "retry.db"))
+    calls = []
+
+    def flaky(storage):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("killed half way")
+
+    steps = MIGRATIONS + [(LATEST_VERSION + 1, "flaky backfill", ["CREATE TABLE IF NOT EXISTS t (x)", flaky])]
+    monkeypatch.setattr(migrations, "MIGRATIONS", steps)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION + 1)
+    with pytest.raises(RuntimeError):
+        migrate(storage)
+    assert current_version(storage) == LATEST_VERSION
+    assert migrate(storage) == [LATEST_VERSION + 1]
+    assert len(calls) == 2
+
+
+def test_consult_backfill_resumes_after_the_filled_prefix(legacy_db, monkeypatch):
+    storage = Storage(legacy_db)
+    with storage.transaction() as conn:
+        for ddl in ("ALTER TABLE consults ADD COLUMN skin_type TEXT", "ALTER TABLE consults ADD COLUMN main_concern TEXT",
+                    "ALTER TABLE consults ADD COLUMN allergies_count INTEGER", "ALTER TABLE consults ADD COLUMN has_plan INTEGER"):
+            conn.execute(ddl)
+        # an earlier run got through the first ten rows
+        conn.execute("UPDATE consults SET skin_type = 'Done' WHERE id <= 10")
+    monkeypatch.setattr(migrations, "BACKFILL_BATCH", 4)
+    migrations.backfill_consult_columns(storage)
+    assert storage.query("SELECT COUNT(*) FROM consults WHERE skin_type = 'Done'")[0][0] == 10
+    assert storage.query("SELECT COUNT(*) FROM consults WHERE skin_type IS NULL")[0][0] == 0
+    migrations.backfill_consult_columns(storage)  # nothing left: no batches at all
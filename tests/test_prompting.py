@@ -0,0 +1,69 @@
+import pytest
+
+from benchmarks.bench_catalog import make_catalog
+from skinsync.prompting import (
+    CODED, COLUMNS, MIN_PROMPT_PRODUCTS, PROMPT_TOKEN_BUDGET, encode_products, estimate_tokens, product_payload,
+)
+
+
+def allowed(n):
+    # best first, as filter_products hands them over
+    products = make_catalog(n, seed=11)
+    for i, p in enumerate(products):
+        p["name"] = f"Rank {i} Gentle Cream"
+    return products
+
+
+def decode(payload):
+    # table -> rows of {column: value}, tag numbers resolved
+    lines = payload.split("\n")
+    tags = {}
+    if lines[0].startswith("tags: "):
+        tags = dict(entry.split("=", 1) for entry in lines.pop(0)[len("tags: "):].split(" "))
+    assert lines[0] == "|".join(COLUMNS)
+    rows = []
+    for line in lines[1:]:
+        cells = line.split("|")
+        assert len(cells) == len(COLUMNS), line
+        row = dict(zip(COLUMNS, cells))
+        for col in CODED:
+            row[col] = [tags.get(t, t) for t in row[col].split(",")] if row[col] else []
+        rows.append(row)
+    return rows
+
+
+def as_row(p):
+    row = {col: "1" if p[col] is True else "0" if p[col] is False else str(p[col]) for col in COLUMNS}
+    for col in CODED:
+        row[col] = list(p[col])
+    return row
+
+
+@pytest.mark.parametrize("budget", [PROMPT_TOKEN_BUDGET, 250, 1000])
+def test_large_list_is_trimmed_to_the_budget(budget):
+    products = allowed(200)
+    payload, kept = product_payload(products, budget=budget)
+
+    assert estimate_tokens(payload) <= budget
+    assert MIN_PROMPT_PRODUCTS <= len(kept) < len(products)
+    # the best-ranked products, in order, and as many as fit
+    assert kept == products[:len(kept)]
+    assert estimate_tokens(encode_products(products[:len(kept) + 1])) > budget
+    # every row is a whole product
+    assert decode(payload) == [as_row(p) for p in kept]
+
+
+def test_short_list_is_sent_whole():
+    products = allowed(5)
+    payload, kept = product_payload(products)
+
+    assert kept == products
+    assert decode(payload) == [as_row(p) for p in products]
+
+
+def test_minimum_kept_over_budget():
+    products = allowed(50)
+    payload, kept = product_payload(products, budget=10)
+
+    assert kept == products[:MIN_PROMPT_PRODUCTS]
+    assert decode(payload) == [as_row(p) for p in kept]
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench_catalog import INGREDIENTS, make_catalog
+from benchmarks.bench_ranking import queries, reference_top
+from skinsync.catalog import CatalogIndex
+from skinsync.ranking import CATEGORY_CANDIDATES, PARTITION_MAX, _top_k
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    # categories big enough for both _top_k strategies
+    return make_catalog(6 * PARTITION_MAX + 600)
+
+
+@pytest.fixture(scope="module")
+def ranker(catalog):
+    return CatalogIndex(catalog).ranker
+
+
+def test_top_k_matches_a_full_sort():
+    rng = np.random.default_rng(3)
+    for n in (5, 100, PARTITION_MAX + 1, 20000):
+        segment = rng.integers(-40, 40, n).astype(np.int16)
+        for k in (1, 3, min(n, 50)):
+            expected = np.lexsort((np.arange(n), -segment.astype(np.int32)))[:k]
+            assert _top_k(segment, k).tolist() == expected.tolist()
+
+
+def test_top_matches_reference(ranker):
+    for q in queries():
+        assert ranker.top(*q) == reference_top(ranker, *q)
+
+
+def test_exclusions_that_empty_the_short_lists(ranker):
+    # most products contain one of these, so the cached short lists run dry
+    profile = {"skin_type": "Oily", "main_concern": "Acne / Breakouts", "age_bucket": "<18"}
+    allergies = INGREDIENTS[:12]
+    for per_category in (3, CATEGORY_CANDIDATES + 5):
+        top = ranker.top(profile, allergies, False, "pimples", per_category=per_category, limit=100)
+        assert top == reference_top(ranker, profile, allergies, False, "pimples", per_category, 100)
+
+
+def test_excluded_products_never_come_back(ranker, catalog):
+    profile = {"skin_type": "Dry", "main_concern": "Dryness / Flakiness", "age_bucket": "<18"}
+    for row in ranker.top(profile, ["fragrance", "vitamin_c"], False, "flaky", limit=100):
+        p = catalog[row]
+        assert not p["adult_only"]
+        assert not {"fragrance", "vitamin_c"} & set(p["ingredients"])
+
+
+def test_conversation_concerns_raise_matching_products(ranker, catalog):
+    profile = {"skin_type": "Normal", "main_concern": "", "age_bucket": "25–30"}
+
+    def share(concerns):
+        rows = ranker.top(profile, [], True, "", concerns=concerns)
+        return sum(bool({"dryness", "dehydration"} & set(catalog[r]["concerns"])) for r in rows) / len(rows)
+
+    assert share({"dry"}) > share(set())
@@ -0,0 +1,69 @@
+import pytest
+
+from skinsync.catalog import filter_products
+from skinsync.heuristics import is_adult_age
+from skinsync.routine import EXFOLIANTS, RETINOIDS, build_routine
+
+PROFILES = [
+    {"skin_type": "Oily", "main_concern": "Acne / Breakouts", "age_bucket": "<18", "sensitivity": ""},
+    {"skin_type": "Sensitive", "main_concern": "Redness / Sensitivity", "age_bucket": "25–30", "sensitivity": ""},
+    {"skin_type": "Dry", "main_concern": "Anti-aging / Fine lines", "age_bucket": "30–40", "sensitivity": ""},
+    {"skin_type": "Combination", "main_concern": "Pigmentation / Dark spots", "age_bucket": "18–24",
+     "sensitivity": "Very sensitive"},
+]
+
+
+def plan_for(profile, allergies=(), text="build me a routine"):
+    # -> (plan, adult, the shortlist's products by name)
+    adult = is_adult_age(profile)
+    shortlist = filter_products(profile, list(allergies), text)
+    return build_routine(shortlist, profile, adult, text), adult, {p["name"]: p for p in shortlist}
+
+
+def ingredients(p):
+    return {i.lower() for i in p.get("ingredients", [])}
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_plans_follow_the_prompt_rules(profile):
+    plan, adult, products = plan_for(profile)
+    assert set(plan) == {"summary", "am_routine", "pm_routine", "diy", "caution"}
+    assert plan["am_routine"] and plan["pm_routine"]
+    sensitive = profile["skin_type"] == "Sensitive" or "sensitive" in profile["sensitivity"].lower()
+    for routine, night in ((plan["am_routine"], False), (plan["pm_routine"], True)):
+        picked = [products[s["product"]] for s in routine]
+        assert len([p for p in picked if ingredients(p) & (RETINOIDS | EXFOLIANTS)]) <= 1
+        for p in picked:
+            if not night:
+                assert not ingredients(p) & RETINOIDS
+            if not adult:
+                assert not p.get("adult_only") and not ingredients(p) & RETINOIDS
+            if (sensitive or not adult) and p["category"] != "sunscreen":
+                assert p.get("irritation") != "high" and p.get("strength") != "strong"
+                if not night:
+                    assert not ingredients(p) & EXFOLIANTS
+
+
+def test_allergens_stay_out_of_the_plan():
+    profile = PROFILES[0]
+    plan, _, products = plan_for(profile, ["niacinamide", "fragrance"])
+    assert plan["am_routine"]
+    for step in plan["am_routine"] + plan["pm_routine"]:
+        assert not ingredients(products[step["product"]]) & {"niacinamide", "fragrance"}
+
+
+def test_tips_and_caution():
+    teen = PROFILES[0]
+    plan, _, _ = plan_for(teen)
+    assert plan["diy"][0] == "Avoid picking or squeezing spots"
+    assert "dermatologist" in plan["caution"]
+    plan, _, _ = plan_for(teen, text="it is bleeding and there is pus")
+    assert plan["caution"].startswith("Bleeding, pus")
+    plan, _, _ = plan_for(PROFILES[1])
+    assert plan["caution"].startswith("Start each product every other day")
+
+
+def test_empty_shortlist():
+    plan = build_routine([], PROFILES[2], True)
+    assert plan["am_routine"] == [] and plan["pm_routine"] == []
+    assert plan["summary"].startswith("No products")
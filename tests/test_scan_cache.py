@@ -0,0 +1,75 @@
+import io
+
+import pytest
+from PIL import Image
+
+from benchmarks.bench_imaging import make_photo
+from skinsync import scan_cache
+from skinsync.imaging import analyze_skin_image
+from skinsync.scan_cache import THUMBNAIL_SIZE, ScanCache, analyze_scan, analyze_scans, load_scan
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    cache = ScanCache()
+    monkeypatch.setattr(scan_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def analyses(monkeypatch):
+    calls = []
+
+    def counting(fn):
+        def wrapper(*args, **kwargs):
+            calls.append(fn.__name__)
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(scan_cache, "analyze_skin_image", counting(scan_cache.analyze_skin_image))
+    monkeypatch.setattr(scan_cache, "analyze_skin_images", counting(scan_cache.analyze_skin_images))
+    return calls
+
+
+def photo_bytes(seed, fmt="JPEG", size=(1600, 1200)):
+    buf = io.BytesIO()
+    make_photo(400, 300, seed).resize(size).save(buf, fmt)
+    return buf.getvalue()
+
+
+def test_upload_only_makes_a_thumbnail(cache, analyses):
+    data = photo_bytes(1)
+    scan = load_scan(data)
+    assert max(scan.thumbnail.size) <= max(THUMBNAIL_SIZE)
+    assert scan.result is None and scan.batch_result is None
+    assert load_scan(data) is scan  # a rerun is a lookup
+    assert analyses == []
+    assert cache.stats()["hits"] == 1
+
+
+def test_analysis_runs_once_per_photo(cache, analyses):
+    data = photo_bytes(2, "PNG", (800, 600))
+    load_scan(data)
+    first = analyze_scan(data)
+    assert analyze_scan(data) == first
+    assert analyses == ["analyze_skin_image"]
+    assert first == analyze_skin_image(Image.open(io.BytesIO(data)))
+    # the analysed entry keeps the thumbnail
+    assert load_scan(data).result == first
+
+
+def test_batch_scores_only_new_photos(cache, analyses):
+    photos = [photo_bytes(seed) for seed in range(3)]
+    results = analyze_scans(photos[:2])
+    assert len(analyses) == 1
+    assert analyze_scans(photos)[:2] == results
+    assert len(analyses) == 2
+    assert analyze_scans(photos) and len(analyses) == 2
+
+
+def test_lru_bounds():
+    small = ScanCache(max_entries=2)
+    for key in "abc":
+        small.put(key, scan_cache.ScanEntry(make_photo(8, 8, 0)))
+    assert small.get("a") is None and small.get("c") is not None
+    assert small.stats()["evictions"] == 1 and small.stats()["entries"] == 2
@@ -0,0 +1,54 @@
+from skinsync.catalog import filter_products
+from skinsync.heuristics import ConversationSignals, is_user_adult
+from skinsync.routine import build_routine
+
+TEEN = {"age_bucket": "<18", "skin_type": "Combination", "main_concern": "", "sensitivity": ""}
+
+
+def user(text):
+    return {"role": "user", "text": text}
+
+
+def test_update_reports_each_allergen_once():
+    signals = ConversationSignals()
+    messages = [user("I react to fragrance")]
+    assert signals.update(messages) == {"fragrance"}
+    messages += [{"role": "assistant", "text": "Noted, no fragrance."}, user("fragrance and aloe burn")]
+    assert signals.update(messages) == {"aloe"}
+    assert signals.allergens == {"fragrance", "aloe"}
+    assert signals.update(messages) == set()
+
+
+def test_severity_is_sticky_but_latest_tracks_the_newest_message():
+    signals = ConversationSignals()
+    messages = [user("there is pus on my chin")]
+    signals.update(messages)
+    assert signals.severe and signals.latest_severe
+    messages.append(user("what cleanser should I use"))
+    signals.update(messages)
+    assert signals.severe and not signals.latest_severe
+
+
+def test_cleared_history_resets():
+    signals = ConversationSignals()
+    signals.update([user("dry skin, fragrance allergy"), user("there is pus")])
+    signals.update([user("hello")])
+    assert signals.concerns == set() and signals.allergens == set() and not signals.severe
+
+
+def test_adult_matches_full_rescan():
+    messages = [user("hi"), user("i'm 29 and worried about fine lines")]
+    signals = ConversationSignals()
+    signals.update(messages[:1])
+    assert not signals.is_adult(TEEN)
+    signals.update(messages)
+    assert signals.is_adult(TEEN) and is_user_adult(TEEN, messages)
+
+
+def test_earlier_concerns_reach_the_routine():
+    signals = ConversationSignals()
+    signals.update([user("my skin is so dry and flaky"), user("what about a routine")])
+    allowed = filter_products(TEEN, [], "what about a routine", signals)
+    plan = build_routine(allowed, TEEN, signals.is_adult(TEEN), "what about a routine", signals)
+    assert "Apply moisturizer on slightly damp skin" in plan["diy"]
+    assert build_routine(allowed, TEEN, False, "what about a routine")["diy"][0] != plan["diy"][0]
@@ -0,0 +1,109 @@
+import json
+import threading
+
+import pytest
+
+from skinsync.storage import Storage, consult_fields
+
+
+def add_diary(storage, day, redness=4, oiliness=6):
+    return storage.insert_diary(day, "😊 Good", redness, oiliness, 7.5, 6, "", f"{day} 09:00:00")
+
+
+def test_connections_are_pooled_in_wal_mode(storage):
+    with storage.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with storage.connection() as second:
+        assert second is first
+        # a checked-out connection isn't handed out twice
+        with storage.connection() as third:
+            assert third is not second
+
+
+def test_failed_transaction_rolls_back(storage):
+    with pytest.raises(RuntimeError):
+        with storage.transaction() as conn:
+            conn.execute("INSERT INTO bookings (name) VALUES ('x')")
+            raise RuntimeError("boom")
+    assert storage.query("SELECT COUNT(*) FROM bookings")[0][0] == 0
+    with storage.connection() as conn:
+        assert not conn.in_transaction
+
+
+def test_concurrent_writers_all_commit(tmp_path):
+    storage = Storage(str(tmp_path / "busy.db"), pool_size=4)
+    storage.init_schema()
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(25):
+                storage.insert_booking(f"u{n}", "", "Paris", "2026-01-01", "10:00", "", f"{n}-{i}")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert storage.query("SELECT COUNT(*) FROM bookings")[0][0] == 200
+
+
+def test_keyset_pages_cover_every_row_once(storage):
+    for i in range(25):
+        storage.insert_booking(f"u{i}", "", "Paris" if i % 2 else "Lyon", "2026-01-01", "10:00", "", "")
+    ids, before = [], None
+    while True:
+        df, has_more = storage.list_bookings(city="Paris", before_id=before, limit=5)
+        ids.extend(df["id"].tolist())
+        if not has_more:
+            break
+        before = int(df["id"].iloc[-1])
+    assert ids == sorted(ids, reverse=True)
+    assert ids == [r[0] for r in storage.query("SELECT id FROM bookings WHERE city = 'Paris' ORDER BY id DESC")]
+
+
+def test_consult_columns_are_derived_from_the_json(storage):
+    data = json.dumps({"profile": {"skin_type": "Dry", "main_concern": "Redness"},
+                       "allergies": ["fragrance", "aloe"], "last_plan": {"summary": "x"}})
+    row_id = storage.insert_consult("s1", data, "2026-01-01 10:00:00")
+    df, _ = storage.list_consults(skin_type="Dry")
+    assert df.iloc[0][["id", "main_concern", "allergies_count", "has_plan"]].tolist() == [row_id, "Redness", 2, 1]
+    assert storage.get_consult(row_id)[0] == data
+    assert consult_fields("not json") == ("Unknown", "Unknown", 0, 0)
+    assert storage.consult_filter_values() == (["Dry"], ["Redness"])
+
+
+def test_diary_daily_aggregates_per_day(storage):
+    add_diary(storage, "2026-03-01", redness=2)
+    add_diary(storage, "2026-03-01", redness=6)
+    add_diary(storage, "2026-03-02", redness=5)
+    daily = storage.diary_daily()
+    assert daily["entry_date"].tolist() == ["2026-03-01", "2026-03-02"]
+    assert daily["n"].tolist() == [2, 1]
+    assert daily["s_redness"].tolist() == [8, 5]
+    assert daily["ss_redness"].tolist() == [40, 25]
+    assert storage.diary_first_day() == "2026-03-01"
+    assert storage.diary_daily(since="2026-03-02")["entry_date"].tolist() == ["2026-03-02"]
+
+
+def test_span_histograms_accumulate(storage):
+    storage.add_span_histograms([("page chat", 2, 10.0, 7.0)], [("page chat", 10.0, 2)])
+    storage.add_span_histograms([("page chat", 1, 30.0, 30.0)], [("page chat", 10.0, 1)])
+    assert storage.query("SELECT count, sum_ms, max_ms FROM perf_spans") == [(3, 40.0, 30.0)]
+    assert storage.query("SELECT count FROM perf_buckets") == [(3,)]
+
+
+def test_filter_values_follow_inserts(storage):
+    assert storage.distinct_values("bookings", "city") == []
+    for city in ("Paris", "Lyon", "Paris", "Nice"):
+        storage.insert_booking("u", "", city, "2026-01-01", "10:00", "", "")
+    assert storage.distinct_values("bookings", "city") == ["Lyon", "Nice", "Paris"]
+    storage.insert_booking("u", "", "Annecy", "2026-01-01", "10:00", "", "")
+    storage.insert_booking("u", "", None, "2026-01-01", "10:00", "", "")  # not a usable filter
+    assert storage.distinct_values("bookings", "city") == ["Annecy", "Lyon", "Nice", "Paris"]
+    for skin in ("Oily", "Dry", "Oily"):
+        storage.insert_consult("s", json.dumps({"profile": {"skin_type": skin, "main_concern": "Acne"}}), "")
+    assert storage.consult_filter_values() == (["Dry", "Oily"], ["Acne"])
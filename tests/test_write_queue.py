@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from skinsync.storage import write_booking, write_diary
+from skinsync.write_queue import WriteQueue
+
+
+def booking(name):
+    return (write_booking, name, "", "Paris", "2026-01-01", "10:00", "", "2026-01-01 09:00:00")
+
+
+def count(storage, table):
+    return storage.query(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+
+@pytest.fixture
+def writes(storage):
+    q = WriteQueue(storage)
+    yield q
+    q.close()
+
+
+def test_writes_resolve_with_row_ids(storage, writes):
+    futures = [writes.submit(*booking(f"u{i}")) for i in range(20)]
+    ids = [f.result(timeout=10) for f in futures]
+    assert ids == sorted(ids) and len(set(ids)) == 20
+    assert count(storage, "bookings") == 20
+    assert writes.counters["writes"] == 20
+    # diary writes keep their daily aggregate in the same transaction
+    writes.submit(write_diary, "2026-03-01", "😊 Good", 3, 4, 7.0, 6, "", "").result(timeout=10)
+    assert storage.diary_daily()["n"].tolist() == [1]
+
+
+def test_a_bad_write_fails_alone(storage, writes):
+    def broken(conn):
+        conn.execute("INSERT INTO bookings (name) VALUES ('half')")
+        raise ValueError("bad row")
+
+    # hold the write lock so all three land in one batch
+    with storage.transaction():
+        good = writes.submit(*booking("a"))
+        bad = writes.submit(broken)
+        after = writes.submit(*booking("b"))
+    assert isinstance(bad.exception(timeout=10), ValueError)
+    assert good.result(timeout=10) and after.result(timeout=10)
+    assert [r[0] for r in storage.query("SELECT name FROM bookings ORDER BY id")] == ["a", "b"]
+    assert writes.counters["failed"] == 1
+
+
+def test_cancelled_write_is_skipped_and_the_writer_survives(storage, writes):
+    with storage.transaction():
+        first = writes.submit(*booking("a"))
+        cancelled = writes.submit(*booking("cancelled"))
+        assert cancelled.cancel()
+    assert first.result(timeout=10)
+    assert writes.submit(*booking("b")).result(timeout=10)
+    assert [r[0] for r in storage.query("SELECT name FROM bookings ORDER BY id")] == ["a", "b"]
+
+
+def test_full_queue_fails_the_write_without_blocking_others(storage):
+    writes = WriteQueue(storage, queue_max=1, submit_timeout=0.05)
+    with storage.transaction():  # writer stuck behind our lock
+        writes.submit(*booking("a"))
+        # the writer may already hold "a"; fill the queue behind it
+        results = [writes.submit(*booking(f"x{i}")) for i in range(3)]
+        rejected = [f for f in results if f.done() and f.exception() is not None]
+        assert rejected and "full" in str(rejected[0].exception())
+        # close() doesn't wait on a submitter stuck in a full queue
+        closer = threading.Thread(target=writes.close, args=(10,))
+        closer.start()
+    closer.join(10)
+    assert not closer.is_alive()
+    assert writes.counters["rejected"] == len(rejected)
+    assert count(storage, "bookings") == 1 + 3 - len(rejected)
+
+
+def test_flush_and_close(storage):
+    writes = WriteQueue(storage)
+    assert writes.flush(timeout=1)  # nothing submitted yet
+    pending = [writes.submit(*booking(f"u{i}")) for i in range(5)]
+    assert writes.flush(timeout=10)
+    assert all(f.done() for f in pending)
+    writes.submit(*booking("last"))
+    writes.close(timeout=10)
+    assert count(storage, "bookings") == 6
+    with pytest.raises(RuntimeError):
+        writes.submit(*booking("late"))
+    assert writes.flush(timeout=1)
+
+
+def test_writer_commits_with_synchronous_full(storage, writes):
+    writes.submit(*booking("a")).result(timeout=10)
+    # 2 = FULL; the pool's connections stay at NORMAL (1)
+    assert writes._conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+    with storage.connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
@@ -0,0 +1,2 @@
+# Streamlit page modules, one per route. app.py imports a page only when
+# it is first requested (see PAGES in app.py).
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import streamlit as st
+
+from skinsync.metrics import timed
+from skinsync.storage import get_storage, write_booking
+from skinsync.write_queue import get_write_queue
+from views.common import (
+    is_valid_email,
+    page_cursor,
+    render_back_to_home,
+    render_pager,
+    render_pending_write,
+    report_write,
+)
+
+db = get_storage()
+
+# ==========================================
+# 📅 APPOINTMENTS
+# ==========================================
+@timed()
+def render_appointments():
+    render_back_to_home()
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+    st.markdown("### 📅 Appointments")
+
+    with st.form("booking_form_main"):
+        name = st.text_input("Full name")
+        email = st.text_input("Email")
+        city = st.text_input("City")
+        date = st.date_input("Preferred date", min_value=datetime.today())
+        time_val = st.time_input("Preferred time")
+        reason = st.text_area("Reason for visit", value="Skin consultation")
+        submitted = st.form_submit_button("Book appointment")
+
+        if submitted:
+            if not name.strip():
+                st.error("Please enter your name.")
+            elif not is_valid_email(email):
+                st.error("Please enter a valid email address.")
+            else:
+                ack = get_write_queue().submit(
+                    write_booking,
+                    name.strip(),
+                    email.strip(),
+                    city.strip(),
+                    str(date),
+                    str(time_val),
+                    reason.strip() or "Skin consultation",
+                    datetime.utcnow().isoformat(),
+                )
+                report_write(
+                    "booking",
+                    ack,
+                    "Appointment requested — provisional booking saved. "
+                    "A clinic admin can now see it below.",
+                )
+        else:
+            render_pending_write("booking")
+
+    st.markdown("---")
+    st.subheader("Recent appointment requests")
+    cities = ["(all)"] + db.distinct_values("bookings", "city")
+    filter_city = st.selectbox("Filter by city", cities)
+    city = None if filter_city == "(all)" else filter_city
+    df, has_more = db.list_bookings(city=city, before_id=page_cursor("bookings", (city,)), limit=50)
+    if df.empty:
+        st.info("No appointment requests yet.")
+    else:
+        st.dataframe(df, use_container_width=True)
+        render_pager("bookings", df, has_more)
+
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,317 @@
+import html
+import json
+from datetime import datetime
+
+import streamlit as st
+
+from skinsync.catalog import filter_products
+from skinsync.heuristics import detect_intent
+from skinsync.llm import submit_openrouter_chat
+from skinsync.metrics import timed
+from skinsync.prompting import SYSTEM_PROMPT, product_payload
+from skinsync.routine import LOCAL_ROUTINES, build_routine
+from skinsync.storage import write_consult
+from skinsync.write_queue import get_write_queue
+from views.common import auto_refresh, render_back_to_home, render_pending_write, report_write
+
+# ==========================================
+# SMART SKIN COACH (MAIN CHAT)
+# ==========================================
+LLM_POLL_SECONDS = 0.4
+
+def plan_bubble(parsed):
+    # Build cute bubble text
+    bubble_parts = []
+    if parsed.get("summary"):
+        bubble_parts.append(f"💗 **Summary:**\n{parsed['summary']}\n")
+
+    if parsed.get("am_routine"):
+        bubble_parts.append("🌞 **AM Routine:**")
+        for step in parsed["am_routine"]:
+            s = step.get("step", "Step")
+            prod = step.get("product", "")
+            bubble_parts.append(f"• {s}: {prod}")
+        bubble_parts.append("")
+
+    if parsed.get("pm_routine"):
+        bubble_parts.append("🌙 **PM Routine:**")
+        for step in parsed["pm_routine"]:
+            s = step.get("step", "Step")
+            prod = step.get("product", "")
+            bubble_parts.append(f"• {s}: {prod}")
+        bubble_parts.append("")
+
+    if parsed.get("diy"):
+        bubble_parts.append("🧴 **DIY Care:**")
+        for tip in parsed["diy"]:
+            bubble_parts.append(f"• {tip}")
+        bubble_parts.append("")
+
+    if parsed.get("caution"):
+        bubble_parts.append(f"⚠️ {parsed['caution']}")
+
+    return "\n".join(bubble_parts) if bubble_parts else "Here’s a gentle routine based on what you shared. 💗"
+
+def apply_chat_reply(reply, err):
+    if err:
+        # routine built locally from the same shortlist the API was sent
+        st.session_state.last_plan_beta = st.session_state.local_plan_beta
+        st.session_state.messages_beta.append({
+            "role": "assistant",
+            "text": "I had trouble reaching the AI service, so I put together a routine from our product list.\n\n"
+                    + plan_bubble(st.session_state.local_plan_beta or {})
+        })
+        st.session_state.send_guard_beta = False
+        return
+
+    try:
+        parsed = json.loads(reply)
+    except Exception:
+        st.session_state.last_plan_beta = {"raw_text": reply}
+        st.session_state.messages_beta.append({
+            "role": "assistant",
+            "text": "I couldn't format a full routine cleanly, but here’s some guidance below."
+        })
+        st.session_state.send_guard_beta = False
+        return
+
+    st.session_state.last_plan_beta = parsed
+    st.session_state.messages_beta.append({
+        "role": "assistant",
+        "text": plan_bubble(parsed)
+    })
+
+    st.session_state.send_guard_beta = False
+
+# ==========================================
+# TRANSCRIPT (windowed)
+# ==========================================
+# Only the last chat_window_beta messages (20 to start, set up in app.py)
+# are rendered, joined into one markdown element, so a rerun costs the same
+# for a long conversation as a short one. "Load earlier" widens the window
+# by CHAT_PAGE.
+CHAT_PAGE = 20
+
+def chat_bubble(m):
+    # blank lines between bubbles keep each one's markdown separate, as
+    # when every bubble was its own element
+    if m["role"] == "assistant":
+        return f"<div class='derm-bubble'><strong>Coach</strong>: {m['text']}</div>"
+    return f"<div class='user-bubble'><strong>You</strong>: {html.escape(m['text'])}</div>"
+
+def _load_earlier():
+    st.session_state.chat_window_beta += CHAT_PAGE
+
+@timed()
+def render_chat():
+    render_back_to_home()
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+    st.markdown("### 🧠 Smart Skin Coach (Beta)", unsafe_allow_html=True)
+
+    if not st.session_state.consent:
+        st.warning("Please confirm in the sidebar that you understand SkinSync is not a doctor.")
+        return
+
+    prof = st.session_state.profile
+    st.markdown(
+        f"<p style='font-size:12px;opacity:0.8;'>Profile: <strong>{prof['skin_type']}</strong> skin · "
+        f"{prof['main_concern']} · sensitivity: {prof['sensitivity']}</p>",
+        unsafe_allow_html=True,
+    )
+
+    # Chat UI
+    with st.container():
+        # First greeting
+        if len(st.session_state.messages_beta) == 0:
+            st.session_state.messages_beta.append({
+                "role": "assistant",
+                "text": (
+                    "Hi, I'm your Smart Skin Coach 🌿\n\n"
+                    "Tell me what’s bothering your skin right now — acne, dryness, redness, pigmentation, anything."
+                )
+            })
+
+        # Reply from the background LLM call, once it's ready
+        pending = st.session_state.pending_reply_beta
+        if pending is not None and pending.done():
+            st.session_state.pending_reply_beta = None
+            try:
+                reply, err = pending.result()
+            except Exception as exc:  # failed or cancelled: same fallback as an API error
+                reply, err = None, str(exc) or type(exc).__name__
+            apply_chat_reply(reply, err)
+
+        # Show history: the newest messages only, as one element
+        messages = st.session_state.messages_beta
+        window = st.session_state.chat_window_beta
+        hidden = max(len(messages) - window, 0)
+        if hidden:
+            st.button(
+                f"⬆ Load earlier messages ({hidden} more)",
+                key="chat_load_earlier",
+                on_click=_load_earlier,
+            )
+        bubbles = [chat_bubble(m) for m in messages[hidden:]]
+        if st.session_state.pending_reply_beta is not None:
+            bubbles.append("<div class='derm-bubble'><strong>Coach</strong>: Preparing a gentle routine for your skin…</div>")
+        st.markdown("\n\n".join(bubbles), unsafe_allow_html=True)
+
+        # Input
+        st.text_input("You:", key="chat_input_beta")
+
+        def handle_send():
+            if st.session_state.send_guard_beta:
+                return
+            st.session_state.send_guard_beta = True
+
+            txt = st.session_state.get("chat_input_beta", "").strip()
+            if not txt:
+                st.session_state.send_guard_beta = False
+                return
+
+            # user message
+            st.session_state.messages_beta.append({"role": "user", "text": txt})
+            st.session_state.chat_input_beta = ""
+            signals = st.session_state.signals_beta
+            new_allergies = signals.update(st.session_state.messages_beta)
+
+            # allergies the conversation names for the first time
+            if new_allergies:
+                merged = set(st.session_state.allergies) | set(new_allergies)
+                st.session_state.allergies = list(sorted(merged))
+
+            # intent
+            intent = detect_intent(txt)
+
+            if intent == "greeting":
+                st.session_state.messages_beta.append({
+                    "role": "assistant",
+                    "text": "Hi! 💗 Tell me your main skin concern — acne, dryness, redness, pigmentation, anything."
+                })
+                st.session_state.send_guard_beta = False
+                return
+
+            if intent == "small_talk":
+                st.session_state.messages_beta.append({
+                    "role": "assistant",
+                    "text": "Got it 💫 Whenever you're ready, describe your skin and what you want to improve."
+                })
+                st.session_state.send_guard_beta = False
+                return
+
+            # severe
+            if signals.latest_severe:
+                st.session_state.messages_beta.append({
+                    "role": "assistant",
+                    "text": (
+                        "I noticed words like bleeding, pus, fever or severe pain. "
+                        "This can be serious — please see an in-person dermatologist soon. 🧑‍⚕️"
+                    )
+                })
+
+            # product filtering
+            allowed = filter_products(st.session_state.profile, st.session_state.allergies, txt, signals)
+            adult = signals.is_adult(st.session_state.profile)
+            st.session_state.local_plan_beta = build_routine(allowed, st.session_state.profile, adult, txt, signals)
+
+            if LOCAL_ROUTINES:
+                # offline fast path: no API round trip
+                st.session_state.last_plan_beta = st.session_state.local_plan_beta
+                st.session_state.messages_beta.append({
+                    "role": "assistant",
+                    "text": plan_bubble(st.session_state.local_plan_beta)
+                })
+                st.session_state.send_guard_beta = False
+                return
+
+            products_text, _ = product_payload(allowed)
+
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "system", "content": f"allowed_products =\n{products_text}"},
+                {"role": "user", "content": txt},
+            ]
+
+            # don't hold the script thread for the round trip: render_chat
+            # polls this future and applies the reply once it lands
+            st.session_state.pending_reply_beta = submit_openrouter_chat(messages)
+
+        st.button("Send", on_click=handle_send)
+
+        save_clicked = st.button("💾 Save consult")
+
+        # show routine as cards
+        plan = st.session_state.last_plan_beta
+        if plan:
+            if plan.get("summary"):
+                st.markdown(
+                    f"<div class='glass-box'><h4>💗 Summary</h4><p>{plan['summary']}</p></div>",
+                    unsafe_allow_html=True
+                )
+
+            if plan.get("am_routine"):
+                items = "".join([
+                    f"<li><strong>{step.get('step','Step')}:</strong> {step.get('product','')}</li>"
+                    for step in plan["am_routine"]
+                ])
+                st.markdown(
+                    f"<div class='glass-box'><h4>🌞 AM Routine</h4><ul>{items}</ul></div>",
+                    unsafe_allow_html=True
+                )
+
+            if plan.get("pm_routine"):
+                items = "".join([
+                    f"<li><strong>{step.get('step','Step')}:</strong> {step.get('product','')}</li>"
+                    for step in plan["pm_routine"]
+                ])
+                st.markdown(
+                    f"<div class='glass-box'><h4>🌙 PM Routine</h4><ul>{items}</ul></div>",
+                    unsafe_allow_html=True
+                )
+
+            if plan.get("diy"):
+                items = "".join([
+                    f"<li>{tip}</li>" for tip in plan["diy"]
+                ])
+                st.markdown(
+                    f"<div class='glass-box'><h4>🧴 DIY Care</h4><ul>{items}</ul></div>",
+                    unsafe_allow_html=True
+                )
+
+            if plan.get("caution"):
+                st.markdown(
+                    f"<div class='warn-box'>⚠️ {plan['caution']}</div>",
+                    unsafe_allow_html=True
+                )
+
+            st.download_button(
+                "⬇️ Download routine (.txt)",
+                data=json.dumps(plan, indent=2),
+                file_name="skinsync_routine.txt"
+            )
+
+        if save_clicked:
+            if st.session_state.last_plan_beta is None:
+                st.warning("No consult to save yet!")
+            else:
+                payload = {
+                    "profile": st.session_state.profile,
+                    "conversation": st.session_state.messages_beta,
+                    "last_plan": st.session_state.last_plan_beta,
+                    "allergies": st.session_state.allergies,
+                }
+                ack = get_write_queue().submit(
+                    write_consult,
+                    st.session_state.session_id,
+                    json.dumps(payload),
+                    datetime.utcnow().isoformat(),
+                )
+                report_write("consult", ack, "Saved to history! 💗")
+        else:
+            render_pending_write("consult")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # poll from the browser: rerun shortly to pick up the reply
+    if st.session_state.pending_reply_beta is not None:
+        auto_refresh("chat_poll", LLM_POLL_SECONDS)
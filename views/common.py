@@ -0,0 +1,131 @@
+import os
+import re
+import time
+from concurrent.futures import wait
+from functools import lru_cache
+
+import streamlit as st
+
+from skinsync.metrics import timed
+
+# ==========================================
+# HELPERS
+# ==========================================
+def go_to(page: str):
+    st.session_state.page = page
+    try:
+        st.experimental_set_query_params(page=page)
+    except Exception:
+        pass
+
+def is_valid_email(email: str) -> bool:
+    if not email:
+        return False
+    return re.match(r"[^@]+@[^@]+\.[^@]+", email) is not None
+
+# ==========================================
+# PAGINATION (keyset cursors)
+# ==========================================
+# Each list page keeps a stack of "before id" cursors in session state:
+# "Older" pushes the last id shown, "Newer" pops back. Changing a filter
+# starts again from the newest rows.
+def page_cursor(key: str, filters):
+    state = st.session_state.setdefault(f"{key}_pager", {"filters": None, "stack": []})
+    if state["filters"] != filters:
+        state["filters"] = filters
+        state["stack"] = []
+    return state["stack"][-1] if state["stack"] else None
+
+def _pager_older(key: str, cursor):
+    st.session_state[f"{key}_pager"]["stack"].append(cursor)
+
+def _pager_newer(key: str):
+    st.session_state[f"{key}_pager"]["stack"].pop()
+
+@timed()
+def render_pager(key: str, df, has_more: bool, next_cursor=None):
+    # next_cursor: for pages not keyed by id (search results); default is
+    # the last id shown
+    stack = st.session_state[f"{key}_pager"]["stack"]
+    col_prev, col_info, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("← Newer", key=f"{key}_newer", on_click=_pager_newer, args=(key,), disabled=not stack)
+    with col_info:
+        st.caption(f"Page {len(stack) + 1}")
+    with col_next:
+        if next_cursor is None:
+            next_cursor = int(df["id"].iloc[-1]) if not df.empty else None
+        st.button("Older →", key=f"{key}_older", on_click=_pager_older, args=(key, next_cursor), disabled=not has_more)
+
+# ==========================================
+# QUEUED WRITES (acknowledgements)
+# ==========================================
+# Form saves go through the write-behind queue (skinsync.write_queue) and
+# wait up to WRITE_ACK_SECONDS for their batch to commit. A save that hasn't
+# committed by then is reported as still saving, and its outcome is shown on
+# the page's next run.
+WRITE_ACK_SECONDS = 1.0
+
+def _show_write_result(ack, saved_message):
+    exc = ack.exception()
+    if exc is None:
+        st.success(saved_message)
+    else:
+        st.error(f"Couldn't save that, please try again. ({exc})")
+
+def report_write(key: str, ack, saved_message: str):
+    done, _ = wait([ack], timeout=WRITE_ACK_SECONDS)
+    if done:
+        _show_write_result(ack, saved_message)
+    else:
+        st.session_state[f"{key}_pending_write"] = (ack, saved_message)
+        st.info("Saving… the database is busy, this will be confirmed shortly.")
+
+def render_pending_write(key: str):
+    pending = st.session_state.get(f"{key}_pending_write")
+    if pending is None:
+        return
+    if pending[0].done():
+        del st.session_state[f"{key}_pending_write"]
+        _show_write_result(*pending)
+    else:
+        st.info("Still saving your last entry…")
+
+# ==========================================
+# AUTO REFRESH (client-side)
+# ==========================================
+# For pages waiting on background work: a tiny static component
+# (views/autorefresh/index.html) waits in the browser, then asks for a
+# rerun. The script thread is free in between, unlike time.sleep() +
+# st.rerun(). The nonce changes every run so each run schedules one refresh.
+@lru_cache(maxsize=1)
+def _auto_refresh_component():
+    import streamlit.components.v1 as components
+
+    return components.declare_component(
+        "auto_refresh", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "autorefresh")
+    )
+
+def auto_refresh(key: str, seconds: float):
+    _auto_refresh_component()(interval_ms=int(seconds * 1000), nonce=time.monotonic(), key=key, default=None)
+
+# ==========================================
+# BACK BUTTON
+# ==========================================
+@timed()
+def render_back_to_home():
+    st.markdown(
+        """
+        <a href="?page=home" style="text-decoration:none;">
+            <button style="
+                margin-top:10px;
+                background:#eadcff;
+                padding:6px 12px;
+                border-radius:20px;
+                border:1px solid #d6c0f5;
+                font-size:13px;
+            ">← Back to Home</button>
+        </a>
+        """,
+        unsafe_allow_html=True,
+    )
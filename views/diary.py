@@ -0,0 +1,91 @@
+from datetime import date, datetime
+
+import streamlit as st
+
+from skinsync import diary_stats
+from skinsync.metrics import timed
+from skinsync.storage import get_storage, write_diary
+from skinsync.write_queue import get_write_queue
+from views.common import page_cursor, render_back_to_home, render_pager, render_pending_write, report_write
+
+db = get_storage()
+
+# ==========================================
+# 📔 DAILY SKIN DIARY
+# ==========================================
+@timed()
+def render_diary():
+    render_back_to_home()
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+    st.markdown("### 📔 Daily Skin Diary")
+
+    with st.form("diary_form"):
+        mood = st.selectbox("Mood today", ["😊 Good", "😐 Okay", "😣 Bad"])
+        redness = st.slider("Redness level", 0, 10, 2)
+        oiliness = st.slider("Oiliness level", 0, 10, 3)
+        sleep_hours = st.number_input("Sleep hours", 0.0, 24.0, 7.0)
+        water = st.number_input("Water intake (glasses)", 0, 30, 6)
+        note = st.text_area("Notes")
+
+        submitted = st.form_submit_button("Save to Diary")
+
+        if submitted:
+            ack = get_write_queue().submit(
+                write_diary,
+                str(datetime.today().date()),
+                mood,
+                redness,
+                oiliness,
+                sleep_hours,
+                water,
+                note,
+                datetime.utcnow().isoformat(),
+            )
+            report_write("diary", ack, "Diary entry saved 💗")
+        else:
+            render_pending_write("diary")
+
+    render_diary_trends()
+
+    st.markdown("### Recent Entries")
+    filter_mood = st.selectbox("Filter by mood", ["(all)", "😊 Good", "😐 Okay", "😣 Bad"])
+    mood_value = None if filter_mood == "(all)" else filter_mood
+    df, has_more = db.list_diary(mood=mood_value, before_id=page_cursor("diary", (mood_value,)), limit=30)
+    st.dataframe(df.drop(columns=["id"]), use_container_width=True)
+    render_pager("diary", df, has_more)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+TREND_RANGES = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+
+@timed()
+def render_diary_trends():
+    st.markdown("### Trends")
+    first_day = db.diary_first_day()
+    if not first_day:
+        st.info("Log a few days to see trends.")
+        return
+
+    choice = st.selectbox("Range", list(TREND_RANGES), index=1)
+    days = TREND_RANGES[choice]
+    if days is None:
+        days = (date.today() - date.fromisoformat(first_day)).days + 1
+    start, load_from, end = diary_stats.trend_range(max(days, 1))
+
+    # reads only the per-day aggregates, never the raw diary
+    daily = db.diary_daily(since=load_from)
+    trends = diary_stats.rolling_trends(daily, start, end)
+    st.line_chart(trends)
+
+    shown = daily[daily["entry_date"] >= str(start)]
+    corr = diary_stats.correlations(shown)
+    cols = st.columns(len(corr))
+    for col, row in zip(cols, corr):
+        with col:
+            label = f"{row['skin']} vs {row['habit'].replace('_', ' ')}"
+            value = "—" if row["r"] != row["r"] else f"{row['r']:+.2f}"  # NaN: not enough variation
+            st.metric(label, value)
+    st.caption(
+        f"Pearson correlation over {corr[0]['entries']} entries in range. "
+        "Negative means the skin value tends to be lower when the habit is higher."
+    )
@@ -0,0 +1,112 @@
+import json
+
+import streamlit as st
+
+from skinsync.consult_search import SEARCH_CANDIDATES
+from skinsync.metrics import timed
+from skinsync.storage import get_storage
+from views.common import page_cursor, render_back_to_home, render_pager
+
+db = get_storage()
+
+# ==========================================
+# 📋 CONSULT HISTORY
+# ==========================================
+SEARCH_LIMIT = 50
+
+@timed()
+def render_history():
+    render_back_to_home()
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+    st.markdown("### 📋 Consult History")
+
+    skin_values, concern_values = db.consult_filter_values()
+    if not skin_values:
+        st.info("No consults saved yet. After a chat, click 'Save consult' to store one.")
+        st.markdown("</div>", unsafe_allow_html=True)
+        return
+
+    unique_skin = ["(all)"] + skin_values
+    unique_concern = ["(all)"] + concern_values
+
+    search = st.text_input("Search consults", placeholder="e.g. salicylic acid, flaky, CeraVe")
+
+    colf1, colf2 = st.columns(2)
+    with colf1:
+        filter_skin = st.selectbox("Filter by skin type", unique_skin)
+    with colf2:
+        filter_concern = st.selectbox("Filter by concern", unique_concern)
+
+    # filtered in SQL on the indexed columns; blobs stay unparsed
+    skin = None if filter_skin == "(all)" else filter_skin
+    concern = None if filter_concern == "(all)" else filter_concern
+    # full-text search (FTS5, ranked); blank search -> newest first
+    found = db.search_consults(
+        search,
+        skin_type=skin,
+        main_concern=concern,
+        cursor=page_cursor("search", (search, skin, concern)),
+        limit=SEARCH_LIMIT,
+    )
+
+    if found is not None:
+        filtered, next_cursor = found
+        st.markdown("#### Search results")
+        if filtered.empty:
+            st.info("No consults match that search.")
+        else:
+            st.caption(
+                f"Ranked by relevance in blocks of {SEARCH_CANDIDATES:,} matches, newest block first · "
+                "«highlighted» words matched your search"
+            )
+            st.dataframe(
+                filtered[["id", "snippet", "skin_type", "main_concern", "created_at"]],
+                use_container_width=True,
+                hide_index=True,
+            )
+        render_pager("search", filtered, next_cursor is not None, next_cursor)
+    else:
+        filtered, has_more = db.list_consults(
+            skin_type=skin,
+            main_concern=concern,
+            before_id=page_cursor("history", (skin, concern)),
+            limit=100,
+        )
+
+        st.markdown("#### Saved consults")
+        st.dataframe(
+            filtered[["id", "skin_type", "main_concern", "created_at"]],
+            use_container_width=True,
+        )
+        render_pager("history", filtered, has_more)
+
+    ids = filtered["id"].tolist()
+    if ids:
+        selected_id = st.selectbox("View full consult by ID", ids)
+        consult = db.get_consult(int(selected_id)) if selected_id else None
+        if consult:
+            raw_data, created_at = consult
+            try:
+                data = json.loads(raw_data)
+                prof = data.get("profile", {})
+                convo = data.get("conversation", [])
+                last_plan = data.get("last_plan", "")
+                allergies = data.get("allergies", [])
+
+                first_user = next((m["text"] for m in convo if m["role"] == "user"), "")
+
+                st.markdown("#### 🧑‍⚕️ Snapshot")
+                st.write(f"**User:** {prof.get('name') or 'Unknown'}")
+                st.write(f"**Skin type:** {prof.get('skin_type')} · **Concern:** {prof.get('main_concern')}")
+                st.write(f"**Allergies:** {', '.join(allergies) if allergies else 'None recorded'}")
+                st.write(f"**Created at:** {created_at}")
+
+                st.markdown("#### 💬 First message")
+                st.write(first_user or "_(empty)_")
+
+                st.markdown("#### 🧴 Saved routine / plan")
+                st.write(last_plan or "_No plan stored._")
+            except Exception:
+                st.write(raw_data[:500])
+
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,111 @@
+import streamlit as st
+
+from skinsync.metrics import timed
+
+# ==========================================
+# HOME PAGE
+# ==========================================
+@timed()
+def render_home():
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+
+    st.markdown('<div class="hero-sub" style="text-align:center;color:#8a6a7f;font-size:12px;letter-spacing:0.22em;text-transform:uppercase;">AI · SKINCARE · DERMATOLOGY</div>', unsafe_allow_html=True)
+    st.markdown('<div class="hero-title" style="font-size:34px;font-weight:700;letter-spacing:0.07em;color:#251320;text-align:center;margin-bottom:0.1rem;">SkinSync</div>', unsafe_allow_html=True)
+    st.markdown(
+        "<p style='text-align:center;font-size:14px;margin-top:-6px;'>"
+        "Your personalised skincare intelligence — routines, scans, diary & more."
+        "</p>",
+        unsafe_allow_html=True,
+    )
+
+    prof = st.session_state.profile
+    st.markdown(
+        f"""
+        <p style='text-align:center;font-size:12px;margin-top:4px;opacity:0.75;'>
+        Signed in as <strong>{prof.get('name') or 'Guest'}</strong> ·  
+        {prof.get('skin_type')} skin · {prof.get('main_concern')}
+        </p>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    st.markdown("<br/>", unsafe_allow_html=True)
+
+    st.markdown('<div class="feature-grid" style="max-width:900px;margin:auto;">', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(
+            """
+            <a class="card-link" href="?page=chat">
+              <div class="premium-card">
+                <div class="card-header-line" style="display:flex;align-items:center;gap:8px;">
+                  <span class="card-emoji" style="font-size:20px;">🧠</span>
+                  <span style="font-size:15px;font-weight:600;">Smart Skin Coach</span>
+                </div>
+                <div class="card-subtitle" style="font-size:13px;color:#8b6c80;">
+                  AI-powered personalised AM/PM routines & product picks.
+                </div>
+              </div>
+            </a>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    with col2:
+        st.markdown(
+            """
+            <a class="card-link" href="?page=scan">
+              <div class="premium-card">
+                <div class="card-header-line" style="display:flex;align-items:center;gap:8px;">
+                  <span class="card-emoji" style="font-size:20px;">📷</span>
+                  <span style="font-size:15px;font-weight:600;">Skin Analysis</span>
+                </div>
+                <div class="card-subtitle" style="font-size:13px;color:#8b6c80;">
+                  Upload a face photo to estimate redness gently.
+                </div>
+              </div>
+            </a>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    col3, col4 = st.columns(2)
+    with col3:
+        st.markdown(
+            """
+            <a class="card-link" href="?page=appointments">
+              <div class="premium-card">
+                <div class="card-header-line" style="display:flex;align-items:center;gap:8px;">
+                  <span class="card-emoji" style="font-size:20px;">📅</span>
+                  <span style="font-size:15px;font-weight:600;">Appointments</span>
+                </div>
+                <div class="card-subtitle" style="font-size:13px;color:#8b6c80;">
+                  Save consultation slots that can link to a clinic later.
+                </div>
+              </div>
+            </a>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    with col4:
+        st.markdown(
+            """
+            <a class="card-link" href="?page=history">
+              <div class="premium-card">
+                <div class="card-header-line" style="display:flex;align-items:center;gap:8px;">
+                  <span class="card-emoji" style="font-size:20px;">📋</span>
+                  <span style="font-size:15px;font-weight:600;">Consult History</span>
+                </div>
+                <div class="card-subtitle" style="font-size:13px;color:#8b6c80;">
+                  View all saved chats & routines.
+                </div>
+              </div>
+            </a>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    st.markdown("</div>", unsafe_allow_html=True)
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,93 @@
+import sys
+
+import streamlit as st
+
+from skinsync import metrics
+from skinsync.metrics import timed
+from views.common import render_back_to_home
+
+# ==========================================
+# ⏱️ PERFORMANCE (hidden, ?page=perf)
+# ==========================================
+def _span_table(rows):
+    import pandas as pd
+
+    df = pd.DataFrame(rows).sort_values("total_ms", ascending=False)
+    st.dataframe(
+        df.round({"total_ms": 1, "p50_ms": 3, "p95_ms": 3, "p99_ms": 3, "max_ms": 3}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+def _stats_table(title, module_name, stats):
+    # stats(module) -> dict, or None when there is nothing to show yet; only
+    # for modules this process has already loaded, so opening this page
+    # doesn't build caches nobody uses
+    st.markdown(f"**{title}**")
+    module = sys.modules.get(module_name)
+    row = stats(module) if module is not None else None
+    if row is None:
+        st.caption("Not used by this process yet.")
+        return
+    import pandas as pd
+
+    st.dataframe(pd.DataFrame([row]), use_container_width=True, hide_index=True)
+
+@timed()
+def render_perf():
+    render_back_to_home()
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+    st.markdown("### ⏱️ Performance")
+
+    if not metrics.METRICS_ENABLED:
+        st.info("Instrumentation is off (SKINSYNC_METRICS=0).")
+        st.markdown("</div>", unsafe_allow_html=True)
+        return
+
+    rows = metrics.snapshot()
+    st.markdown("#### This server process")
+    st.caption(
+        f"Spans recorded by this server process since it started · sink: {metrics.METRICS_SINK}, "
+        f"flushed every {metrics.FLUSH_SECONDS:g}s · percentiles are histogram bucket bounds (±9%)."
+    )
+    if not rows:
+        st.info("No spans recorded yet — use the app a little and refresh.")
+    else:
+        _span_table(rows)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Flush to sink now"):
+            try:
+                metrics.flush()
+                st.success("Flushed.")
+            except Exception as exc:
+                st.error(f"Flush failed, the samples are kept for the next one. ({exc})")
+    with col2:
+        if st.button("Reset this process's histograms"):
+            metrics.reset()
+            st.rerun()
+
+    st.markdown("#### Caches and clients (this process)")
+    _stats_table("Scan cache", "skinsync.scan_cache", lambda m: m.get_scan_cache().stats())
+    _stats_table("LLM response cache", "skinsync.llm_cache", lambda m: m.get_response_cache().stats())
+    _stats_table("HTTP client (OpenRouter)", "skinsync.http_client", lambda m: m.http_client_metrics())
+    _stats_table("LLM request executor", "skinsync.llm", lambda m: m.executor_stats())
+
+    # the sqlite sink sums every process's flushes into perf_spans /
+    # perf_buckets, so this survives restarts and covers all workers
+    st.markdown("#### All processes (flushed)")
+    if metrics.METRICS_SINK != "sqlite":
+        st.caption(
+            f"The {metrics.METRICS_SINK} sink doesn't keep history in the app DB"
+            + (f" — scrape {metrics.PROMETHEUS_PATH} instead." if metrics.METRICS_SINK == "prometheus" else ".")
+        )
+    else:
+        st.caption("Summed from the perf_spans and perf_buckets tables over every flush since they were created.")
+        stored = metrics.persisted()
+        if not stored:
+            st.info("Nothing flushed yet.")
+        else:
+            _span_table(stored)
+
+    st.markdown("</div>", unsafe_allow_html=True)
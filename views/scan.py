@@ -0,0 +1,130 @@
+import streamlit as st
+
+from skinsync.imaging import ScanImageTooLarge
+from skinsync.metrics import timed
+from skinsync.scan_cache import analyze_scan, analyze_scans, load_scan
+from views.common import render_back_to_home
+
+# ==========================================
+# 📷 IMAGE ANALYSIS PAGE
+# ==========================================
+@timed()
+def render_scan_single():
+    uploaded = st.file_uploader(
+        "Upload a clear face photo (front-facing, good lighting)",
+        type=["png", "jpg", "jpeg"],
+    )
+
+    if uploaded:
+        try:
+            # cached by content hash: reruns and re-uploads skip the decode
+            scan = load_scan(uploaded.getvalue())
+        except ScanImageTooLarge as e:
+            st.error(str(e))
+            return
+        st.image(scan.thumbnail, caption="Uploaded image", use_column_width=True)
+
+        if st.button("Analyze redness & inflammation"):
+            try:
+                mean_red, severity = analyze_scan(uploaded.getvalue())
+            except ScanImageTooLarge as e:
+                st.error(str(e))
+                return
+
+            st.markdown(f"""
+            <div class="glass-box">
+                <h4>🔎 Analysis Result</h4>
+                <p><strong>Redness score:</strong> {mean_red:.2f}</p>
+                <p><strong>Severity:</strong> {severity}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.info(
+                "This is a heuristic, educational-only analysis. "
+                "Real diagnosis always requires a dermatologist."
+            )
+
+    else:
+        st.info("No image uploaded — please upload a face photo to start analysis.")
+
+@timed()
+def render_scan_batch():
+    uploads = st.file_uploader(
+        "Upload several clear face photos (e.g. different days or angles)",
+        type=["png", "jpg", "jpeg"],
+        accept_multiple_files=True,
+    )
+
+    if not uploads:
+        st.info("No images uploaded — add two or more photos to compare them.")
+        return
+
+    scans = []
+    for u in uploads:
+        try:
+            scans.append(load_scan(u.getvalue()))
+        except ScanImageTooLarge as e:
+            st.error(f"{u.name}: {e}")
+            return
+    thumbs = st.columns(min(len(scans), 4))
+    for i, scan in enumerate(scans):
+        with thumbs[i % len(thumbs)]:
+            st.image(scan.thumbnail, caption=uploads[i].name, use_column_width=True)
+
+    if st.button("Analyze all photos"):
+        import pandas as pd
+
+        try:
+            results = analyze_scans([u.getvalue() for u in uploads])
+        except ScanImageTooLarge as e:
+            st.error(str(e))
+            return
+        df = pd.DataFrame(
+            [
+                {"photo": u.name, "redness_score": round(mean_red, 2), "severity": severity}
+                for u, (mean_red, severity) in zip(uploads, results)
+            ]
+        )
+        st.markdown("#### 🔎 Analysis Results")
+        st.dataframe(df, use_container_width=True)
+
+        st.info(
+            "This is a heuristic, educational-only analysis. "
+            "Real diagnosis always requires a dermatologist."
+        )
+
+@timed()
+def render_scan():
+    render_back_to_home()
+    st.markdown('<div class="page-container">', unsafe_allow_html=True)
+    st.markdown("### 📷 Skin Analysis", unsafe_allow_html=True)
+
+    col1, col2 = st.columns([1.2, 1])
+
+    with col1:
+        batch_mode = st.checkbox("Analyze several photos at once")
+
+        if batch_mode:
+            render_scan_batch()
+        else:
+            render_scan_single()
+
+    with col2:
+        st.markdown("""
+        <div class="glass-box">
+            <h4>📘 How This Works</h4>
+            <ul>
+                <li>Converts image to RGB.</li>
+                <li>Computes redness index (R - (G+B)/2).</li>
+                <li>Normalizes values 0–1.</li>
+                <li>Averages pixels.</li>
+                <li>Maps to mild / moderate / high categories.</li>
+                <li>Very large photos are decoded at reduced scale and scored in strips.</li>
+            </ul>
+            <p style="opacity:0.7;">
+                This uses basic computer-vision preprocessing — useful to explain on your resume.
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown("</div>", unsafe_allow_html=True)
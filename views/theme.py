@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+# ==========================================
+# THEME (one stylesheet, sent once per session)
+# ==========================================
+# style.css (base) and theme.css (light-mode fix + glass UI) are joined,
+# minified and hashed once per process. A zero-height component adds the
+# result to the parent page's <head> the first time a session renders; the
+# <style> tag stays there across reruns, so later reruns carry no CSS at all.
+# A new hash (edited CSS) replaces the old tag on the session's next run.
+#
+# Streamlit's static file serving sends everything but images as text/plain
+# with nosniff, so a <link> to a served .css file would be ignored.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STYLESHEETS = ["style.css", "theme.css"]  # later files win on conflicts
+
+_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_PUNCT = re.compile(r"\s*([{};:,>])\s*")
+
+
+def minify_css(css):
+    css = _COMMENTS.sub("", css)
+    css = _SPACE.sub(" ", css)
+    css = _PUNCT.sub(r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+@lru_cache(maxsize=1)
+def build_stylesheet():
+    parts = []
+    for name in STYLESHEETS:
+        with open(os.path.join(ROOT, name), encoding="utf-8") as f:
+            parts.append(f.read())
+    css = minify_css("\n".join(parts))
+    return css, hashlib.sha256(css.encode()).hexdigest()[:12]
+
+
+_INJECT = """<script>
+(function () {{
+  const doc = window.parent.document;
+  const id = "skinsync-theme-{digest}";
+  if (doc.getElementById(id)) return;
+  doc.querySelectorAll('style[id^="skinsync-theme-"]').forEach((el) => el.remove());
+  const style = doc.createElement("style");
+  style.id = id;
+  style.textContent = {css};
+  doc.head.appendChild(style);
+}})();
+</script>"""
+
+
+def inject_theme():
+    css, digest = build_stylesheet()
+    if st.session_state.get("theme_digest") == digest:
+        return
+    components.html(_INJECT.format(digest=digest, css=json.dumps(css)), height=0)
+    st.session_state.theme_digest = digest